@@ -0,0 +1,271 @@
+"""Persistent, content-addressed response cache for LLM clients.
+
+Responses are keyed on provider + model + system prompt + messages, so re-running
+`score`/`decompose`/`dispatch` on the same input with the same prompt file is served
+from local disk instead of the network.
+
+Storage is a single SQLite file with TTL expiry and size-bounded LRU eviction.
+Only responses containing a complete JSON object are stored, and a response that
+later fails to parse or validate (see client.PARSE_FAILURE_HOOKS) is dropped again,
+so one bad answer is not served for the whole TTL.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from client import (
+    PARSE_FAILURE_HOOKS,
+    LLMClient,
+    ensure_async,
+    extract_json,
+    report_usage,
+    stream_chat,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".scrumai_cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_MB = 256
+
+# Responses stored or served recently, by content hash, so a response that fails
+# validation downstream can be dropped from the cache it came from
+RECENT_RESPONSES = 1024
+_recent: OrderedDict[str, tuple["ResponseCache", str]] = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _response_hash(response: str) -> str:
+    return hashlib.sha256(response.encode("utf-8")).hexdigest()
+
+
+def _remember(cache: "ResponseCache", key: str, response: str) -> None:
+    digest = _response_hash(response)
+    with _recent_lock:
+        _recent[digest] = (cache, key)
+        _recent.move_to_end(digest)
+        while len(_recent) > RECENT_RESPONSES:
+            _recent.popitem(last=False)
+
+
+def _forget_invalid(response: str) -> None:
+    with _recent_lock:
+        entry = _recent.pop(_response_hash(response), None)
+    if entry is not None:
+        cache, key = entry
+        cache.delete(key)
+        logger.info("Dropped cached response %s: it failed validation", key[:12])
+
+
+PARSE_FAILURE_HOOKS.append(_forget_invalid)
+
+
+def cache_key(
+    provider: str, model: str, system_prompt: str, messages: list[dict[str, str]]
+) -> str:
+    """Build a stable content hash for a chat request."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "system": system_prompt,
+            "messages": messages,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTL and LRU eviction by total size."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.directory = Path(
+            directory or os.getenv("SCRUMAI_CACHE_DIR", DEFAULT_CACHE_DIR)
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("SCRUMAI_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        )
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(float(os.getenv("SCRUMAI_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.directory / "responses.db", check_same_thread=False
+        )
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)"
+            )
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created = row
+            with self._conn:
+                if self.ttl_seconds > 0 and now - created > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._conn.execute(
+                    "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+                )
+            return response
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response and evict least-recently-used entries over the size bound."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, now, now, size),
+            )
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Drop a stored response, if any."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _evict(self) -> None:
+        """Drop the oldest-accessed entries until the cache fits in max_bytes."""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug("Evicted %d cached responses", len(evicted))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedClient:
+    """LLMClient wrapper that serves repeated requests from a ResponseCache.
+
+    Args:
+        inner: The client that performs real requests on a cache miss.
+        cache: Response store.
+        refresh: If True, skip cache reads but still write fresh responses.
+    """
+
+    def __init__(
+        self, inner: LLMClient, cache: ResponseCache, refresh: bool = False
+    ) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.refresh = refresh
+        self.provider = getattr(inner, "provider", type(inner).__name__)
+        self.model = getattr(inner, "model", "")
+
+    def _get(self, key: str) -> str | None:
+        if self.refresh:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug("Cache hit: %s", key[:12])
+            report_usage(cached=True)
+            _remember(self.cache, key, cached)
+        return cached
+
+    def _put(self, key: str, response: str) -> None:
+        """Store a response, unless it has no complete JSON object to parse."""
+        if extract_json(response) is None:
+            logger.debug("Not caching response %s: no complete JSON object", key[:12])
+            return
+        self.cache.put(key, response)
+        _remember(self.cache, key, response)
+
+    def invalidate(self, system_prompt: str, messages: list[dict[str, str]]) -> None:
+        """Drop the cached response to a request, e.g. after it failed validation."""
+        self.cache.delete(cache_key(self.provider, self.model, system_prompt, messages))
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        key = cache_key(self.provider, self.model, system_prompt, messages)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        response = self.inner.chat(system_prompt, messages)
+        self._put(key, response)
+        return response
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        key = cache_key(self.provider, self.model, system_prompt, messages)
+        cached = self._get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks: list[str] = []
+        try:
+            for chunk in stream_chat(self.inner, system_prompt, messages):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # Consumers stop once they have the complete JSON object, but also on
+            # Ctrl+C, an error or an abort; _put() only keeps complete objects
+            self._put(key, "".join(chunks))
+            raise
+        self._put(key, "".join(chunks))
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        # SQLite IO runs off the event loop so it does not stall other requests
+        key = cache_key(self.provider, self.model, system_prompt, messages)
+        cached = await asyncio.to_thread(self._get, key)
+        if cached is not None:
+            return cached
+
+        response = await ensure_async(self.inner).achat(system_prompt, messages)
+        await asyncio.to_thread(self._put, key, response)
+        return response
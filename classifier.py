@@ -0,0 +1,422 @@
+"""Local pre-classifier for role dispatch.
+
+Boilerplate tasks ("Set up project scaffolding", "Write unit tests for X") get
+predictable RoleFitScoring, so they are dispatched locally instead of costing an
+LLM call. Two sources of predictions, tried in order:
+
+1. A multinomial naive Bayes model over the words of title, description and
+   acceptance criteria, trained on the accumulated dispatch history (every task
+   the LLM dispatched, see DEFAULT_HISTORY). Its confidence threshold is
+   calibrated by leave-one-out on that history: the lowest posterior at which
+   held-out predictions still reach min_precision. Until the history supports
+   such a threshold, the model makes no predictions.
+2. Keyword rules on the task title for obvious task types, skipped when the
+   task mentions anything risky (security, payments, migrations, production...).
+   The rules are not trained, so the history serves as their held-out set: a rule
+   is only applied once it has matched enough history tasks and agreed with the
+   LLM's dispatch on at least min_precision of them, and that precision is its
+   confidence. Without history, no rule applies.
+
+Only tasks with a confident prediction are dispatched locally; the rest go to the
+LLM, and their dispatches are appended to the history for the next run.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from models.role import (
+    AI_ROLES,
+    RoleFitScoring,
+    TaskDispatch,
+    derive_autonomy_level,
+    derive_owner_type,
+)
+from models.scoring import DimensionScore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY = ".scrumai_cache/dispatch_history.jsonl"
+DEFAULT_MIN_PRECISION = 0.9
+# Fewer examples than this and the calibration is not meaningful
+MIN_HISTORY_EXAMPLES = 30
+# A label must have been seen this often to be predicted
+MIN_LABEL_EXAMPLES = 3
+# Leave-one-out calibration cost is linear in this
+MAX_CALIBRATION_EXAMPLES = 2000
+# History tasks a rule must have matched before its precision is trusted
+MIN_RULE_EXAMPLES = 10
+
+# (complexity, risk, human_judgment, recommended_role)
+Label = tuple[int, int, int, str]
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]*")
+
+_RISKY = re.compile(
+    r"\b(secur\w*|auth(?:entication|orization|n|z)?|password\w*|credential\w*|secret\w*|encrypt\w*|payment\w*|"
+    r"billing|migrat\w*|production|deploy\w*|release|compliance|gdpr|pii|delet\w*|"
+    r"data loss|concurren\w*|performance)\b"
+)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Title pattern that always maps to the same dispatch."""
+
+    name: str
+    pattern: re.Pattern
+    label: Label
+    reason: str
+
+
+RULES: tuple[Rule, ...] = (
+    Rule(
+        "scaffolding",
+        re.compile(
+            r"\b(scaffold\w*|boilerplate|(set ?up|initiali[sz]e|bootstrap|create) "
+            r"(the |a |new )?(project|repo|repository|skeleton|workspace|monorepo))\b"
+        ),
+        (0, 0, 0, "Junior Developer"),
+        "Routine project scaffolding",
+    ),
+    Rule(
+        "unit_tests",
+        re.compile(r"\b(write|add|create|implement) (the )?(unit|component|snapshot) tests?\b"),
+        (0, 0, 0, "Junior Developer"),
+        "Unit tests for already specified behaviour",
+    ),
+    Rule(
+        "documentation",
+        re.compile(
+            r"\b(write|update|add|create) (the )?(readme|docs|documentation|docstrings|"
+            r"changelog|api docs)\b"
+        ),
+        (0, 0, 0, "Junior Developer"),
+        "Documentation of existing work",
+    ),
+    Rule(
+        "tooling",
+        re.compile(
+            r"\b(configure|set ?up|add) (the )?(eslint|prettier|linter|linting|formatter|"
+            r"pre-commit( hooks)?|editorconfig)\b"
+        ),
+        (0, 0, 0, "Junior Developer"),
+        "Standard tooling configuration",
+    ),
+    Rule(
+        "dependencies",
+        re.compile(r"\b(install|add) (the )?(project )?(dependencies|packages)\b"),
+        (0, 0, 0, "Junior Developer"),
+        "Installing declared dependencies",
+    ),
+    Rule(
+        "sign_off",
+        re.compile(
+            r"\b(stakeholder (sign[- ]?off|approval|review)|sign[- ]?off|obtain approval)\b"
+        ),
+        (1, 2, 2, "Product Owner"),
+        "Stakeholder decision with business accountability",
+    ),
+)
+
+
+@dataclass
+class Prediction:
+    label: Label
+    confidence: float
+    source: str  # "model" or a rule name
+    reason: str
+
+
+def _tokens(task: dict) -> list[str]:
+    title = task.get("title", "").lower()
+    body = f"{task.get('description', '')} {task.get('acceptance_criteria', '')}".lower()
+    # Title words count twice: they say most about the kind of task
+    return [f"t:{w}" for w in _WORD.findall(title)] + _WORD.findall(title + " " + body)
+
+
+def _task_key(task: dict) -> str:
+    payload = json.dumps(
+        [task.get("title", ""), task.get("description", ""), task.get("acceptance_criteria", "")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def label_of(dispatch: TaskDispatch) -> Label:
+    s = dispatch.scoring
+    return (s.complexity.score, s.risk.score, s.human_judgment.score, dispatch.recommended_role)
+
+
+def _consistent(label: Label) -> bool:
+    """Whether the role agrees with the owner type the total score implies."""
+    owner = derive_owner_type(sum(label[:3]))
+    return (label[3] in AI_ROLES) == (owner == "ai")
+
+
+@dataclass
+class ClassifierStats:
+    model: int = 0
+    rules: Counter = field(default_factory=Counter)
+    llm: int = 0
+
+    @property
+    def local(self) -> int:
+        return self.model + sum(self.rules.values())
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.local + self.llm
+        return self.local / total if total else 0.0
+
+
+class DispatchClassifier:
+    """Predicts TaskDispatch locally for tasks it is confident about.
+
+    Args:
+        min_precision: Held-out precision the model's confidence threshold must reach.
+        rules: Whether to apply the keyword rules (those that reach min_precision
+            on the history).
+    """
+
+    def __init__(self, min_precision: float = DEFAULT_MIN_PRECISION, rules: bool = True) -> None:
+        self.min_precision = min_precision
+        self.use_rules = rules
+        self.threshold: float | None = None
+        # Held-out precision of each rule that reaches min_precision on the history
+        self.rule_precision: dict[str, float] = {}
+        self.stats = ClassifierStats()
+        self._label_counts: Counter = Counter()
+        self._token_counts: dict[Label, Counter] = defaultdict(Counter)
+        self._token_totals: Counter = Counter()
+        self._vocabulary: set[str] = set()
+        self._examples = 0
+
+    # -- model ------------------------------------------------------------
+
+    def fit(self, examples: Iterable[tuple[dict, TaskDispatch]]) -> None:
+        """Train on (task fields, LLM dispatch) pairs and calibrate the threshold
+        and the rules."""
+        labelled = [(task, label_of(d)) for task, d in examples if _consistent(label_of(d))]
+        data = [(_tokens(task), label) for task, label in labelled]
+        self._label_counts = Counter(label for _, label in data)
+        self._token_counts = defaultdict(Counter)
+        for tokens, label in data:
+            self._token_counts[label].update(tokens)
+        self._token_totals = Counter(
+            {label: sum(counts.values()) for label, counts in self._token_counts.items()}
+        )
+        self._vocabulary = {t for counts in self._token_counts.values() for t in counts}
+        self._examples = len(data)
+        self.threshold = self._calibrate(data) if len(data) >= MIN_HISTORY_EXAMPLES else None
+        self.rule_precision = self._calibrate_rules(labelled)
+        logger.info(
+            "Dispatch classifier trained on %d examples (%d labels), threshold %s, rules %s",
+            len(data),
+            len(self._label_counts),
+            f"{self.threshold:.3f}" if self.threshold is not None else "none",
+            ", ".join(self.rule_precision) or "none",
+        )
+
+    def _posterior(self, tokens: list[str], exclude: Label | None = None) -> tuple[Label, float]:
+        """Most likely label and its posterior probability.
+
+        exclude removes one example with that label and these tokens from the
+        counts, which gives the leave-one-out prediction for a training example.
+        """
+        vocab = len(self._vocabulary) + 1
+        examples = self._examples - (exclude is not None)
+        counts = Counter(tokens)
+        scores: dict[Label, float] = {}
+        for label, label_count in self._label_counts.items():
+            own = exclude == label
+            n = label_count - own
+            if n <= 0:
+                continue
+            token_counts = self._token_counts[label]
+            total = self._token_totals[label] - (len(tokens) if own else 0)
+            score = math.log(n / examples)
+            denominator = math.log(total + vocab)
+            for token, k in counts.items():
+                count = token_counts.get(token, 0) - (k if own else 0)
+                score += k * (math.log(count + 1) - denominator)
+            scores[label] = score
+        best = max(scores, key=scores.__getitem__)
+        top = scores[best]
+        normalizer = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / normalizer
+
+    def _calibrate(self, data: list[tuple[list[str], Label]]) -> float | None:
+        """Lowest confidence at which leave-one-out predictions reach min_precision."""
+        step = max(1, len(data) // MAX_CALIBRATION_EXAMPLES)
+        held_out = []
+        for tokens, label in data[::step]:
+            predicted, confidence = self._posterior(tokens, exclude=label)
+            held_out.append((confidence, predicted == label))
+        held_out.sort(reverse=True)
+
+        threshold = None
+        correct = 0
+        for i, (confidence, is_correct) in enumerate(held_out, 1):
+            correct += is_correct
+            # Require some support so one lucky prediction does not set the bar
+            if i >= 10 and correct / i >= self.min_precision:
+                threshold = confidence
+        return threshold
+
+    def _calibrate_rules(self, examples: list[tuple[dict, Label]]) -> dict[str, float]:
+        """Precision of each rule on the history, for rules that reach min_precision."""
+        outcomes: dict[str, list[bool]] = defaultdict(list)
+        for task, label in examples:
+            rule = _matching_rule(task)
+            if rule is not None:
+                outcomes[rule.name].append(rule.label == label)
+        precision = {name: sum(hits) / len(hits) for name, hits in outcomes.items()}
+        return {
+            name: p
+            for name, p in precision.items()
+            if len(outcomes[name]) >= MIN_RULE_EXAMPLES and p >= self.min_precision
+        }
+
+    # -- prediction ---------------------------------------------------------
+
+    def _rule(self, task: dict) -> Prediction | None:
+        rule = _matching_rule(task)
+        if rule is None or rule.name not in self.rule_precision:
+            return None
+        return Prediction(rule.label, self.rule_precision[rule.name], rule.name, rule.reason)
+
+    def predict(self, task: dict) -> Prediction | None:
+        """Confident prediction for a task, or None if the LLM should decide."""
+        if self.threshold is not None:
+            label, confidence = self._posterior(_tokens(task))
+            if (
+                confidence >= self.threshold
+                and self._label_counts[label] >= MIN_LABEL_EXAMPLES
+            ):
+                similar = self._label_counts[label]
+                return Prediction(
+                    label,
+                    confidence,
+                    "model",
+                    f"Same scoring as {similar} similar previously dispatched tasks",
+                )
+        if self.use_rules:
+            return self._rule(task)
+        return None
+
+    def classify(self, tasks: list[dict]) -> tuple[dict[str, TaskDispatch], list[dict]]:
+        """Split tasks into local dispatches and the tasks left for the LLM."""
+        local: dict[str, TaskDispatch] = {}
+        uncertain: list[dict] = []
+        for task in tasks:
+            prediction = self.predict(task)
+            if prediction is None:
+                uncertain.append(task)
+                self.stats.llm += 1
+                continue
+            if prediction.source == "model":
+                self.stats.model += 1
+            else:
+                self.stats.rules[prediction.source] += 1
+            local[task["task_id"]] = _to_dispatch(task["task_id"], prediction)
+        return local, uncertain
+
+
+def _matching_rule(task: dict) -> Rule | None:
+    """The first rule matching the task's title, unless the task mentions anything risky."""
+    title = task.get("title", "").lower()
+    text = f"{title} {task.get('description', '')} {task.get('acceptance_criteria', '')}"
+    for rule in RULES:
+        if not rule.pattern.search(title):
+            continue
+        # Risky wording makes an otherwise routine AI task worth a closer look
+        if rule.label[3] in AI_ROLES and _RISKY.search(text.lower()):
+            return None
+        return rule
+    return None
+
+
+def _to_dispatch(task_id: str, prediction: Prediction) -> TaskDispatch:
+    complexity, risk, human_judgment, role = prediction.label
+    total = complexity + risk + human_judgment
+    reason = f"{prediction.reason} (local {prediction.source}, {prediction.confidence:.0%})"
+    return TaskDispatch(
+        task_id=task_id,
+        scoring=RoleFitScoring(
+            complexity=DimensionScore(score=complexity, reason=reason),
+            risk=DimensionScore(score=risk, reason=reason),
+            human_judgment=DimensionScore(score=human_judgment, reason=reason),
+        ),
+        total_score=total,
+        recommended_role=role,
+        owner_type=derive_owner_type(total),
+        autonomy_level=derive_autonomy_level(total),
+        reasoning=f"Dispatched locally: {prediction.reason.lower()}.",
+    )
+
+
+def load_history(path: str = DEFAULT_HISTORY) -> list[tuple[dict, TaskDispatch]]:
+    """(task fields, dispatch) pairs from the history file; the latest entry per task wins."""
+    history_path = Path(path)
+    if not history_path.exists():
+        return []
+    examples: dict[str, tuple[dict, TaskDispatch]] = {}
+    with open(history_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                examples[_task_key(record["task"])] = (
+                    record["task"],
+                    TaskDispatch.model_validate(record["dispatch"]),
+                )
+            except (ValueError, KeyError) as e:
+                logger.warning("Skipping unreadable dispatch history entry: %s", e)
+    return list(examples.values())
+
+
+def append_history(
+    dispatches: Iterable[TaskDispatch],
+    tasks_by_id: dict[str, dict],
+    path: str = DEFAULT_HISTORY,
+) -> int:
+    """Append LLM dispatches with the task fields they were based on; return the count."""
+    lines = [
+        json.dumps({"task": tasks_by_id[d.task_id], "dispatch": d.model_dump()}, ensure_ascii=False)
+        for d in dispatches
+        if d.task_id in tasks_by_id
+    ]
+    if lines:
+        history_path = Path(path)
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def history_from_files(
+    decomposed_file: str, dispatched_file: str
+) -> list[tuple[dict, TaskDispatch]]:
+    """(task fields, dispatch) pairs from an existing decomposition and its dispatch output."""
+    with open(decomposed_file, encoding="utf-8") as f:
+        decomposed = json.load(f)
+    with open(dispatched_file, encoding="utf-8") as f:
+        dispatched = json.load(f)
+    tasks = {
+        task["task_id"]: task
+        for story in decomposed.get("stories", [])
+        for task in story.get("tasks", [])
+    }
+    return [
+        (tasks[d["task_id"]], TaskDispatch.model_validate(d))
+        for d in dispatched.get("dispatches", [])
+        if d.get("task_id") in tasks
+    ]
@@ -5,15 +5,28 @@ Mirrors the dual-provider setup in scrumai-forge:
 - Google Genai (existing provider in this repo)
 """
 
+import asyncio
+import bisect
+import hashlib
 import json
 import logging
 import os
 import re
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import Protocol, runtime_checkable
 
+import httpx
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from prompt_registry import get_prompt, prompt_name
 
 load_dotenv()
 
@@ -28,13 +41,180 @@ class LLMClient(Protocol):
         ...
 
 
+@runtime_checkable
+class AsyncLLMClient(Protocol):
+    """Protocol for LLM clients that can overlap requests on an event loop."""
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        """Send a chat request without blocking the event loop."""
+        ...
+
+
+@runtime_checkable
+class StreamingLLMClient(Protocol):
+    """Protocol for LLM clients that can yield the response as it is generated."""
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        """Send a chat request and yield text chunks as they arrive."""
+        ...
+
+
+def stream_chat(
+    client: LLMClient, system_prompt: str, messages: list[dict[str, str]]
+) -> Iterator[str]:
+    """Yield response chunks, falling back to a single chunk for non-streaming clients."""
+    if isinstance(client, StreamingLLMClient):
+        yield from client.chat_stream(system_prompt, messages)
+    else:
+        yield client.chat(system_prompt, messages)
+
+
+class _ThreadedAsyncClient:
+    """Adapter running a blocking LLMClient.chat in a worker thread."""
+
+    def __init__(self, inner: LLMClient) -> None:
+        self.inner = inner
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        return await asyncio.to_thread(self.inner.chat, system_prompt, messages)
+
+
+def ensure_async(client: LLMClient) -> AsyncLLMClient:
+    """Return an async view of a client, falling back to a worker thread for sync-only ones."""
+    if isinstance(client, AsyncLLMClient):
+        return client
+    return _ThreadedAsyncClient(client)
+
+
+# ---------------------------------------------------------------------------
+# Per-call usage reporting
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CallUsage:
+    """Usage details reported by provider clients for the call being observed."""
+
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    first_byte: float | None = None  # time.perf_counter() when response headers arrived
+    cached: bool = False
+    cached_prompt_tokens: int | None = None  # prompt tokens read from the provider's cache
+
+
+_current_usage: ContextVar[CallUsage | None] = ContextVar("llm_call_usage", default=None)
+
+
+@contextmanager
+def observe_call(usage: CallUsage) -> Iterator[CallUsage]:
+    """Collect usage reported by provider clients and the HTTP pool into usage."""
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def report_usage(
+    prompt_tokens: int | None = None,
+    completion_tokens: int | None = None,
+    cached: bool = False,
+    cached_prompt_tokens: int | None = None,
+) -> None:
+    """Record token counts (or a cache hit) for the call being observed, if any."""
+    usage = _current_usage.get()
+    if usage is None:
+        return
+    if prompt_tokens is not None:
+        usage.prompt_tokens = prompt_tokens
+    if completion_tokens is not None:
+        usage.completion_tokens = completion_tokens
+    if cached_prompt_tokens is not None:
+        usage.cached_prompt_tokens = cached_prompt_tokens
+    usage.cached = usage.cached or cached
+
+
+def _mark_first_byte(response: httpx.Response) -> None:
+    usage = _current_usage.get()
+    # Ignore error responses so a retried 429 does not count as the first byte
+    if usage is not None and usage.first_byte is None and response.status_code < 400:
+        usage.first_byte = time.perf_counter()
+
+
+async def _amark_first_byte(response: httpx.Response) -> None:
+    _mark_first_byte(response)
+
+
+# ---------------------------------------------------------------------------
+# Shared HTTP connection pool
+# ---------------------------------------------------------------------------
+
+_http_client: httpx.Client | None = None
+_http_client_lock = threading.Lock()
+# httpx async pools are bound to the event loop that opened their connections
+_async_http_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+def _pool_settings() -> dict:
+    """HTTP pool settings, configurable via LLM_MAX_CONNECTIONS / LLM_MAX_KEEPALIVE /
+    LLM_KEEPALIVE_EXPIRY / LLM_HTTP_TIMEOUT."""
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+        ),
+        "timeout": httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", "600")), connect=10.0),
+        "follow_redirects": True,
+    }
+
+
+def shared_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client used by all sync providers."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                **_pool_settings(), event_hooks={"response": [_mark_first_byte]}
+            )
+        return _http_client
+
+
+def shared_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _async_http_clients.get(loop)
+    if pool is None:
+        pool = httpx.AsyncClient(
+            **_pool_settings(), event_hooks={"response": [_amark_first_byte]}
+        )
+        _async_http_clients[loop] = pool
+    return pool
+
+
 class OpenAICompatibleClient:
     """OpenAI-compatible API client.
 
     Supports any OpenAI-compatible endpoint (OpenAI, DeepSeek, Groq, Together, etc.)
     Mirrors: src/lib/openai-client.ts in scrumai-forge
+
+    Prompt caching on these endpoints is automatic for a repeated request prefix, so
+    the runners keep system prompts static (see PromptTemplate.static) and send everything
+    per-request in the messages that follow. Cached prompt tokens are reported from
+    usage.prompt_tokens_details; set OPENAI_STREAM_USAGE=0 for endpoints that reject
+    stream_options.
+
+    The SDK's own retries are disabled (max_retries=0): SchedulingClient retries
+    429/5xx responses itself, within its rate limits, so SDK retries would stack
+    on top of those and bypass the token bucket.
     """
 
+    provider = "openai"
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -48,7 +228,40 @@ class OpenAICompatibleClient:
             "OPENAI_BASE_URL", "https://api.openai.com/v1"
         )
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o")
-        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        self.client = OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=shared_http_client(),
+            max_retries=0,
+        )
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.stream_usage = os.getenv("OPENAI_STREAM_USAGE", "1") != "0"
+
+    def _async_client(self):
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=shared_async_http_client(),
+                max_retries=0,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _report_usage(usage) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        report_usage(
+            usage.prompt_tokens,
+            usage.completion_tokens,
+            cached_prompt_tokens=getattr(details, "cached_tokens", None) or 0,
+        )
 
     def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
         all_messages = [{"role": "system", "content": system_prompt}, *messages]
@@ -57,12 +270,56 @@ class OpenAICompatibleClient:
             messages=all_messages,  # type: ignore[arg-type]
             max_tokens=4096,
         )
+        self._report_usage(response.usage)
+        content = response.choices[0].message.content
+        return content or ""
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        all_messages = [{"role": "system", "content": system_prompt}, *messages]
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=all_messages,  # type: ignore[arg-type]
+            max_tokens=4096,
+            stream=True,
+            **({"stream_options": {"include_usage": True}} if self.stream_usage else {}),
+        )
+        try:
+            for chunk in stream:
+                # With include_usage, the final chunk carries usage and no choices
+                self._report_usage(getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Release the connection if the consumer stops early
+            stream.close()
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        all_messages = [{"role": "system", "content": system_prompt}, *messages]
+        response = await self._async_client().chat.completions.create(
+            model=self.model,
+            messages=all_messages,  # type: ignore[arg-type]
+            max_tokens=4096,
+        )
+        self._report_usage(response.usage)
         content = response.choices[0].message.content
         return content or ""
 
 
 class GoogleGenaiClient:
-    """Google Genai client (existing provider)."""
+    """Google Genai client (existing provider).
+
+    System prompts of at least GEMINI_CACHE_MIN_TOKENS (estimated) are uploaded once
+    as cached contents and referenced by name, so each request only sends its
+    messages. A cache lives for GEMINI_CACHE_TTL seconds and is re-created when it
+    expires; set GEMINI_CONTEXT_CACHE=0 to send the full prompt every time.
+
+    Like the OpenAI client, the SDK makes a single attempt per request and leaves
+    retries to SchedulingClient.
+    """
+
+    provider = "gemini"
 
     def __init__(
         self,
@@ -70,22 +327,167 @@ class GoogleGenaiClient:
         model: str | None = None,
     ) -> None:
         from google import genai
+        from google.genai import types
 
         self.api_key = api_key or os.getenv("GEMINI_API_KEY", "")
         self.model = model or os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
-        self.client = genai.Client(api_key=self.api_key)
-
-    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(
+                httpx_client=shared_http_client(),
+                retry_options=types.HttpRetryOptions(attempts=1),
+            ),
+        )
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.context_cache = os.getenv("GEMINI_CONTEXT_CACHE", "1") != "0"
+        self.cache_min_tokens = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "1024"))
+        self.cache_ttl = int(os.getenv("GEMINI_CACHE_TTL", "3600"))
+        # sha256(system prompt) -> (cached content name, expiry), or None if the
+        # prompt cannot be cached (e.g. model without caching support)
+        self._cached_contents: dict[str, tuple[str, float] | None] = {}
+        self._cache_lock = threading.Lock()
+
+    def _async_client(self):
+        from google import genai
+        from google.genai import types
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(
+                    httpx_client=shared_http_client(),
+                    httpx_async_client=shared_async_http_client(),
+                    retry_options=types.HttpRetryOptions(attempts=1),
+                ),
+            ).aio
+            self._async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _report_usage(response) -> None:
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None:
+            report_usage(
+                metadata.prompt_token_count,
+                metadata.candidates_token_count,
+                cached_prompt_tokens=metadata.cached_content_token_count or 0,
+            )
+
+    @staticmethod
+    def _combine(system_prompt: str, messages: list[dict[str, str]]) -> str:
         # Combine system prompt and messages into a single content string
         parts = [system_prompt]
         for msg in messages:
             role = msg["role"]
             parts.append(f"\n\n[{role.upper()}]: {msg['content']}")
-        combined = "\n".join(parts)
+        return "\n".join(parts)
+
+    def _cached_content(self, system_prompt: str) -> str | None:
+        """Name of the cached content holding system_prompt, creating it if needed."""
+        if not self.context_cache or len(system_prompt) // 4 < self.cache_min_tokens:
+            return None
+        from google.genai import types
+
+        key = hashlib.sha256(system_prompt.encode()).hexdigest()
+        with self._cache_lock:
+            if key in self._cached_contents:
+                entry = self._cached_contents[key]
+                # Leave a margin so a request never references an expiring cache
+                if entry is None or entry[1] - 60 > time.time():
+                    return entry[0] if entry else None
+            try:
+                cache = self.client.caches.create(
+                    model=self.model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_prompt,
+                        display_name=f"scrumai-{prompt_name(system_prompt) or key[:12]}",
+                        ttl=f"{self.cache_ttl}s",
+                    ),
+                )
+            except Exception as e:
+                logger.info("Context caching unavailable for %s: %s", self.model, e)
+                self._cached_contents[key] = None
+                return None
+            logger.debug("Created cached content %s (%d chars)", cache.name, len(system_prompt))
+            self._cached_contents[key] = (cache.name, time.time() + self.cache_ttl)
+            return cache.name
+
+    def _disable_cached_content(self, system_prompt: str) -> None:
+        """Send system_prompt in full from now on; its cache vanished before expiry."""
+        logger.info("Cached content for %s is gone; sending the full prompt", self.model)
+        with self._cache_lock:
+            self._cached_contents[hashlib.sha256(system_prompt.encode()).hexdigest()] = None
+
+    def _request(
+        self, system_prompt: str, messages: list[dict[str, str]], cache_name: str | None
+    ) -> dict:
+        from google.genai import types
+
+        if cache_name is None:
+            return {"model": self.model, "contents": self._combine(system_prompt, messages)}
+        return {
+            "model": self.model,
+            "contents": self._combine("", messages).lstrip(),
+            "config": types.GenerateContentConfig(cached_content=cache_name),
+        }
+
+    @staticmethod
+    def _cache_missing(error: Exception) -> bool:
+        """Whether a request failed because its cached content expired or was deleted."""
+        from google.genai import errors
+
+        return isinstance(error, errors.ClientError) and error.code in (403, 404)
 
-        response = self.client.models.generate_content(
-            model=self.model, contents=combined
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        cache_name = self._cached_content(system_prompt)
+        try:
+            response = self.client.models.generate_content(
+                **self._request(system_prompt, messages, cache_name)
+            )
+        except Exception as e:
+            if cache_name is None or not self._cache_missing(e):
+                raise
+            self._disable_cached_content(system_prompt)
+            return self.chat(system_prompt, messages)
+        self._report_usage(response)
+        return response.text or ""
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        cache_name = self._cached_content(system_prompt)
+        stream = self.client.models.generate_content_stream(
+            **self._request(system_prompt, messages, cache_name)
         )
+        started = False
+        try:
+            for chunk in stream:
+                started = True
+                # Streamed usage metadata is cumulative, so the last chunk's counts win
+                self._report_usage(chunk)
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            if started or cache_name is None or not self._cache_missing(e):
+                raise
+            self._disable_cached_content(system_prompt)
+            yield from self.chat_stream(system_prompt, messages)
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        # Creating a cache is a one-off blocking request per prompt
+        cache_name = await asyncio.to_thread(self._cached_content, system_prompt)
+        try:
+            response = await self._async_client().models.generate_content(
+                **self._request(system_prompt, messages, cache_name)
+            )
+        except Exception as e:
+            if cache_name is None or not self._cache_missing(e):
+                raise
+            self._disable_cached_content(system_prompt)
+            return await self.achat(system_prompt, messages)
+        self._report_usage(response)
         return response.text or ""
 
 
@@ -120,45 +522,187 @@ def load_prompt(name: str) -> str:
         name: Prompt filename without extension (e.g., "brainstorm", "issue_scoring")
 
     Returns:
-        The prompt template string.
+        The prompt template string (the file contents, placeholders unrendered),
+        read once by the prompt registry. Use get_prompt(name).static or .render()
+        for the text to send to a model.
+
+    Raises:
+        FileNotFoundError: If the prompt file does not exist.
+    """
+    return get_prompt(name).source
+
+
+# Characters that can change brace depth or string state inside a JSON object
+_JSON_SIGNIFICANT = re.compile(r'[{}"\\]')
+
+
+class JsonStreamExtractor:
+    """Incrementally find the first complete top-level JSON object in LLM output.
+
+    Tracks brace depth outside string literals (honouring backslash escapes) across
+    calls, so text is scanned once, chunk by chunk, and the object is available the
+    moment its closing brace arrives. Only the chunks from the current candidate's
+    opening brace on are kept, and they are joined only to parse a closed object.
+    Trailing prose, closing code fences, and brace-delimited prose before the
+    object (e.g. "{placeholder}") are ignored.
+
+    If on_close is set, it is called with (depth, raw_text) whenever a nested object
+    closes (the top-level object is depth 1), so callers can act on completed parts
+    of a response, e.g. one story of a decomposition, before the rest has arrived.
     """
-    prompt_dir = Path(__file__).parent / "prompts"
-    prompt_file = prompt_dir / f"{name}.md"
-    if not prompt_file.exists():
-        raise FileNotFoundError(f"Prompt not found: {prompt_file}")
-    return prompt_file.read_text(encoding="utf-8")
+
+    def __init__(self, on_close: Callable[[int, str], None] | None = None) -> None:
+        self.result: dict | None = None
+        self.end = -1  # offset just past the object's closing brace
+        self.on_close = on_close
+        # Chunks still needed, with the offset of each in the whole text
+        self._chunks: list[str] = []
+        self._offsets: list[int] = []
+        self._length = 0
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._nested_starts: list[int] = []
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def _slice(self, start: int, stop: int) -> str:
+        """Text between two offsets of the whole text."""
+        i = bisect.bisect_right(self._offsets, start) - 1
+        parts = []
+        while i < len(self._chunks) and self._offsets[i] < stop:
+            offset = self._offsets[i]
+            parts.append(self._chunks[i][max(0, start - offset) : stop - offset])
+            i += 1
+        return "".join(parts)
+
+    def feed(self, chunk: str) -> dict | None:
+        """Consume more text; return the object once it is complete."""
+        if self.result is not None:
+            return self.result
+        if chunk:
+            self._offsets.append(self._length)
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+
+        while self._pos < self._length:
+            k = bisect.bisect_right(self._offsets, self._pos) - 1
+            text, offset = self._chunks[k], self._offsets[k]
+            if self._depth == 0:
+                local = text.find("{", self._pos - offset)
+                if local < 0:
+                    self._pos = offset + len(text)
+                    continue
+                self._start, self._depth = offset + local, 1
+                self._pos = self._start + 1
+                self._nested_starts.clear()
+                continue
+
+            match = _JSON_SIGNIFICANT.search(text, self._pos - offset)
+            if match is None:
+                self._pos = offset + len(text)
+                continue
+            ch, i = match.group(), offset + match.start()
+
+            if self._in_string:
+                if ch == "\\":
+                    # Skip the escaped character, which may arrive with the next chunk
+                    self._pos = i + 2
+                    continue
+                if ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+                self._nested_starts.append(i)
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth > 0:
+                    start = self._nested_starts.pop()
+                    if self.on_close is not None:
+                        self.on_close(self._depth + 1, self._slice(start, i + 1))
+                else:
+                    source = self._slice(self._start, i + 1)
+                    try:
+                        candidate = json.loads(source)
+                    except json.JSONDecodeError:
+                        candidate = None
+                    if isinstance(candidate, dict):
+                        self.result, self.end = candidate, i + 1
+                        self._chunks.clear()
+                        self._offsets.clear()
+                        return candidate
+                    # Not JSON: continue at the next opening brace after the rejected
+                    # one, which may start the real object
+                    nested = source.find("{", 1)
+                    self._pos = self._start + nested if nested > 0 else i + 1
+                    continue
+            self._pos = i + 1
+
+        # Text before the current candidate (or all scanned text) is not needed again
+        keep = bisect.bisect_right(self._offsets, self._start if self._depth else self._pos) - 1
+        if keep > 0:
+            del self._chunks[:keep]
+            del self._offsets[:keep]
+        return None
+
+
+# A ```json fenced block, which extract_json() prefers over other objects in the text
+_JSON_FENCE = re.compile(r"```json\s*([\s\S]*?)```")
 
 
 def extract_json(text: str) -> dict | None:
     """Extract JSON from LLM response (handles code blocks or raw JSON).
 
+    An object in a ```json fenced block wins over objects elsewhere in the text.
+
     Mirrors: parseScoreResponse() in src/lib/issue-scorer.ts
     """
-    # Try ```json code block first
-    json_match = re.search(r"```json\s*([\s\S]*?)```", text)
-    if json_match:
-        try:
-            return json.loads(json_match.group(1))
-        except json.JSONDecodeError:
-            pass
+    fence = _JSON_FENCE.search(text)
+    if fence is not None:
+        data = JsonStreamExtractor().feed(fence.group(1))
+        if data is not None:
+            return data
+    return JsonStreamExtractor().feed(text)
 
-    # Try raw JSON object
-    json_match = re.search(r"\{[\s\S]*\}", text)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except json.JSONDecodeError:
-            pass
 
-    return None
+# Callbacks run after every structured parse with (model name, response text,
+# JSON extraction seconds, validation seconds). Validation includes any schema repair.
+PARSE_HOOKS: list[Callable[[str, str, float, float], None]] = []
+
+# Callbacks run with the response text when a structured parse fails for good (no
+# JSON, or still invalid after repair), e.g. to drop the response from a cache
+PARSE_FAILURE_HOOKS: list[Callable[[str], None]] = []
 
 
-def parse_structured_response[T: BaseModel](text: str, model_class: type[T]) -> T:
+def _report_parse(
+    model_class: type[BaseModel], text: str, parse_seconds: float, validate_seconds: float
+) -> None:
+    for hook in PARSE_HOOKS:
+        hook(model_class.__name__, text, parse_seconds, validate_seconds)
+
+
+def _report_parse_failure(text: str) -> None:
+    for hook in PARSE_FAILURE_HOOKS:
+        hook(text)
+
+
+def parse_structured_response[T: BaseModel](
+    text: str, model_class: type[T], repair_client: LLMClient | None = None
+) -> T:
     """Parse LLM response into a Pydantic model.
 
+    Data that fails validation goes through the repair pipeline in repair.py: cheap
+    local fixes first, then (if repair_client is given) one small fix-up request.
+
     Args:
         text: Raw LLM response text
         model_class: Pydantic model class to validate against
+        repair_client: Client for the LLM fix-up request, if local fixes are not enough
 
     Returns:
         Validated Pydantic model instance
@@ -166,7 +710,46 @@ def parse_structured_response[T: BaseModel](text: str, model_class: type[T]) ->
     Raises:
         ValueError: If JSON cannot be extracted or fails validation
     """
+    start = time.perf_counter()
     data = extract_json(text)
-    if data is None:
-        raise ValueError(f"No valid JSON found in response:\n{text[:500]}")
-    return model_class.model_validate(data)
+    parsed = time.perf_counter()
+    try:
+        if data is None:
+            _report_parse_failure(text)
+            raise ValueError(f"No valid JSON found in response:\n{text[:500]}")
+        return model_class.model_validate(data)
+    except ValidationError as e:
+        from repair import repair
+
+        try:
+            return repair(data, model_class, e, repair_client)
+        except Exception:
+            _report_parse_failure(text)
+            raise
+    finally:
+        _report_parse(model_class, text, parsed - start, time.perf_counter() - parsed)
+
+
+async def aparse_structured_response[T: BaseModel](
+    text: str, model_class: type[T], repair_client: LLMClient | None = None
+) -> T:
+    """Async variant of parse_structured_response(); the fix-up request uses achat()."""
+    start = time.perf_counter()
+    data = extract_json(text)
+    parsed = time.perf_counter()
+    try:
+        if data is None:
+            _report_parse_failure(text)
+            raise ValueError(f"No valid JSON found in response:\n{text[:500]}")
+        return model_class.model_validate(data)
+    except ValidationError as e:
+        from repair import arepair
+
+        client = ensure_async(repair_client) if repair_client is not None else None
+        try:
+            return await arepair(data, model_class, e, client)
+        except Exception:
+            _report_parse_failure(text)
+            raise
+    finally:
+        _report_parse(model_class, text, parsed - start, time.perf_counter() - parsed)
@@ -0,0 +1,204 @@
+"""Deterministic execution planning over the decomposed task graph.
+
+Builds the dependency DAG from TaskDecompositionResult.stories[*].tasks and derives
+the ExecutionPlan locally instead of asking the LLM for it:
+- phases: topological levels (Kahn's algorithm), each runnable in parallel
+- critical_path: longest path weighted by estimate_hours
+- total_estimated_hours: sum of all task estimates
+
+Graph construction and traversal are O(V + E); phases are additionally sorted
+into decomposition order.
+"""
+
+from dataclasses import dataclass, field
+
+from models.task import ExecutionPhase, ExecutionPlan, Task, TaskDecompositionResult
+
+
+class TaskGraphError(ValueError):
+    """Raised when the task graph cannot be planned (duplicate ids or cycles)."""
+
+
+@dataclass
+class TaskGraph:
+    """Dependency graph of decomposed tasks.
+
+    Attributes:
+        tasks: task_id → Task, in decomposition order
+        dependents: task_id → ids of tasks that depend on it
+        dependencies: task_id → ids of tasks it depends on (dangling edges removed)
+        dangling: (task_id, missing dependency id) pairs that were dropped
+    """
+
+    tasks: dict[str, Task]
+    dependents: dict[str, list[str]]
+    dependencies: dict[str, list[str]]
+    dangling: list[tuple[str, str]] = field(default_factory=list)
+
+
+def build_task_graph(result: TaskDecompositionResult) -> TaskGraph:
+    """Build the task DAG, dropping (and recording) dependencies on unknown tasks."""
+    tasks: dict[str, Task] = {}
+    for story in result.stories:
+        for task in story.tasks:
+            if task.task_id in tasks:
+                raise TaskGraphError(f"Duplicate task_id: {task.task_id}")
+            tasks[task.task_id] = task
+
+    dependents: dict[str, list[str]] = {task_id: [] for task_id in tasks}
+    dependencies: dict[str, list[str]] = {}
+    dangling: list[tuple[str, str]] = []
+    for task_id, task in tasks.items():
+        deps: list[str] = []
+        for dep_id in dict.fromkeys(task.dependencies):
+            if dep_id not in tasks:
+                dangling.append((task_id, dep_id))
+                continue
+            deps.append(dep_id)
+            dependents[dep_id].append(task_id)
+        dependencies[task_id] = deps
+
+    return TaskGraph(tasks, dependents, dependencies, dangling)
+
+
+def _find_cycle(graph: TaskGraph, remaining: set[str]) -> list[str]:
+    """Return one dependency cycle among tasks Kahn's algorithm could not schedule."""
+    state: dict[str, int] = {}  # 1 = on stack, 2 = done
+    for start in remaining:
+        if start in state:
+            continue
+        stack: list[tuple[str, int]] = [(start, 0)]
+        path: list[str] = []
+        while stack:
+            node, i = stack.pop()
+            if i == 0:
+                state[node] = 1
+                path.append(node)
+            deps = [d for d in graph.dependencies[node] if d in remaining]
+            if i < len(deps):
+                stack.append((node, i + 1))
+                dep = deps[i]
+                if state.get(dep) == 1:
+                    return path[path.index(dep):] + [dep]
+                if dep not in state:
+                    stack.append((dep, 0))
+            else:
+                state[node] = 2
+                path.pop()
+    return sorted(remaining)
+
+
+def topological_phases(graph: TaskGraph) -> list[list[str]]:
+    """Group tasks into phases where every task depends only on earlier phases.
+
+    Raises:
+        TaskGraphError: If the dependencies contain a cycle
+    """
+    indegree = {task_id: len(deps) for task_id, deps in graph.dependencies.items()}
+    order = {task_id: i for i, task_id in enumerate(graph.tasks)}
+    current = [task_id for task_id in graph.tasks if indegree[task_id] == 0]
+    phases: list[list[str]] = []
+    scheduled = 0
+    while current:
+        phases.append(current)
+        scheduled += len(current)
+        ready: list[str] = []
+        for task_id in current:
+            for dependent in graph.dependents[task_id]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        # Keep decomposition order within a phase
+        current = sorted(ready, key=order.__getitem__)
+
+    if scheduled < len(graph.tasks):
+        remaining = {task_id for task_id, n in indegree.items() if n > 0}
+        cycle = _find_cycle(graph, remaining)
+        raise TaskGraphError(f"Dependency cycle: {' → '.join(cycle)}")
+    return phases
+
+
+def critical_path(graph: TaskGraph, phases: list[list[str]]) -> list[str]:
+    """Longest dependency chain weighted by estimate_hours (ties broken by length)."""
+    best: dict[str, tuple[float, int]] = {}
+    previous: dict[str, str | None] = {}
+    for phase in phases:
+        for task_id in phase:
+            hours = graph.tasks[task_id].estimate_hours or 0.0
+            best_dep: str | None = None
+            best_cost = (0.0, 0)
+            for dep_id in graph.dependencies[task_id]:
+                if best[dep_id] > best_cost:
+                    best_cost, best_dep = best[dep_id], dep_id
+            best[task_id] = (best_cost[0] + hours, best_cost[1] + 1)
+            previous[task_id] = best_dep
+
+    if not best:
+        return []
+    node: str | None = max(best, key=best.__getitem__)
+    path: list[str] = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1]
+
+
+def build_execution_plan(result: TaskDecompositionResult) -> tuple[ExecutionPlan, TaskGraph]:
+    """Compute the execution plan for a decomposition from its task dependencies.
+
+    Returns:
+        The plan, and the graph (whose `dangling` lists dropped dependencies)
+
+    Raises:
+        TaskGraphError: On duplicate task ids or dependency cycles
+    """
+    graph = build_task_graph(result)
+    phases = topological_phases(graph)
+    plan_phases = [
+        ExecutionPhase(
+            phase=i,
+            parallel_tasks=task_ids,
+            description=(
+                "Tasks with no dependencies"
+                if i == 1
+                else f"Tasks unblocked once phase {i - 1} is complete"
+            ),
+        )
+        for i, task_ids in enumerate(phases, 1)
+    ]
+    total_hours = sum(t.estimate_hours or 0.0 for t in graph.tasks.values())
+    plan = ExecutionPlan(
+        phases=plan_phases,
+        total_estimated_hours=total_hours,
+        critical_path=critical_path(graph, phases),
+    )
+    return plan, graph
+
+
+def compare_plans(model_plan: ExecutionPlan, local_plan: ExecutionPlan) -> list[str]:
+    """Describe where a model-generated plan disagrees with the computed one."""
+    issues: list[str] = []
+    model_phase = {t: p.phase for p in model_plan.phases for t in p.parallel_tasks}
+    local_phase = {t: p.phase for p in local_plan.phases for t in p.parallel_tasks}
+    missing = [t for t in local_phase if t not in model_phase]
+    if missing:
+        issues.append(f"Plan omits tasks: {', '.join(missing)}")
+    unknown = [t for t in model_phase if t not in local_phase]
+    if unknown:
+        issues.append(f"Plan references unknown tasks: {', '.join(unknown)}")
+    if len(model_plan.phases) != len(local_plan.phases):
+        issues.append(
+            f"Plan has {len(model_plan.phases)} phases, dependencies allow "
+            f"{len(local_plan.phases)}"
+        )
+    if model_plan.critical_path != local_plan.critical_path:
+        issues.append(
+            f"Critical path differs: {' → '.join(model_plan.critical_path)} vs "
+            f"{' → '.join(local_plan.critical_path)}"
+        )
+    if abs(model_plan.total_estimated_hours - local_plan.total_estimated_hours) > 0.01:
+        issues.append(
+            f"Total hours {model_plan.total_estimated_hours} vs "
+            f"{local_plan.total_estimated_hours} from task estimates"
+        )
+    return issues
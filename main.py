@@ -19,21 +19,62 @@ Usage:
     python main.py score -f ticket.md
     python main.py score -t "Build a login page with email/password auth"
 
+    # Score a directory/glob or JSONL stream of issues concurrently
+    python main.py score --batch "issues/*.md" -o scores.jsonl
+    python main.py score --batch issues.jsonl -j 16 --resume
+
     # Decompose a goal into sub-tasks
     python main.py decompose -f goal.md
     python main.py decompose -t "Implement user authentication system"
 
+    # Run brainstorm → score → decompose → dispatch in one process
+    python main.py pipeline -f ticket.md
+    python main.py pipeline -t "Build a REST API" --skip-brainstorm
+
+    # Record LLM responses once, then benchmark the runners offline
+    python main.py bench --record
+    python main.py bench -n 20 --latency 0.5
+
+    # Check that --help and prompts start without loading heavy modules
+    python main.py bench --startup
+
+    # Keep tasks and dispatches in a SQLite task store instead of JSON files
+    python main.py decompose -f goal.md --store
+    python main.py dispatch --store
+    python main.py store list --status todo --role "Senior Developer"
+    python main.py store export decomposition -o decomposed_task.json
+
+    # Reuse results of near-duplicate tickets scored or decomposed before
+    python main.py score --batch issues.jsonl --reuse-similar
+    python main.py decompose -f goal.md --reuse-similar --similarity 0.9
+
+    # Dispatch by consensus of 3 samples per chunk
+    python main.py dispatch --samples 3
+
+    # Dispatch obvious tasks locally, learning from earlier dispatch output
+    python main.py dispatch --learn-from decomposed_task.json dispatched_task.json
+
     # Specify LLM provider
     python main.py --provider openai brainstorm
     python main.py --provider gemini decompose -f goal.md
+
+    # Bypass or refresh the local response cache
+    python main.py --no-cache score -f ticket.md
+    python main.py --refresh-cache dispatch
 """
 
 import argparse
 import logging
+import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from client import get_client
+# Modules are imported inside the functions that need them, so --help, argument
+# errors and the prompts command start without loading pydantic or provider SDKs
+# (python main.py bench --startup checks this)
+if TYPE_CHECKING:
+    from client import LLMClient
 
 logging.basicConfig(
     level=logging.INFO,
@@ -43,6 +84,71 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _load_env() -> None:
+    """Load settings from .env into the environment."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _build_client(args: argparse.Namespace) -> "LLMClient":
+    """Create the LLM client for a command.
+
+    The provider client is wrapped in the rate-limit/retry scheduler, then in the
+    response cache (unless disabled) so cache hits never consume quota, and finally
+    in telemetry so every call is recorded, including cache hits and retries.
+
+    With a routes file (--routes or SCRUMAI_ROUTES), every model tier gets this
+    chain and a RoutingClient picks the tier per request.
+    """
+    from client import get_client
+    from scheduler import SchedulingClient
+    from telemetry import TelemetryClient
+
+    _configure_telemetry(args)
+    cache = None
+    if not args.no_cache:
+        from cache import CachedClient, ResponseCache
+
+        cache = ResponseCache()
+
+    def wrap(client: "LLMClient") -> "LLMClient":
+        client = SchedulingClient(client)
+        if cache is not None:
+            client = CachedClient(client, cache, refresh=args.refresh_cache)
+        return TelemetryClient(client)
+
+    routes = args.routes or os.getenv("SCRUMAI_ROUTES")
+    if routes:
+        from router import RoutingClient
+
+        return RoutingClient.from_file(routes, wrap=wrap)
+    return wrap(get_client(args.provider))
+
+
+def _configure_telemetry(args: argparse.Namespace) -> None:
+    """Point the process-wide telemetry at its JSONL file and optional hook."""
+    from telemetry import DEFAULT_TELEMETRY_FILE, TELEMETRY, load_hook
+
+    path = args.telemetry or os.getenv("SCRUMAI_TELEMETRY_FILE", DEFAULT_TELEMETRY_FILE)
+    TELEMETRY.path = Path(path)
+    hook = os.getenv("SCRUMAI_TELEMETRY_HOOK")
+    if hook:
+        TELEMETRY.add_hook(load_hook(hook))
+
+
+def _report_telemetry() -> None:
+    """Flush telemetry and print the per-prompt call summary, if any calls were made."""
+    if "telemetry" not in sys.modules:
+        return
+    from telemetry import TELEMETRY, format_telemetry_summary
+
+    TELEMETRY.close()
+    summary = format_telemetry_summary()
+    if summary:
+        print(f"LLM calls (details in {TELEMETRY.path}):\n{summary}\n")
+
+
 def _read_input(args: argparse.Namespace) -> str | None:
     """Read input from file or text argument."""
     if args.file:
@@ -62,57 +168,268 @@ def cmd_brainstorm(args: argparse.Namespace) -> None:
     """Run the brainstorm command."""
     from runners.brainstorm import run_brainstorm
 
-    client = get_client(args.provider)
+    client = _build_client(args)
     context = _read_input(args)
-    run_brainstorm(client, context)
+    run_brainstorm(client, context, keep_turns=args.keep_turns)
+
+
+def _open_similar(args: argparse.Namespace):
+    """Open the near-duplicate index, or return None with --no-similar."""
+    if args.no_similar:
+        return None
+    from similarity import SimilarityIndex
+
+    return SimilarityIndex(threshold=args.similarity, reuse=args.reuse_similar)
 
 
 def cmd_score(args: argparse.Namespace) -> None:
     """Run the score command."""
-    from runners.scoring import run_scoring
+    from runners.scoring import run_batch_scoring, run_scoring
+
+    client = _build_client(args)
+    similar = _open_similar(args)
+    if args.batch:
+        run_batch_scoring(
+            client,
+            args.batch,
+            output=args.output or "score_results.jsonl",
+            concurrency=args.concurrency,
+            resume=args.resume,
+            similar=similar,
+        )
+        return
 
-    client = get_client(args.provider)
     text = _read_input(args)
     if not text:
-        logger.error("Please provide issue text via -f or -t")
+        logger.error("Please provide issue text via -f, -t or --batch")
         sys.exit(1)
-    run_scoring(client, text)
+    run_scoring(client, text, output=args.output or "score_result.json", similar=similar)
+
+
+def _open_store(args: argparse.Namespace):
+    """Open the task store selected with --store, or return None."""
+    if not args.store:
+        return None
+    from store import TaskStore
+
+    return TaskStore(args.store)
 
 
 def cmd_decompose(args: argparse.Namespace) -> None:
     """Run the decompose command."""
     from runners.task import run_decomposition
 
-    client = get_client(args.provider)
+    client = _build_client(args)
     text = _read_input(args)
     if not text:
         # Use default example
         text = "Develop a login page with email/password authentication"
         logger.info("No input provided, using example: %s", text)
-    run_decomposition(client, text, output=args.output)
+    store = _open_store(args)
+    # With a store the JSON file is only written when -o is given explicitly
+    output = args.output or (None if store else "decomposed_task.json")
+    run_decomposition(
+        client,
+        text,
+        output=output,
+        store=store,
+        similar=_open_similar(args),
+        hierarchical=args.hierarchical,
+        concurrency=args.concurrency,
+    )
+
+
+def _build_classifier(args: argparse.Namespace):
+    """Dispatch pre-classifier trained on the history, or None if disabled."""
+    if args.no_classifier:
+        return None
+    from classifier import DispatchClassifier, load_history
+
+    classifier = DispatchClassifier(min_precision=args.min_precision)
+    classifier.fit(load_history(args.history))
+    return classifier
 
 
 def cmd_dispatch(args: argparse.Namespace) -> None:
     """Run the dispatch command."""
-    from runners.dispatch import run_dispatch
+    from classifier import append_history, history_from_files
+    from runners.dispatch import _task_for_prompt, run_dispatch
+
+    if args.learn_from:
+        examples = history_from_files(*args.learn_from)
+        tasks_by_id = {d.task_id: _task_for_prompt(task) for task, d in examples}
+        count = append_history([d for _, d in examples], tasks_by_id, args.history)
+        print(f"Added {count} dispatches to the history: {args.history}")
+
+    classifier = _build_classifier(args)
+    client = _build_client(args)
+    store = _open_store(args)
+    run_dispatch(
+        client,
+        input_file=args.file,
+        output_file=args.output or (None if store else "dispatched_task.json"),
+        chunk_tokens=args.chunk_tokens,
+        concurrency=args.concurrency,
+        incremental=not args.full,
+        store=store,
+        classifier=classifier,
+        history=args.history,
+        samples=args.samples,
+        epic=args.epic,
+    )
 
-    client = get_client(args.provider)
-    run_dispatch(client, input_file=args.file, output_file=args.output)
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Run the serve command."""
+    from server import serve
+    from sessions import SessionStore
+
+    serve(
+        _build_client(args),
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        queue_timeout=args.queue_timeout,
+        request_timeout=args.request_timeout,
+        classifier=_build_classifier(args),
+        sessions=SessionStore(args.sessions),
+    )
+
+
+def cmd_store(args: argparse.Namespace) -> None:
+    """Run the store command."""
+    import json
+
+    from store import TaskStore
+
+    store = TaskStore(args.store)
+    if args.action == "import":
+        for path in args.files:
+            kind = store.import_json(path, args.epic)
+            print(f"Imported {kind}: {path}")
+    elif args.action == "export":
+        if args.kind == "decomposition":
+            result = store.export_decomposition(args.epic)
+        else:
+            result = store.export_dispatch(epic_title=args.epic)
+        text = json.dumps(result.model_dump(), indent=2, ensure_ascii=False)
+        if args.output:
+            Path(args.output).write_text(text, encoding="utf-8")
+            print(f"Exported {args.kind} to: {args.output}")
+        else:
+            print(text)
+    elif args.action == "list":
+        tasks = (
+            store.ready_tasks(args.epic)
+            if args.ready
+            else store.find_tasks(
+                status=args.status, role=args.role, owner_type=args.owner_type,
+                story_id=args.story, epic_title=args.epic,
+            )
+        )
+        for task in tasks:
+            deps = f"  <- {', '.join(task.dependencies)}" if task.dependencies else ""
+            print(f"{task.task_id:<12} {task.status:<12} {task.role:<18} {task.title}{deps}")
+        print(f"\n{len(tasks)} tasks")
+    elif args.action == "status":
+        store.set_status(args.task_id, args.status, args.reason, args.epic)
+        print(f"{args.task_id}: {args.status}")
+    store.close()
+
+
+def cmd_pipeline(args: argparse.Namespace) -> None:
+    """Run the pipeline command."""
+    from runners.pipeline import run_pipeline
+
+    client = _build_client(args)
+    context = _read_input(args)
+    if args.skip_brainstorm and not context:
+        logger.error("Please provide the goal via -f or -t when using --skip-brainstorm")
+        sys.exit(1)
+    run_pipeline(
+        client,
+        context,
+        brainstorm=not args.skip_brainstorm,
+        output_dir=args.output_dir,
+        chunk_tokens=args.chunk_tokens,
+        concurrency=args.concurrency,
+        classifier=_build_classifier(args),
+        history=args.history,
+    )
+
+
+def cmd_bench(args: argparse.Namespace) -> None:
+    """Run the bench command."""
+    if args.startup:
+        from runners.startup import run_startup_benchmark
+
+        if not run_startup_benchmark(args.iterations, args.budget_ms, args.output):
+            sys.exit(1)
+        return
+
+    from replay import ReplayClient
+    from runners.benchmark import run_benchmark
+
+    if args.record:
+        client = ReplayClient(args.fixtures, inner=_build_client(args))
+    else:
+        client = ReplayClient(
+            args.fixtures, latency=args.latency, chars_per_second=args.chars_per_second
+        )
+    run_benchmark(
+        client,
+        scenarios=args.scenarios,
+        text=_read_input(args),
+        iterations=args.iterations,
+        brainstorm_rounds=args.rounds,
+        output=args.output,
+    )
 
 
 def cmd_list_prompts(_args: argparse.Namespace) -> None:
     """List all available prompts."""
-    prompts_dir = Path(__file__).parent / "prompts"
+    from prompt_registry import PROMPTS
+
     print("\nAvailable prompts:")
     print("=" * 40)
-    for prompt_file in sorted(prompts_dir.glob("*.md")):
-        name = prompt_file.stem
-        # Read first line as description
-        first_line = prompt_file.read_text(encoding="utf-8").split("\n")[0].strip()
-        print(f"  {name:<25} {first_line[:50]}")
+    for template in PROMPTS.all():
+        placeholders = ", ".join(template.placeholders) or "-"
+        print(f"  {template.name:<25} {template.version}  {template.description[:50]}")
+        print(f"  {'':<25} placeholders: {placeholders}")
     print()
 
 
+def _add_similar_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--reuse-similar", action="store_true",
+        help="Reuse the result of a near-duplicate earlier ticket instead of calling the LLM",
+    )
+    parser.add_argument(
+        "--similarity", type=float, default=0.8,
+        help="Minimum word-bigram Jaccard similarity of a near-duplicate (default: 0.8)",
+    )
+    parser.add_argument(
+        "--no-similar", action="store_true",
+        help="Neither look up nor index results in the near-duplicate index",
+    )
+
+
+def _add_classifier_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--no-classifier", action="store_true",
+        help="Send every task to the LLM instead of dispatching obvious ones locally",
+    )
+    parser.add_argument(
+        "--history", default=".scrumai_cache/dispatch_history.jsonl",
+        help="Dispatch history the local classifier learns from "
+             "(default: .scrumai_cache/dispatch_history.jsonl)",
+    )
+    parser.add_argument(
+        "--min-precision", type=float, default=0.9,
+        help="Held-out precision the classifier must reach to dispatch locally (default: 0.9)",
+    )
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="ScrumAI Prompt Playground - Debug and test AI prompts locally",
@@ -122,9 +439,14 @@ Examples:
   python main.py brainstorm                    Interactive brainstorm
   python main.py brainstorm -f ticket.md       Brainstorm with ticket context
   python main.py score -f ticket.md            Score issue readiness
+  python main.py score --batch issues.jsonl    Score a batch of issues concurrently
   python main.py decompose -t "Build a REST API"  Decompose a goal
   python main.py dispatch                          Dispatch roles for tasks
   python main.py dispatch -f decomposed_task.json  Dispatch with explicit input
+  python main.py pipeline -f ticket.md         Brainstorm, score, decompose and dispatch
+  python main.py store list --ready            List tasks ready to start
+  python main.py bench                         Benchmark runners on recorded responses
+  python main.py serve --port 8765             Serve the flows over local HTTP
   python main.py prompts                       List available prompts
         """,
     )
@@ -134,6 +456,28 @@ Examples:
         default=None,
         help="LLM provider (default: auto-detect from env vars)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the local response cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached responses and overwrite them with fresh ones",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="PATH",
+        help="JSONL file for per-call telemetry (default: .scrumai_cache/telemetry.jsonl)",
+    )
+
+    parser.add_argument(
+        "--routes",
+        metavar="PATH",
+        help="Route each prompt to a model tier per this JSON file "
+             "(default: $SCRUMAI_ROUTES; see model_routes.example.json)",
+    )
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
@@ -143,6 +487,10 @@ Examples:
     )
     p_brainstorm.add_argument("-f", "--file", help="File with ticket context")
     p_brainstorm.add_argument("-t", "--task", help="Ticket context as text")
+    p_brainstorm.add_argument(
+        "--keep-turns", type=int, default=2,
+        help="Rounds sent verbatim each turn; older rounds are compacted (default: 2)",
+    )
     p_brainstorm.set_defaults(func=cmd_brainstorm)
 
     # score
@@ -151,6 +499,24 @@ Examples:
     )
     p_score.add_argument("-f", "--file", help="File with issue text")
     p_score.add_argument("-t", "--task", help="Issue text")
+    p_score.add_argument(
+        "--batch",
+        metavar="SOURCE",
+        help="Score many issues: a directory, glob, JSONL file, or '-' for JSONL on stdin",
+    )
+    p_score.add_argument(
+        "-o", "--output",
+        help="Output file (default: score_result.json, or score_results.jsonl with --batch)",
+    )
+    p_score.add_argument(
+        "-j", "--concurrency", type=int, default=8,
+        help="Maximum concurrent scoring requests in batch mode (default: 8)",
+    )
+    p_score.add_argument(
+        "--resume", action="store_true",
+        help="Skip issues already scored in the batch output file and append new results",
+    )
+    _add_similar_arguments(p_score)
     p_score.set_defaults(func=cmd_score)
 
     # decompose
@@ -160,8 +526,28 @@ Examples:
     p_decompose.add_argument("-f", "--file", help="File with goal description")
     p_decompose.add_argument("-t", "--task", help="Goal description as text")
     p_decompose.add_argument(
-        "-o", "--output", default="decomposed_task.json", help="Output JSON file"
+        "-o", "--output",
+        help="Output JSON file (default: decomposed_task.json, or none with --store)",
+    )
+    p_decompose.add_argument(
+        "--store", nargs="?", const="scrumai_tasks.db", metavar="DB",
+        help="Upsert the result into a task store (default DB: scrumai_tasks.db)",
+    )
+    mode = p_decompose.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--hierarchical", action="store_true", default=None,
+        help="Outline stories first, then expand each story in its own call "
+             "(default for goals of 8000+ characters)",
+    )
+    mode.add_argument(
+        "--flat", dest="hierarchical", action="store_false",
+        help="Decompose in a single call, however long the goal",
     )
+    p_decompose.add_argument(
+        "-j", "--concurrency", type=int, default=4,
+        help="Stories expanded concurrently in hierarchical mode (default: 4)",
+    )
+    _add_similar_arguments(p_decompose)
     p_decompose.set_defaults(func=cmd_decompose)
 
     # dispatch
@@ -173,11 +559,172 @@ Examples:
         help="Input JSON file with decomposed tasks (default: decomposed_task.json)",
     )
     p_dispatch.add_argument(
-        "-o", "--output", default="dispatched_task.json",
-        help="Output JSON file (default: dispatched_task.json)",
+        "-o", "--output",
+        help="Output JSON file (default: dispatched_task.json, or none with --store)",
+    )
+    p_dispatch.add_argument(
+        "--store", nargs="?", const="scrumai_tasks.db", metavar="DB",
+        help="Read tasks from and write dispatches to a task store instead of JSON files",
+    )
+    p_dispatch.add_argument(
+        "--epic", help="Epic title in the task store (default: most recently updated)"
+    )
+    p_dispatch.add_argument(
+        "--chunk-tokens", type=int, default=3000,
+        help="Estimated output-token budget per dispatch chunk (default: 3000)",
+    )
+    p_dispatch.add_argument(
+        "-j", "--concurrency", type=int, default=4,
+        help="Maximum concurrent chunk requests (default: 4)",
+    )
+    p_dispatch.add_argument(
+        "--samples", type=int, default=1, metavar="K",
+        help="Dispatch each chunk by consensus of up to K samples: two first, and "
+             "the rest only if those two disagree (default: 1)",
+    )
+    p_dispatch.add_argument(
+        "--full", action="store_true",
+        help="Re-evaluate every task instead of reusing unchanged dispatches from the output file",
+    )
+    _add_classifier_arguments(p_dispatch)
+    p_dispatch.add_argument(
+        "--learn-from", nargs=2, metavar=("DECOMPOSED", "DISPATCHED"),
+        help="Add an existing decomposition/dispatch output pair to the history first",
     )
     p_dispatch.set_defaults(func=cmd_dispatch)
 
+    # pipeline
+    p_pipeline = subparsers.add_parser(
+        "pipeline", help="Brainstorm, score, decompose and dispatch in one run"
+    )
+    p_pipeline.add_argument("-f", "--file", help="File with ticket context")
+    p_pipeline.add_argument("-t", "--task", help="Ticket context as text")
+    p_pipeline.add_argument(
+        "--skip-brainstorm", action="store_true",
+        help="Use the -f/-t text as the goal instead of brainstorming it first",
+    )
+    p_pipeline.add_argument(
+        "-o", "--output-dir", default=".",
+        help="Directory for score_result.json, decomposed_task.json and dispatched_task.json",
+    )
+    p_pipeline.add_argument(
+        "--chunk-tokens", type=int, default=3000,
+        help="Estimated output-token budget per dispatch chunk (default: 3000)",
+    )
+    p_pipeline.add_argument(
+        "-j", "--concurrency", type=int, default=4,
+        help="Maximum concurrent dispatch requests (default: 4)",
+    )
+    _add_classifier_arguments(p_pipeline)
+    p_pipeline.set_defaults(func=cmd_pipeline)
+
+    # store
+    p_store = subparsers.add_parser(
+        "store", help="Import, export and query the SQLite task store"
+    )
+    p_store.add_argument(
+        "--store", default="scrumai_tasks.db", metavar="DB",
+        help="Task store database (default: scrumai_tasks.db)",
+    )
+    store_actions = p_store.add_subparsers(dest="action", required=True)
+    p_store_import = store_actions.add_parser(
+        "import", help="Import decomposed_task.json / dispatched_task.json files"
+    )
+    p_store_import.add_argument("files", nargs="+", help="JSON files to import")
+    p_store_import.add_argument(
+        "--epic", help="Epic of imported dispatches (default: most recently updated)"
+    )
+    p_store_export = store_actions.add_parser("export", help="Export to the JSON formats")
+    p_store_export.add_argument("kind", choices=["decomposition", "dispatch"])
+    p_store_export.add_argument("--epic", help="Epic title (default: most recently updated)")
+    p_store_export.add_argument("-o", "--output", help="Output JSON file (default: stdout)")
+    p_store_list = store_actions.add_parser("list", help="List tasks matching filters")
+    p_store_list.add_argument("--status", choices=["todo", "in_progress", "blocked", "done"])
+    p_store_list.add_argument("--role", help='Role, e.g. "Senior Developer"')
+    p_store_list.add_argument("--owner-type", choices=["human", "ai"])
+    p_store_list.add_argument("--story", help="Story id")
+    p_store_list.add_argument("--epic", help="Epic title (default: most recently updated)")
+    p_store_list.add_argument(
+        "--ready", action="store_true",
+        help="Only to-do tasks whose dependencies are all done",
+    )
+    p_store_status = store_actions.add_parser("status", help="Update a task's status")
+    p_store_status.add_argument("task_id")
+    p_store_status.add_argument("status", choices=["todo", "in_progress", "blocked", "done"])
+    p_store_status.add_argument("--reason", help="Blocker reason (for blocked)")
+    p_store_status.add_argument("--epic", help="Epic title (default: most recently updated)")
+    p_store.set_defaults(func=cmd_store)
+
+    # bench
+    p_bench = subparsers.add_parser(
+        "bench", help="Benchmark the runners offline against recorded responses"
+    )
+    p_bench.add_argument(
+        "scenarios", nargs="*", choices=["score", "decompose", "dispatch", "brainstorm"],
+        help="Scenarios to run (default: all)",
+    )
+    p_bench.add_argument("-f", "--file", help="File with the issue/goal used by every scenario")
+    p_bench.add_argument("-t", "--task", help="Issue/goal text used by every scenario")
+    p_bench.add_argument(
+        "--fixtures", default="fixtures/replay.jsonl",
+        help="JSONL fixture file of recorded responses (default: fixtures/replay.jsonl)",
+    )
+    p_bench.add_argument(
+        "--record", action="store_true",
+        help="Call the configured provider for missing responses and record them",
+    )
+    p_bench.add_argument(
+        "-n", "--iterations", type=int, default=10,
+        help="Timed runs per scenario (default: 10)",
+    )
+    p_bench.add_argument(
+        "--latency", type=float, default=0.0,
+        help="Synthetic seconds before each replayed response starts (default: 0)",
+    )
+    p_bench.add_argument(
+        "--chars-per-second", type=float, default=0.0,
+        help="Synthetic generation rate for replayed responses; 0 = instant (default: 0)",
+    )
+    p_bench.add_argument(
+        "--rounds", type=int, default=5,
+        help="Scripted brainstorm answers before quitting (default: 5)",
+    )
+    p_bench.add_argument(
+        "--startup", action="store_true",
+        help="Benchmark CLI startup instead; exit 1 if it exceeds --budget-ms",
+    )
+    p_bench.add_argument(
+        "--budget-ms", type=float, default=25.0,
+        help="Import time budget for --help and prompts with --startup (default: 25)",
+    )
+    p_bench.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    p_bench.set_defaults(func=cmd_bench)
+
+    # serve
+    p_serve = subparsers.add_parser(
+        "serve", help="Serve score/decompose/dispatch/brainstorm over local HTTP"
+    )
+    p_serve.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    p_serve.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    p_serve.add_argument(
+        "-j", "--max-concurrency", type=int, default=16,
+        help="Requests handled at the same time (default: 16)",
+    )
+    p_serve.add_argument(
+        "--queue-timeout", type=float, default=30.0,
+        help="Seconds a request waits for a free slot before 503 (default: 30)",
+    )
+    p_serve.add_argument(
+        "--request-timeout", type=float, default=600.0,
+        help="Seconds a request may run before 504 (default: 600)",
+    )
+    p_serve.add_argument(
+        "--sessions", default=".scrumai_cache/brainstorm_sessions.db", metavar="DB",
+        help="Brainstorm session store (default: .scrumai_cache/brainstorm_sessions.db)",
+    )
+    _add_classifier_arguments(p_serve)
+    p_serve.set_defaults(func=cmd_serve)
+
     # prompts
     p_prompts = subparsers.add_parser("prompts", help="List available prompts")
     p_prompts.set_defaults(func=cmd_list_prompts)
@@ -188,7 +735,27 @@ Examples:
         parser.print_help()
         sys.exit(1)
 
-    args.func(args)
+    if args.command != "prompts":
+        _load_env()
+    try:
+        args.func(args)
+    finally:
+        _report_telemetry()
+
+    # Stats only exist if the command loaded the module
+    if "repair" in sys.modules:
+        from repair import format_repair_stats
+
+        repair_summary = format_repair_stats()
+        if repair_summary:
+            logger.info(repair_summary)
+
+    if "router" in sys.modules:
+        from router import format_route_stats
+
+        route_summary = format_route_stats()
+        if route_summary:
+            logger.info(route_summary)
 
 
 if __name__ == "__main__":
@@ -1,45 +1,46 @@
-"""Pydantic models matching the ScrumAI Forge TypeScript types."""
-
-from models.brainstorm import (
-    BrainstormOption,
-    BrainstormScoring,
-    BrainstormSummary,
-    BrainstormResponse,
-)
-from models.scoring import (
-    DimensionScore,
-    ScoringDimensions,
-    ScoreResult,
-)
-from models.task import (
-    Epic,
-    Task,
-    Story,
-    ExecutionPhase,
-    ExecutionPlan,
-    TaskDecompositionResult,
-)
-from models.role import (
-    RoleFitScoring,
-    TaskDispatch,
-    DispatchResult,
-)
-
-__all__ = [
-    "BrainstormOption",
-    "BrainstormScoring",
-    "BrainstormSummary",
-    "BrainstormResponse",
-    "DimensionScore",
-    "ScoringDimensions",
-    "ScoreResult",
-    "Epic",
-    "Task",
-    "Story",
-    "ExecutionPhase",
-    "ExecutionPlan",
-    "TaskDecompositionResult",
-    "RoleFitScoring",
-    "TaskDispatch",
-    "DispatchResult",
-]
+"""Pydantic models matching the ScrumAI Forge TypeScript types.
+
+Submodules are imported on first attribute access, so importing one model module
+(or only the package) does not load the others.
+"""
+
+import importlib
+
+# Module defining each exported model
+_MODULES = {
+    "BrainstormOption": "models.brainstorm",
+    "BrainstormScoring": "models.brainstorm",
+    "BrainstormSummary": "models.brainstorm",
+    "BrainstormResponse": "models.brainstorm",
+    "DimensionScore": "models.scoring",
+    "ScoringDimensions": "models.scoring",
+    "ScoreResult": "models.scoring",
+    "Epic": "models.task",
+    "Task": "models.task",
+    "Story": "models.task",
+    "ExecutionPhase": "models.task",
+    "ExecutionPlan": "models.task",
+    "TaskDecompositionResult": "models.task",
+    "StoryOutline": "models.task",
+    "DecompositionOutline": "models.task",
+    "StoryExpansion": "models.task",
+    "RoleFitScoring": "models.role",
+    "TaskDispatch": "models.role",
+    "DispatchAgreement": "models.role",
+    "DispatchResult": "models.role",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'models' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
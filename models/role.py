@@ -20,6 +20,22 @@ HUMAN_ROLES = ["Product Owner", "Scrum Master", "Reviewer"]
 ALL_ROLES = AI_ROLES + HUMAN_ROLES
 
 
+def derive_owner_type(total_score: int) -> Literal["human", "ai"]:
+    """0-4 → ai, 5-6 → human."""
+    return "ai" if total_score <= 4 else "human"
+
+
+def derive_autonomy_level(
+    total_score: int,
+) -> Literal["manual", "supervised", "autonomous"]:
+    """0-2 → autonomous, 3-4 → supervised, 5-6 → manual."""
+    if total_score <= 2:
+        return "autonomous"
+    if total_score <= 4:
+        return "supervised"
+    return "manual"
+
+
 class RoleFitScoring(BaseModel):
     """3-dimension delegation scoring adapted from Lubars & Tan (2019).
 
@@ -58,8 +74,28 @@ class TaskDispatch(BaseModel):
     reasoning: str = Field(description="Brief explanation of role assignment")
 
 
+class DispatchAgreement(BaseModel):
+    """How far the samples behind a consensus dispatch agreed."""
+
+    samples: int = Field(description="Samples the consensus was taken over")
+    agreement: float = Field(
+        description="Share of samples with the consensus dimension scores and role"
+    )
+    total_score_range: tuple[int, int] = Field(
+        description="Lowest and highest total_score among the samples"
+    )
+
+
 class DispatchResult(BaseModel):
     """Complete dispatch result for all tasks."""
 
     dispatches: list[TaskDispatch]
     summary: str = Field(description="Overall dispatch summary")
+    task_fingerprints: dict[str, str] = Field(
+        default_factory=dict,
+        description="task_id → hash of the task fields the dispatch was based on",
+    )
+    agreement: dict[str, DispatchAgreement] = Field(
+        default_factory=dict,
+        description="task_id → sample agreement, for tasks dispatched by consensus",
+    )
@@ -85,4 +85,39 @@ class TaskDecompositionResult(BaseModel):
         description="Chain of thought analysis explaining the decomposition"
     )
     stories: list[Story]
-    execution_plan: ExecutionPlan
+    execution_plan: ExecutionPlan | None = Field(
+        default=None,
+        description="Computed locally from task dependencies (see graph.py)",
+    )
+
+
+class StoryOutline(BaseModel):
+    """A story of a hierarchical decomposition before it is expanded into tasks."""
+
+    id: str = Field(description="Story identifier (e.g., STORY-001)")
+    title: str
+    summary: str = Field(
+        default="", description="Scope, requirements and constraints of the story"
+    )
+    depends_on: list[str] = Field(
+        default_factory=list, description="Ids of stories this story depends on"
+    )
+
+
+class DecompositionOutline(BaseModel):
+    """First pass of a hierarchical decomposition: the epic and its story outline."""
+
+    epic: Epic
+    reasoning: str = Field(
+        description="Chain of thought analysis explaining the outline"
+    )
+    stories: list[StoryOutline]
+
+
+class StoryExpansion(BaseModel):
+    """Second pass of a hierarchical decomposition: the tasks of one story.
+
+    Task ids are local to the story ("T1") until the expansions are merged.
+    """
+
+    tasks: list[Task]
@@ -0,0 +1,163 @@
+"""Compiled prompt templates loaded once from prompts/*.md.
+
+Each template is parsed once into its static text segments and the placeholders
+between them ({name}; {{ and }} are literal braces), so rendering is a single
+join and values are inserted verbatim: braces in a user's goal or in task JSON are
+never interpreted. Every template carries a content hash of its source file, which
+identifies the prompt version in listings and logs.
+
+Usage:
+    template = get_prompt("role_dispatch")
+    template.placeholders   # ("tasks_json",)
+    template.render(tasks_json="[...]")
+    template.static         # system prompt with placeholders pointing to the user message
+"""
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PROMPT_DIR = Path(__file__).parent / "prompts"
+
+# Prompt names keyed on the opening text of each template, so a call's system prompt
+# can be attributed to the prompt it was rendered from
+PROMPT_PREFIX_CHARS = 120
+_prompt_names: dict[str, str] = {}
+
+# {placeholder}, or the {{ / }} escapes for literal braces
+_TEMPLATE_TOKEN = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A parsed prompt: static segments interleaved with named placeholders.
+
+    segments always has one more entry than placeholders; the rendered prompt is
+    segments[0] + value(placeholders[0]) + segments[1] + ...
+    """
+
+    name: str
+    source: str
+    segments: tuple[str, ...]
+    placeholders: tuple[str, ...]
+    sha256: str
+    static: str = field(repr=False)  # system prompt form, see compile_prompt()
+
+    @property
+    def version(self) -> str:
+        """Short content hash, e.g. for prompt listings."""
+        return self.sha256[:12]
+
+    @property
+    def description(self) -> str:
+        """First line of the prompt file."""
+        return self.source.split("\n", 1)[0].strip()
+
+    def render(self, **values: str) -> str:
+        """Fill in every placeholder; values are inserted as-is.
+
+        Raises:
+            KeyError: If a placeholder has no value.
+        """
+        missing = [name for name in self.placeholders if name not in values]
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing values for: {', '.join(missing)}")
+        return _join(self.segments, self.placeholders, values)
+
+
+def register_prompt_name(name: str, template: str) -> None:
+    """Remember which prompt a system prompt starting like template came from."""
+    _prompt_names[template[:PROMPT_PREFIX_CHARS]] = name
+
+
+def prompt_name(system_prompt: str) -> str:
+    """Name of the prompt a system prompt was rendered from, or "" if unknown."""
+    return _prompt_names.get(system_prompt[:PROMPT_PREFIX_CHARS], "")
+
+
+def _join(
+    segments: tuple[str, ...], placeholders: tuple[str, ...], values: dict[str, str]
+) -> str:
+    parts = [segments[0]]
+    for name, segment in zip(placeholders, segments[1:]):
+        parts.append(values[name])
+        parts.append(segment)
+    return "".join(parts)
+
+
+def compile_prompt(name: str, source: str) -> PromptTemplate:
+    """Parse template source into a PromptTemplate."""
+    segments: list[str] = []
+    placeholders: list[str] = []
+    current: list[str] = []
+    pos = 0
+    for match in _TEMPLATE_TOKEN.finditer(source):
+        current.append(source[pos : match.start()])
+        pos = match.end()
+        if match.group(1) is None:
+            current.append(match.group()[0])
+            continue
+        segments.append("".join(current))
+        placeholders.append(match.group(1))
+        current = []
+    current.append(source[pos:])
+    segments.append("".join(current))
+
+    # Placeholders point to the user message, where callers send the variable
+    # values, so every request made with the template shares one system prompt
+    # that providers can cache
+    pointers = {p: f"[{p}: given in the user message]" for p in placeholders}
+    return PromptTemplate(
+        name=name,
+        source=source,
+        segments=tuple(segments),
+        placeholders=tuple(placeholders),
+        sha256=hashlib.sha256(source.encode()).hexdigest(),
+        static=_join(tuple(segments), tuple(placeholders), pointers),
+    )
+
+
+class PromptRegistry:
+    """Loads and compiles each prompt file on first use, then serves it from memory."""
+
+    def __init__(self, directory: Path = PROMPT_DIR) -> None:
+        self.directory = directory
+        self._templates: dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> PromptTemplate:
+        """Return the compiled template for prompts/<name>.md.
+
+        Raises:
+            FileNotFoundError: If the prompt file does not exist.
+        """
+        template = self._templates.get(name)
+        if template is not None:
+            return template
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None:
+                prompt_file = self.directory / f"{name}.md"
+                if not prompt_file.exists():
+                    raise FileNotFoundError(f"Prompt not found: {prompt_file}")
+                template = compile_prompt(name, prompt_file.read_text(encoding="utf-8"))
+                register_prompt_name(name, template.static)
+                self._templates[name] = template
+        return template
+
+    def names(self) -> list[str]:
+        """Names of all prompt files, sorted."""
+        return sorted(path.stem for path in self.directory.glob("*.md"))
+
+    def all(self) -> list[PromptTemplate]:
+        return [self.get(name) for name in self.names()]
+
+
+PROMPTS = PromptRegistry()
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """Compiled template for prompts/<name>.md from the process-wide registry."""
+    return PROMPTS.get(name)
@@ -0,0 +1,301 @@
+"""Schema repair for structured LLM responses that fail Pydantic validation.
+
+Two stages, cheapest first:
+1. Local fixes: clamp out-of-range scores, recompute totals from their dimensions,
+   and re-derive fields that are pure functions of other fields
+   (e.g. TaskDispatch.owner_type / autonomy_level from total_score).
+2. LLM fix-up: a small follow-up request listing only the validation errors, asking
+   for targeted {"path", "value"} fixes that are applied to the original data.
+
+REPAIR_STATS counts how many responses were repaired by each stage.
+"""
+
+import copy
+import json
+import logging
+from collections import Counter
+from collections.abc import Callable
+
+from pydantic import BaseModel, ValidationError
+
+from client import AsyncLLMClient, LLMClient, extract_json
+from models.brainstorm import BrainstormResponse
+from models.role import DispatchResult, TaskDispatch, derive_autonomy_level, derive_owner_type
+from models.scoring import ScoreResult, ScoringDimensions
+from models.task import TaskDecompositionResult
+from prompt_registry import register_prompt_name
+
+logger = logging.getLogger(__name__)
+
+REPAIR_STATS: Counter[str] = Counter()
+
+REPAIR_SYSTEM_PROMPT = (
+    "You fix JSON documents that failed schema validation. You receive only the "
+    "validation errors, each with the path of the invalid field, the error message "
+    "and the offending value or surrounding object. Respond ONLY with JSON of the form "
+    '{"fixes": [{"path": ["field", 0, "subfield"], "value": <corrected value>}]}, '
+    "one fix per error. Keep corrections minimal and consistent with the surrounding data."
+)
+register_prompt_name("schema_repair", REPAIR_SYSTEM_PROMPT)
+
+
+# ---------------------------------------------------------------------------
+# Local fixes
+# ---------------------------------------------------------------------------
+
+
+def _as_int(value) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value))
+    if isinstance(value, str):
+        try:
+            return int(round(float(value.strip())))
+        except ValueError:
+            return None
+    return None
+
+
+def _clamp(value, low: int, high: int):
+    number = _as_int(value)
+    return value if number is None else max(low, min(high, number))
+
+
+def _fix_dimension(dim) -> int | None:
+    """Clamp a DimensionScore in place to 0-2 and return its score."""
+    if not isinstance(dim, dict) or "score" not in dim:
+        return None
+    dim["score"] = _clamp(dim["score"], 0, 2)
+    return dim["score"] if isinstance(dim["score"], int) else None
+
+
+def _fix_score_result(data: dict) -> None:
+    dims = data.get("dimensions")
+    if not isinstance(dims, dict):
+        return
+    scores = [
+        _fix_dimension(dims.get(name))
+        for name in ScoringDimensions.model_fields
+    ]
+    if all(s is not None for s in scores):
+        data["totalScore"] = sum(scores)
+    elif "totalScore" in data:
+        data["totalScore"] = _clamp(data["totalScore"], 0, 10)
+
+
+def _fix_task_dispatch(data: dict) -> None:
+    scoring = data.get("scoring")
+    scores: list[int | None] = [None]
+    if isinstance(scoring, dict):
+        scores = [
+            _fix_dimension(scoring.get(name))
+            for name in ("complexity", "risk", "human_judgment")
+        ]
+    if all(s is not None for s in scores):
+        data["total_score"] = sum(scores)
+    elif "total_score" in data:
+        data["total_score"] = _clamp(data["total_score"], 0, 6)
+
+    total = data.get("total_score")
+    if isinstance(total, int):
+        data["owner_type"] = derive_owner_type(total)
+        data["autonomy_level"] = derive_autonomy_level(total)
+
+
+def _fix_dispatch_result(data: dict) -> None:
+    for dispatch in data.get("dispatches") or []:
+        if isinstance(dispatch, dict):
+            _fix_task_dispatch(dispatch)
+
+
+def _fix_brainstorm_response(data: dict) -> None:
+    if "phase" in data:
+        data["phase"] = _clamp(data["phase"], 1, 4)
+    scoring = data.get("scoring")
+    if not isinstance(scoring, dict):
+        return
+    maxima = {"taskGoal": 3, "completionCriteria": 3, "scope": 2, "constraints": 2}
+    for name, high in maxima.items():
+        if name in scoring:
+            scoring[name] = _clamp(scoring[name], 0, high)
+    if all(isinstance(scoring.get(name), int) for name in maxima):
+        scoring["total"] = sum(scoring[name] for name in maxima)
+
+
+def _fix_decomposition(data: dict) -> None:
+    for story in data.get("stories") or []:
+        if not isinstance(story, dict):
+            continue
+        for task in story.get("tasks") or []:
+            if not isinstance(task, dict):
+                continue
+            for field in ("status", "owner_type"):
+                if isinstance(task.get(field), str):
+                    task[field] = task[field].strip().lower().replace(" ", "_")
+            if task.get("dependencies") is None:
+                task["dependencies"] = []
+
+
+LOCAL_REPAIRS: dict[type[BaseModel], Callable[[dict], None]] = {
+    ScoreResult: _fix_score_result,
+    TaskDispatch: _fix_task_dispatch,
+    DispatchResult: _fix_dispatch_result,
+    BrainstormResponse: _fix_brainstorm_response,
+    TaskDecompositionResult: _fix_decomposition,
+}
+
+
+# ---------------------------------------------------------------------------
+# LLM fix-up
+# ---------------------------------------------------------------------------
+
+
+def _describe_errors(error: ValidationError) -> str:
+    """Compact, JSON-serialisable list of the validation errors."""
+    described = []
+    for err in error.errors():
+        value = err.get("input")
+        encoded = json.dumps(value, ensure_ascii=False, default=str)
+        if len(encoded) > 400:
+            # Too large to include whole; send a truncated rendering instead
+            value = encoded[:400] + "..."
+        described.append({"path": list(err["loc"]), "error": err["msg"], "value": value})
+    return "\n".join(json.dumps(d, ensure_ascii=False, default=str) for d in described)
+
+
+def _build_repair_messages(model_class: type[BaseModel], error: ValidationError) -> list[dict[str, str]]:
+    return [
+        {
+            "role": "user",
+            "content": (
+                f"A {model_class.__name__} response failed validation with these errors:\n"
+                f"{_describe_errors(error)}\n\nReturn the fixes."
+            ),
+        }
+    ]
+
+
+def _apply_fixes(data: dict, raw_fixes: str) -> bool:
+    """Apply {"fixes": [{"path", "value"}]} from the repair response to data."""
+    fixes = (extract_json(raw_fixes) or {}).get("fixes")
+    if not isinstance(fixes, list):
+        return False
+    applied = False
+    for fix in fixes:
+        path = fix.get("path") if isinstance(fix, dict) else None
+        if not path or "value" not in fix:
+            continue
+        target = data
+        try:
+            for key in path[:-1]:
+                target = target[key]
+            target[path[-1]] = fix["value"]
+            applied = True
+        except (KeyError, IndexError, TypeError):
+            logger.debug("Skipping unusable fix path: %s", path)
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+def repair_locally[T: BaseModel](
+    data: dict, model_class: type[T]
+) -> tuple[T | None, dict, ValidationError | None]:
+    """Apply the model's local repairs to a copy of data, without an LLM call.
+
+    Returns (result, repaired data, error): result is None when the model has no
+    local repairs or the repaired data still fails validation (error is then set).
+    """
+    fix = LOCAL_REPAIRS.get(model_class)
+    if fix is None:
+        return None, data, None
+    fixed = copy.deepcopy(data)
+    fix(fixed)
+    try:
+        return model_class.model_validate(fixed), fixed, None
+    except ValidationError as e:
+        return None, fixed, e
+
+
+def repair[T: BaseModel](
+    data: dict,
+    model_class: type[T],
+    error: ValidationError,
+    client: LLMClient | None = None,
+) -> T:
+    """Repair data that failed validation, locally first, then via one LLM fix-up call.
+
+    Raises:
+        ValidationError: If neither stage produces valid data
+    """
+    result, data, local_error = repair_locally(data, model_class)
+    if result is not None:
+        REPAIR_STATS["local"] += 1
+        logger.info("Repaired %s locally", model_class.__name__)
+        return result
+    error = local_error or error
+
+    if client is None:
+        REPAIR_STATS["failed"] += 1
+        raise error
+
+    raw_fixes = client.chat(REPAIR_SYSTEM_PROMPT, _build_repair_messages(model_class, error))
+    return _finish_llm_repair(data, model_class, error, raw_fixes)
+
+
+async def arepair[T: BaseModel](
+    data: dict,
+    model_class: type[T],
+    error: ValidationError,
+    client: AsyncLLMClient | None = None,
+) -> T:
+    """Async variant of repair() for runners that validate inside an event loop."""
+    result, data, local_error = repair_locally(data, model_class)
+    if result is not None:
+        REPAIR_STATS["local"] += 1
+        logger.info("Repaired %s locally", model_class.__name__)
+        return result
+    error = local_error or error
+
+    if client is None:
+        REPAIR_STATS["failed"] += 1
+        raise error
+
+    raw_fixes = await client.achat(
+        REPAIR_SYSTEM_PROMPT, _build_repair_messages(model_class, error)
+    )
+    return _finish_llm_repair(data, model_class, error, raw_fixes)
+
+
+def _finish_llm_repair[T: BaseModel](
+    data: dict, model_class: type[T], error: ValidationError, raw_fixes: str
+) -> T:
+    if not _apply_fixes(data, raw_fixes):
+        REPAIR_STATS["failed"] += 1
+        raise error
+    # Fixed dimensions may change derived totals, so run local fixes again
+    fix = LOCAL_REPAIRS.get(model_class)
+    if fix is not None:
+        fix(data)
+    try:
+        result = model_class.model_validate(data)
+    except ValidationError:
+        REPAIR_STATS["failed"] += 1
+        raise
+    REPAIR_STATS["llm"] += 1
+    logger.info("Repaired %s with an LLM fix-up request", model_class.__name__)
+    return result
+
+
+def format_repair_stats() -> str | None:
+    """One-line summary of repairs made in this process, or None if there were none."""
+    if not REPAIR_STATS:
+        return None
+    return (
+        f"Schema repairs: {REPAIR_STATS['local']} local, {REPAIR_STATS['llm']} LLM, "
+        f"{REPAIR_STATS['failed']} failed"
+    )
@@ -0,0 +1,158 @@
+"""Offline record/replay backend for LLM clients.
+
+ReplayClient serves chat requests from a JSONL fixture file, so the runners can be
+exercised and benchmarked without network access or an API key. In record mode it
+forwards misses to a real client and appends each request/response pair to the
+fixture file.
+
+Fixtures are keyed on system prompt + messages only (not provider or model), so a
+fixture recorded against one provider replays under any provider setting.
+
+Replayed responses can be given synthetic latency: a fixed time to first chunk plus
+an optional generation rate in characters per second.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from cache import cache_key
+from client import LLMClient, ensure_async, extract_json, stream_chat
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES = "fixtures/replay.jsonl"
+STREAM_CHUNK_CHARS = 32
+
+
+class FixtureNotFoundError(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class ReplayClient:
+    """LLMClient that replays recorded responses, optionally recording misses.
+
+    Args:
+        fixtures: Path of the JSONL fixture file.
+        inner: Real client used to record responses; None for pure replay.
+        latency: Synthetic seconds before the first chunk of a replayed response.
+        chars_per_second: Synthetic generation rate for replayed responses; 0 = instant.
+    """
+
+    provider = "replay"
+
+    def __init__(
+        self,
+        fixtures: str = DEFAULT_FIXTURES,
+        inner: LLMClient | None = None,
+        latency: float = 0.0,
+        chars_per_second: float = 0.0,
+    ) -> None:
+        self.path = Path(fixtures).resolve()
+        self.inner = inner
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+        self.model = getattr(inner, "model", "")
+        self.hits = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._responses: dict[str, str] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._responses[record["key"]] = record["response"]
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    @staticmethod
+    def _key(system_prompt: str, messages: list[dict[str, str]]) -> str:
+        return cache_key("replay", "", system_prompt, messages)
+
+    def _lookup(self, key: str) -> str | None:
+        response = self._responses.get(key)
+        if response is not None:
+            self.hits += 1
+        elif self.inner is None:
+            raise FixtureNotFoundError(
+                f"No recorded response for request {key[:12]} in {self.path}; "
+                "record fixtures first"
+            )
+        return response
+
+    def _record(
+        self, key: str, system_prompt: str, messages: list[dict[str, str]], response: str
+    ) -> None:
+        if not response:
+            return
+        record = {
+            "key": key,
+            "provider": getattr(self.inner, "provider", ""),
+            "model": self.model,
+            "system_prompt": system_prompt,
+            "messages": messages,
+            "response": response,
+        }
+        with self._lock:
+            self._responses[key] = response
+            self.recorded += 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _generation_time(self, response: str) -> float:
+        return len(response) / self.chars_per_second if self.chars_per_second > 0 else 0.0
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        key = self._key(system_prompt, messages)
+        response = self._lookup(key)
+        if response is None:
+            response = self.inner.chat(system_prompt, messages)
+            self._record(key, system_prompt, messages, response)
+            return response
+        time.sleep(self.latency + self._generation_time(response))
+        return response
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        key = self._key(system_prompt, messages)
+        response = self._lookup(key)
+        if response is None:
+            response = await ensure_async(self.inner).achat(system_prompt, messages)
+            self._record(key, system_prompt, messages, response)
+            return response
+        await asyncio.sleep(self.latency + self._generation_time(response))
+        return response
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        key = self._key(system_prompt, messages)
+        response = self._lookup(key)
+        if response is None:
+            chunks: list[str] = []
+            try:
+                for chunk in stream_chat(self.inner, system_prompt, messages):
+                    chunks.append(chunk)
+                    yield chunk
+            except GeneratorExit:
+                # Consumers stop once the JSON object is complete, but also on Ctrl+C,
+                # an error or an abort; only a complete object is worth replaying
+                response = "".join(chunks)
+                if extract_json(response) is not None:
+                    self._record(key, system_prompt, messages, response)
+                raise
+            self._record(key, system_prompt, messages, "".join(chunks))
+            return
+
+        time.sleep(self.latency)
+        delay = self._generation_time(response[:STREAM_CHUNK_CHARS])
+        for i in range(0, len(response), STREAM_CHUNK_CHARS):
+            if delay:
+                time.sleep(delay)
+            yield response[i : i + STREAM_CHUNK_CHARS]
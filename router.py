@@ -0,0 +1,271 @@
+"""Multi-model routing: each prompt goes to the cheapest model tier that handles it.
+
+A routes file names the model tiers and, per prompt name (as attributed by
+prompt_name(), e.g. "issue_scoring"), the tiers to try in order:
+
+    {
+      "tiers": {
+        "fast": {"provider": "gemini", "model": "gemini-2.5-flash"},
+        "strong": {"provider": "openai", "model": "gpt-4o"}
+      },
+      "routes": {
+        "role_dispatch": [{"tier": "fast", "max_input_tokens": 6000}, "strong"],
+        "task_decomposition": ["strong"],
+        "default": ["fast", "strong"]
+      }
+    }
+
+A step with max_input_tokens is skipped for larger requests. Every response but
+the last tier's is checked before it is returned: it must parse and validate (after
+local schema repair) as the prompt's response model and pass the prompt's
+confidence check, e.g. a dispatch must cover every task it was given. Otherwise the
+request escalates to the next tier. Escalations are counted in ROUTE_STATS.
+
+Tiers may also set "base_url" and "api_key_env" to use another OpenAI-compatible
+endpoint. Each tier gets its own client chain (see main._build_client), so the
+scheduler, cache and telemetry see the model that actually served a request.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from client import (
+    GoogleGenaiClient,
+    LLMClient,
+    OpenAICompatibleClient,
+    ensure_async,
+    extract_json,
+    stream_chat,
+)
+from models.brainstorm import BrainstormResponse
+from models.role import DispatchResult
+from models.scoring import ScoreResult
+from models.task import DecompositionOutline, StoryExpansion, TaskDecompositionResult
+from prompt_registry import prompt_name
+from repair import repair_locally
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE = "default"
+
+ROUTE_STATS: Counter[str] = Counter()
+
+# Response model of each prompt, used to check a response before accepting it
+PROMPT_MODELS: dict[str, type[BaseModel]] = {
+    "brainstorm": BrainstormResponse,
+    "issue_scoring": ScoreResult,
+    "task_decomposition": TaskDecompositionResult,
+    "task_outline": DecompositionOutline,
+    "story_expansion": StoryExpansion,
+    "role_dispatch": DispatchResult,
+}
+
+_TASKS_JSON = re.compile(r"tasks_json:\n```json\n(.*?)\n```", re.DOTALL)
+
+
+def _undispatched_tasks(result: DispatchResult, messages: list[dict[str, str]]) -> str | None:
+    match = _TASKS_JSON.search(messages[-1]["content"]) if messages else None
+    if match is None:
+        return None
+    try:
+        task_ids = {task["task_id"] for task in json.loads(match.group(1))}
+    except (ValueError, KeyError, TypeError):
+        return None
+    missing = task_ids - {d.task_id for d in result.dispatches}
+    if missing:
+        return f"{len(missing)} of {len(task_ids)} tasks not dispatched"
+    return None
+
+
+def _no_tasks(result: TaskDecompositionResult | StoryExpansion, _messages) -> str | None:
+    tasks = (
+        result.tasks
+        if isinstance(result, StoryExpansion)
+        else [t for story in result.stories for t in story.tasks]
+    )
+    return None if tasks else "no tasks"
+
+
+# Confidence checks per prompt: (validated response, request messages) -> the
+# reason to escalate, or None to accept the response
+CONFIDENCE_CHECKS: dict[str, Callable[[BaseModel, list[dict[str, str]]], str | None]] = {
+    "role_dispatch": _undispatched_tasks,
+    "task_decomposition": _no_tasks,
+    "story_expansion": _no_tasks,
+}
+
+
+@dataclass(frozen=True)
+class RouteStep:
+    """One tier to try for a prompt, skipped for requests above max_input_tokens."""
+
+    tier: str
+    max_input_tokens: int | None = None
+
+
+def _estimate_tokens(system_prompt: str, messages: list[dict[str, str]]) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return (len(system_prompt) + sum(len(m["content"]) for m in messages)) // 4 + 1
+
+
+def escalation_reason(name: str, response: str, messages: list[dict[str, str]]) -> str | None:
+    """Why a response to prompt name is not good enough, or None to accept it."""
+    model_class = PROMPT_MODELS.get(name)
+    if model_class is None:
+        return None
+    data = extract_json(response)
+    if data is None:
+        return "no JSON in response"
+    try:
+        result = model_class.model_validate(data)
+    except ValidationError as e:
+        result, _, _ = repair_locally(data, model_class)
+        if result is None:
+            return f"{e.error_count()} validation errors"
+    check = CONFIDENCE_CHECKS.get(name)
+    return check(result, messages) if check is not None else None
+
+
+def build_tier_client(spec: dict) -> LLMClient:
+    """Provider client for a tier spec: provider, model, and optionally base_url
+    and api_key_env.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    provider = spec.get("provider", "").lower()
+    api_key = os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None
+    if provider == "openai":
+        return OpenAICompatibleClient(
+            api_key=api_key, base_url=spec.get("base_url"), model=spec.get("model")
+        )
+    if provider in ("gemini", "google"):
+        return GoogleGenaiClient(api_key=api_key, model=spec.get("model"))
+    raise ValueError(f"Unknown provider for model tier: {spec.get('provider')!r}")
+
+
+def _parse_step(step: str | dict) -> RouteStep:
+    if isinstance(step, str):
+        return RouteStep(step)
+    return RouteStep(step["tier"], step.get("max_input_tokens"))
+
+
+class RoutingClient:
+    """LLMClient sending each request to the first tier of its prompt's route that
+    is large enough, escalating along the route when a response fails its checks.
+
+    Args:
+        tiers: Client per tier name.
+        routes: Steps per prompt name; "default" is used for prompts without a route.
+
+    Raises:
+        ValueError: If a route names an unknown tier or there is no default route.
+    """
+
+    provider = "router"
+    model = ""
+
+    def __init__(self, tiers: dict[str, LLMClient], routes: dict[str, list[RouteStep]]) -> None:
+        if DEFAULT_ROUTE not in routes:
+            raise ValueError(f"Routes need a '{DEFAULT_ROUTE}' route")
+        for name, steps in routes.items():
+            if not steps:
+                raise ValueError(f"Route '{name}' has no tiers")
+            unknown = [s.tier for s in steps if s.tier not in tiers]
+            if unknown:
+                raise ValueError(f"Route '{name}' uses unknown tiers: {', '.join(unknown)}")
+        self.tiers = tiers
+        self.routes = routes
+
+    @classmethod
+    def from_file(
+        cls, path: str, wrap: Callable[[LLMClient], LLMClient] | None = None
+    ) -> "RoutingClient":
+        """Load a routes file; wrap (e.g. scheduler, cache, telemetry) is applied to
+        every tier's provider client.
+
+        Raises:
+            FileNotFoundError: If the routes file does not exist.
+        """
+        routes_file = Path(path)
+        if not routes_file.exists():
+            raise FileNotFoundError(f"Routes file not found: {routes_file}")
+        config = json.loads(routes_file.read_text(encoding="utf-8"))
+        tiers = {}
+        for name, spec in config.get("tiers", {}).items():
+            client = build_tier_client(spec)
+            tiers[name] = wrap(client) if wrap is not None else client
+        routes = {
+            name: [_parse_step(step) for step in steps]
+            for name, steps in config.get("routes", {}).items()
+        }
+        return cls(tiers, routes)
+
+    def _steps(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> tuple[str, list[str]]:
+        """The prompt name and the tiers to try for a request, cheapest first."""
+        name = prompt_name(system_prompt)
+        route = self.routes.get(name) or self.routes[DEFAULT_ROUTE]
+        size = _estimate_tokens(system_prompt, messages)
+        tiers = [
+            s.tier for s in route if s.max_input_tokens is None or size <= s.max_input_tokens
+        ]
+        # The last tier takes requests too large for every step
+        return name, tiers or [route[-1].tier]
+
+    def _accept(
+        self, name: str, tier: str, next_tier: str, response: str, messages: list[dict[str, str]]
+    ) -> bool:
+        reason = escalation_reason(name, response, messages)
+        if reason is None:
+            return True
+        ROUTE_STATS[f"{tier}->{next_tier}"] += 1
+        logger.info("Escalating %s from %s to %s: %s", name or "request", tier, next_tier, reason)
+        return False
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        name, tiers = self._steps(system_prompt, messages)
+        for tier, next_tier in zip(tiers, tiers[1:]):
+            response = self.tiers[tier].chat(system_prompt, messages)
+            if self._accept(name, tier, next_tier, response, messages):
+                return response
+        return self.tiers[tiers[-1]].chat(system_prompt, messages)
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        name, tiers = self._steps(system_prompt, messages)
+        for tier, next_tier in zip(tiers, tiers[1:]):
+            response = await ensure_async(self.tiers[tier]).achat(system_prompt, messages)
+            if self._accept(name, tier, next_tier, response, messages):
+                return response
+        return await ensure_async(self.tiers[tiers[-1]]).achat(system_prompt, messages)
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        # Streamed text cannot be taken back, so tiers that may escalate are
+        # asked without streaming and only the last tier streams
+        name, tiers = self._steps(system_prompt, messages)
+        for tier, next_tier in zip(tiers, tiers[1:]):
+            response = self.tiers[tier].chat(system_prompt, messages)
+            if self._accept(name, tier, next_tier, response, messages):
+                yield response
+                return
+        yield from stream_chat(self.tiers[tiers[-1]], system_prompt, messages)
+
+
+def format_route_stats() -> str | None:
+    """One-line summary of escalations in this process, or None if there were none."""
+    if not ROUTE_STATS:
+        return None
+    return "Model escalations: " + ", ".join(
+        f"{count}x {step}" for step, count in ROUTE_STATS.most_common()
+    )
@@ -0,0 +1,195 @@
+"""Offline benchmark for the runners, driven by recorded LLM responses.
+
+Each scenario runs one runner end to end against a ReplayClient and reports
+p50/p95 wall time, JSON extraction (parse) time, validation time and peak
+traced memory. Runner console output is suppressed and output files are written
+to a temporary directory.
+
+Record fixtures once with a real provider, then benchmark offline:
+
+Usage:
+    python main.py bench --record
+    python main.py bench -n 20
+    python main.py bench score dispatch --latency 0.5 --chars-per-second 2000
+"""
+
+import contextlib
+import io
+import json
+import logging
+import math
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from client import PARSE_HOOKS
+from replay import FixtureNotFoundError, ReplayClient
+from runners.brainstorm import run_brainstorm
+from runners.dispatch import run_dispatch
+from runners.scoring import run_scoring
+from runners.task import run_decomposition
+
+logger = logging.getLogger(__name__)
+
+# ANSI color codes
+CYAN = "\033[36m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+BOLD = "\033[1m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+SCENARIOS = ("score", "decompose", "dispatch", "brainstorm")
+
+DEFAULT_INPUT = (
+    "Develop a login page with email/password authentication. Users sign in with "
+    "their email and a password of at least 8 characters; after 5 failed attempts the "
+    "account is locked for 15 minutes. Deliver a React form backed by a REST endpoint."
+)
+
+
+def _scripted_answers(max_rounds: int) -> Callable[[str], str]:
+    """Always pick the first option, then quit after max_rounds answers."""
+    answered = {"count": 0}
+
+    def ask(_prompt: str) -> str:
+        answered["count"] += 1
+        return "1" if answered["count"] <= max_rounds else "q"
+
+    return ask
+
+
+def _run_scenario(name: str, client: ReplayClient, text: str, brainstorm_rounds: int) -> None:
+    if name == "score":
+        run_scoring(client, text, output="score_result.json")
+    elif name == "decompose":
+        run_decomposition(client, text, output="decomposed_task.json")
+    elif name == "dispatch":
+        run_dispatch(
+            client, "decomposed_task.json", "dispatched_task.json", incremental=False
+        )
+    elif name == "brainstorm":
+        run_brainstorm(client, text, ask=_scripted_answers(brainstorm_rounds))
+    else:
+        raise ValueError(f"Unknown benchmark scenario: {name}")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _measure(
+    name: str, client: ReplayClient, text: str, iterations: int, brainstorm_rounds: int
+) -> dict:
+    """Time `iterations` runs of one scenario, then one more run for peak memory."""
+    wall: list[float] = []
+    parse: list[float] = []
+    validate: list[float] = []
+    timings = {"parse": 0.0, "validate": 0.0}
+
+    def on_parse(_model: str, _text: str, parse_seconds: float, validate_seconds: float) -> None:
+        timings["parse"] += parse_seconds
+        timings["validate"] += validate_seconds
+
+    PARSE_HOOKS.append(on_parse)
+    try:
+        for _ in range(iterations):
+            timings["parse"] = timings["validate"] = 0.0
+            start = time.perf_counter()
+            _run_scenario(name, client, text, brainstorm_rounds)
+            wall.append(time.perf_counter() - start)
+            parse.append(timings["parse"])
+            validate.append(timings["validate"])
+    finally:
+        PARSE_HOOKS.remove(on_parse)
+
+    tracemalloc.start()
+    try:
+        _run_scenario(name, client, text, brainstorm_rounds)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "runs": iterations,
+        "wall_p50": _percentile(wall, 50),
+        "wall_p95": _percentile(wall, 95),
+        "parse_p50": _percentile(parse, 50),
+        "parse_p95": _percentile(parse, 95),
+        "validate_p50": _percentile(validate, 50),
+        "validate_p95": _percentile(validate, 95),
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def _display_results(results: list[dict]) -> None:
+    print(f"\n{BOLD}{'═' * 78}{RESET}")
+    print(f"{BOLD}  Runner Benchmark{RESET}")
+    print(f"{'═' * 78}")
+    print(
+        f"\n  {DIM}{'scenario':<11} {'runs':>4}  {'wall p50':>9} {'wall p95':>9}  "
+        f"{'parse p50':>9} {'parse p95':>9}  {'valid p50':>9} {'valid p95':>9}  {'peak mem':>9}{RESET}"
+    )
+    for r in results:
+        print(
+            f"  {CYAN}{r['scenario']:<11}{RESET} {r['runs']:>4}  "
+            f"{r['wall_p50'] * 1000:>7.1f}ms {r['wall_p95'] * 1000:>7.1f}ms  "
+            f"{r['parse_p50'] * 1000:>7.2f}ms {r['parse_p95'] * 1000:>7.2f}ms  "
+            f"{r['validate_p50'] * 1000:>7.2f}ms {r['validate_p95'] * 1000:>7.2f}ms  "
+            f"{r['peak_memory_kib']:>6.0f}KiB"
+        )
+
+
+def run_benchmark(
+    client: ReplayClient,
+    scenarios: list[str] | None = None,
+    text: str | None = None,
+    iterations: int = 10,
+    brainstorm_rounds: int = 5,
+    output: str | None = None,
+) -> None:
+    """Benchmark the runners against recorded responses.
+
+    When client is recording (it wraps a real client), every scenario runs once to
+    capture fixtures and no timings are reported.
+    """
+    scenarios = [s for s in SCENARIOS if s in (scenarios or SCENARIOS)]
+    text = text or DEFAULT_INPUT
+    recording = client.inner is not None
+
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as workdir, contextlib.chdir(workdir):
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if "dispatch" in scenarios and "decompose" not in scenarios:
+                    # dispatch reads the decomposition output
+                    _run_scenario("decompose", client, text, brainstorm_rounds)
+                for name in scenarios:
+                    if recording:
+                        _run_scenario(name, client, text, brainstorm_rounds)
+                        continue
+                    # One untimed warm-up run (imports, prompt files, pydantic schemas)
+                    _run_scenario(name, client, text, brainstorm_rounds)
+                    results.append(_measure(name, client, text, iterations, brainstorm_rounds))
+        except FixtureNotFoundError as e:
+            logger.error("%s", e)
+            print(f"\n{RED}Error: {e}{RESET}")
+            print(f"{DIM}Run 'python main.py bench --record' with a provider configured.{RESET}")
+            return
+
+    if recording:
+        print(f"\n  {GREEN}Recorded {client.recorded} responses{RESET} "
+              f"{DIM}({len(client)} fixtures in {client.path}){RESET}\n")
+        return
+
+    _display_results(results)
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n  {DIM}Benchmark results saved to: {output}{RESET}")
+    print()
@@ -14,12 +14,24 @@ Usage:
 import json
 import logging
 import sys
-
-from client import LLMClient, load_prompt, parse_structured_response
+from collections.abc import Callable
+
+from client import (
+    LLMClient,
+    aparse_structured_response,
+    ensure_async,
+    parse_structured_response,
+    stream_chat,
+)
 from models.brainstorm import BrainstormResponse
+from prompt_registry import get_prompt
+from runners.progress import JSON_STRING, StreamWatcher, unescape
 
 logger = logging.getLogger(__name__)
 
+# Rounds sent verbatim each turn; older rounds are folded into a compact state
+DEFAULT_KEEP_TURNS = 2
+
 # ANSI color codes
 CYAN = "\033[36m"
 GREEN = "\033[32m"
@@ -130,6 +142,26 @@ def _display_phase(phase: int) -> None:
     print(f"  Phase: {' → '.join(phases_display)}")
 
 
+def _status_watcher() -> StreamWatcher:
+    """Replace the "Thinking..." line with the phase and question as they stream in."""
+    phase_names = {1: "Context", 2: "Explore", 3: "Solution", 4: "Testing"}
+
+    def on_phase(m) -> None:
+        name = phase_names.get(int(m.group(1)), "")
+        print(f"\r\033[2K{DIM}  Thinking... [{name}]{RESET}", end="", flush=True)
+
+    def on_question(m) -> None:
+        question = unescape(m.group(1))
+        preview = question[:60] + "..." if len(question) > 60 else question
+        print(f"\r\033[2K{DIM}  {preview}{RESET}", end="", flush=True)
+
+    return (
+        StreamWatcher()
+        .on(r'"phase"\s*:\s*([1-4])\b', on_phase)
+        .on(rf'"question"\s*:\s*{JSON_STRING}', on_question)
+    )
+
+
 def _format_user_answer(selected_indices: list[int], other_text: str, options: list[dict]) -> str:
     """Format the user's answer for the conversation.
 
@@ -145,7 +177,102 @@ def _format_user_answer(selected_indices: list[int], other_text: str, options: l
     return "\n".join(parts) if parts else "No selection"
 
 
-def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
+class ConversationCompactor:
+    """Bound the brainstorm prompt by folding old rounds into a structured state.
+
+    The latest keep_turns rounds (assistant question + user answer) are sent
+    verbatim. Earlier rounds are replaced by a JSON state appended to the initial
+    message: the latest clarity scoring plus each answered question with the chosen
+    option values, so per-round input stays roughly constant on long sessions.
+    """
+
+    def __init__(self, keep_turns: int = DEFAULT_KEEP_TURNS) -> None:
+        self.keep_turns = max(0, keep_turns)
+        self.answered: list[dict] = []
+        self.scoring: dict | None = None
+        self.phase: int | None = None
+
+    def state(self) -> dict:
+        """JSON-serializable state, e.g. to persist a session between rounds."""
+        return {
+            "keep_turns": self.keep_turns,
+            "answered": self.answered,
+            "scoring": self.scoring,
+            "phase": self.phase,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ConversationCompactor":
+        compactor = cls(state.get("keep_turns", DEFAULT_KEEP_TURNS))
+        compactor.answered = list(state.get("answered", []))
+        compactor.scoring = state.get("scoring")
+        compactor.phase = state.get("phase")
+        return compactor
+
+    def observe(self, response: BrainstormResponse) -> None:
+        """Track the scoring and phase of the latest parsed response."""
+        self.phase = response.phase
+        if response.scoring is not None:
+            self.scoring = response.scoring.model_dump(exclude={"lowScoreDimensions"})
+
+    def record_answer(
+        self,
+        question: str | None,
+        selected_values: list[str],
+        other_text: str = "",
+    ) -> None:
+        entry: dict = {"phase": self.phase, "question": question, "selected": selected_values}
+        if other_text:
+            entry["other"] = other_text
+        self.answered.append(entry)
+
+    def messages(self, conversation: list[dict[str, str]]) -> list[dict[str, str]]:
+        """The messages to send for the next round."""
+        # conversation = [initial, assistant, user, assistant, user, ...]
+        rounds = (len(conversation) - 1) // 2
+        folded = rounds - self.keep_turns
+        if folded <= 0:
+            return conversation
+        state = {
+            "note": f"Compacted summary of the first {folded} rounds of this session",
+            "phase": self.phase,
+            "latestScoring": self.scoring,
+            "answered": self.answered[:folded],
+        }
+        head = {
+            "role": "user",
+            "content": (
+                conversation[0]["content"]
+                + "\n\n---\nSession state so far (earlier rounds, compacted):\n"
+                + json.dumps(state, ensure_ascii=False)
+            ),
+        }
+        return [head, *conversation[1 + 2 * folded :]]
+
+
+async def abrainstorm_round(
+    client: LLMClient, messages: list[dict[str, str]]
+) -> tuple[BrainstormResponse, str]:
+    """Run one brainstorm round inside an event loop, without console output.
+
+    messages start with the initial user message (see _build_initial_user_message).
+    Returns the parsed response and the raw response text, which is what goes
+    into the conversation as the assistant message.
+
+    Raises:
+        ValueError: If the response cannot be parsed into a BrainstormResponse
+    """
+    raw_response = await ensure_async(client).achat(get_prompt("brainstorm").static, messages)
+    response = await aparse_structured_response(raw_response, BrainstormResponse, client)
+    return response, raw_response
+
+
+def run_brainstorm(
+    client: LLMClient,
+    context: str | None = None,
+    ask: Callable[[str], str] = input,
+    keep_turns: int = DEFAULT_KEEP_TURNS,
+) -> BrainstormResponse | None:
     """Run an interactive brainstorm session.
 
     This mirrors the full brainstorm flow from scrumai-forge:
@@ -153,10 +280,17 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
     2. Loop: display question → get user answer → send to LLM
     3. Display scoring after each response
     4. End when isComplete is true
+
+    ask reads the user's answer for a prompt; pass a scripted function to run
+    the session non-interactively. Only the latest keep_turns rounds are sent
+    verbatim; earlier ones are compacted (see ConversationCompactor).
+
+    Returns the completed response, or None if the session was abandoned.
     """
-    system_prompt = load_prompt("brainstorm")
+    system_prompt = get_prompt("brainstorm").static
     initial_message = _build_initial_user_message(context)
     conversation: list[dict[str, str]] = [{"role": "user", "content": initial_message}]
+    compactor = ConversationCompactor(keep_turns)
 
     print(f"\n{BOLD}{'═' * 60}{RESET}")
     print(f"{BOLD}  ScrumAI Brainstorm Playground{RESET}")
@@ -165,30 +299,35 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
         preview = context[:100] + "..." if len(context) > 100 else context
         print(f"  {DIM}Context: {preview}{RESET}")
 
+    completed: BrainstormResponse | None = None
     round_num = 0
     while True:
         round_num += 1
         print(f"\n{DIM}  Thinking...{RESET}", end="", flush=True)
 
-        raw_response = client.chat(system_prompt, conversation)
-        print("\r" + " " * 40 + "\r", end="")  # Clear "Thinking..."
+        raw_response = _status_watcher().consume(
+            stream_chat(client, system_prompt, compactor.messages(conversation))
+        )
+        print("\r\033[2K", end="")  # Clear "Thinking..."
 
         try:
-            response = parse_structured_response(raw_response, BrainstormResponse)
+            response = parse_structured_response(raw_response, BrainstormResponse, client)
             response_dict = response.model_dump(exclude_none=True)
         except ValueError:
             # Fallback: try to display raw response
             logger.warning("Failed to parse structured response, showing raw output")
             print(f"\n{YELLOW}Raw response:{RESET}\n{raw_response}")
             conversation.append({"role": "assistant", "content": raw_response})
-            user_input = input(f"\n{CYAN}Your response:{RESET} ").strip()
+            user_input = ask(f"\n{CYAN}Your response:{RESET} ").strip()
             if user_input.lower() in ("quit", "exit", "q"):
                 break
             conversation.append({"role": "user", "content": user_input})
+            compactor.record_answer(None, [], user_input)
             continue
 
         # Store assistant response
         conversation.append({"role": "assistant", "content": raw_response})
+        compactor.observe(response)
 
         # Check if complete
         if response.isComplete:
@@ -226,6 +365,7 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
             print(f"\n{DIM}  Structured output saved to: brainstorm_result.json{RESET}")
             with open("brainstorm_result.json", "w") as f:
                 json.dump(response_dict, f, indent=2, ensure_ascii=False)
+            completed = response
             break
 
         # Display phase and question
@@ -244,7 +384,7 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
 
         # Get user input
         print()
-        user_input = input(f"  {CYAN}Your choice (numbers, comma-separated, or text):{RESET} ").strip()
+        user_input = ask(f"  {CYAN}Your choice (numbers, comma-separated, or text):{RESET} ").strip()
 
         if user_input.lower() in ("quit", "exit", "q"):
             print(f"\n{DIM}  Session abandoned.{RESET}")
@@ -260,7 +400,7 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
             try:
                 idx = int(part) - 1
                 if idx == len(options):  # "Other" option
-                    other_text = input(f"  {CYAN}Your custom response:{RESET} ").strip()
+                    other_text = ask(f"  {CYAN}Your custom response:{RESET} ").strip()
                 elif 0 <= idx < len(options):
                     selected_indices.append(idx)
                 else:
@@ -274,5 +414,9 @@ def run_brainstorm(client: LLMClient, context: str | None = None) -> None:
 
         answer = _format_user_answer(selected_indices, other_text, options)
         conversation.append({"role": "user", "content": answer})
+        compactor.record_answer(
+            response.question, [options[i]["value"] for i in selected_indices], other_text
+        )
 
     print()
+    return completed
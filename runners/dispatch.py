@@ -5,18 +5,46 @@ LLM evaluation framework:
   Step 1: 3-dimension delegation scoring → autonomy_level + owner_type
   Step 2: Role classification → recommended_role
 
+Large task lists are split into token-budgeted chunks that are dispatched
+concurrently and merged back into a single DispatchResult. On reruns, tasks
+whose dispatch-relevant fields are unchanged reuse their previous TaskDispatch,
+and obvious tasks can be dispatched locally by the pre-classifier (classifier.py).
+
+In consensus mode every chunk is sampled up to K times and the samples are
+aggregated per task: median dimension scores, majority role, and owner type and
+autonomy level re-derived from the aggregated total. Two samples are requested
+first; the remaining ones are only requested if those two disagree on a task (or
+one of them failed).
+
 Usage:
     python main.py dispatch
     python main.py dispatch -f decomposed_task.json
     python main.py dispatch -f tasks.json -o dispatched.json
+    python main.py dispatch --samples 3
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import statistics
+from collections import Counter
 from pathlib import Path
 
-from client import LLMClient, load_prompt, parse_structured_response
-from models.role import DispatchResult, ALL_ROLES
+from classifier import DispatchClassifier, append_history
+from client import LLMClient, aparse_structured_response, ensure_async
+from models.role import (
+    ALL_ROLES,
+    DispatchAgreement,
+    DispatchResult,
+    RoleFitScoring,
+    TaskDispatch,
+    derive_autonomy_level,
+    derive_owner_type,
+)
+from prompt_registry import get_prompt
+from replay import FixtureNotFoundError
+from store import TaskStore
 
 logger = logging.getLogger(__name__)
 
@@ -43,20 +71,361 @@ AUTONOMY_ICONS = {
     "manual": f"{RED}✋{RESET}",
 }
 
+# Chunk budgets. The completion is capped at max_tokens=4096, and each
+# TaskDispatch (three reasons + reasoning) costs roughly 200 output tokens.
+DEFAULT_CHUNK_TOKENS = 3000
+OUTPUT_TOKENS_PER_TASK = 200
+MAX_INPUT_TOKENS_PER_CHUNK = 6000
+DEFAULT_CONCURRENCY = 4
+
+
+def _task_for_prompt(task: dict) -> dict:
+    """The fields of one decomposed task that are relevant for dispatch."""
+    return {
+        "task_id": task["task_id"],
+        "title": task["title"],
+        "description": task.get("description", ""),
+        "dependencies": task.get("dependencies", []),
+        "acceptance_criteria": task.get("acceptance_criteria", ""),
+    }
+
 
 def _extract_tasks_for_prompt(data: dict) -> list[dict]:
     """Extract task fields relevant for dispatch from decomposed output."""
-    tasks = []
-    for story in data.get("stories", []):
-        for task in story.get("tasks", []):
-            tasks.append({
-                "task_id": task["task_id"],
-                "title": task["title"],
-                "description": task.get("description", ""),
-                "dependencies": task.get("dependencies", []),
-                "acceptance_criteria": task.get("acceptance_criteria", ""),
-            })
-    return tasks
+    return [
+        _task_for_prompt(task)
+        for story in data.get("stories", [])
+        for task in story.get("tasks", [])
+    ]
+
+
+def _fingerprint(task: dict) -> str:
+    """Stable hash of the task fields sent to the model for dispatch."""
+    payload = json.dumps(task, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _load_reusable(
+    output_file: str, fingerprints: dict[str, str]
+) -> dict[str, TaskDispatch]:
+    """Previous dispatches whose task fingerprint still matches the current task."""
+    path = Path(output_file)
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            previous = DispatchResult.model_validate(json.load(f))
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable previous dispatch file %s: %s", output_file, e)
+        return {}
+    return {
+        d.task_id: d
+        for d in previous.dispatches
+        if d.task_id in fingerprints
+        and previous.task_fingerprints.get(d.task_id) == fingerprints[d.task_id]
+    }
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _chunk_tasks(tasks: list[dict], token_budget: int = DEFAULT_CHUNK_TOKENS) -> list[list[dict]]:
+    """Split tasks into consecutive chunks whose dispatch output fits the token budget.
+
+    Order is preserved so that tasks stay next to the tasks they depend on where possible.
+    """
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    output_tokens = input_tokens = 0
+    for task in tasks:
+        task_tokens = _estimate_tokens(json.dumps(task, ensure_ascii=False))
+        if current and (
+            output_tokens + OUTPUT_TOKENS_PER_TASK > token_budget
+            or input_tokens + task_tokens > MAX_INPUT_TOKENS_PER_CHUNK
+        ):
+            chunks.append(current)
+            current, output_tokens, input_tokens = [], 0, 0
+        current.append(task)
+        output_tokens += OUTPUT_TOKENS_PER_TASK
+        input_tokens += task_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _dependency_context(chunk: list[dict], tasks_by_id: dict[str, dict]) -> list[dict]:
+    """Summaries of tasks outside the chunk that tasks in the chunk depend on."""
+    in_chunk = {t["task_id"] for t in chunk}
+    context: list[dict] = []
+    seen: set[str] = set()
+    for task in chunk:
+        for dep_id in task.get("dependencies", []):
+            if dep_id in in_chunk or dep_id in seen or dep_id not in tasks_by_id:
+                continue
+            seen.add(dep_id)
+            context.append({"task_id": dep_id, "title": tasks_by_id[dep_id]["title"]})
+    return context
+
+
+def _build_user_message(chunk: list[dict], context: list[dict]) -> str:
+    # The tasks go here rather than in the system prompt, which stays identical
+    # across chunks so the provider can cache it
+    tasks_json = json.dumps(chunk, indent=2, ensure_ascii=False)
+    message = (
+        f"tasks_json:\n```json\n{tasks_json}\n```\n\n"
+        f"Dispatch roles for these {len(chunk)} tasks."
+    )
+    if context:
+        message += (
+            "\n\nFor context, these tasks depend on the following tasks, which are "
+            "dispatched separately. Do NOT include them in your dispatches:\n"
+            + json.dumps(context, indent=2, ensure_ascii=False)
+        )
+    return message
+
+
+def _sample_message(user_message: str, sample: int) -> str:
+    # Every sample after the first is a distinct request, so it is neither served
+    # the first sample's cached response nor deduplicated by the provider
+    if sample == 0:
+        return user_message
+    return f"{user_message}\n\n(Independent assessment #{sample + 1})"
+
+
+def _dispatch_key(d: TaskDispatch) -> tuple:
+    """The parts of a dispatch that samples have to agree on."""
+    s = d.scoring
+    return (s.complexity.score, s.risk.score, s.human_judgment.score, d.recommended_role)
+
+
+def _unanimous(results: list[DispatchResult], task_ids: list[str]) -> bool:
+    """Whether every result dispatched every task identically."""
+    keys = [{d.task_id: _dispatch_key(d) for d in r.dispatches} for r in results]
+    return all(
+        task_id in keys[0] and all(k.get(task_id) == keys[0][task_id] for k in keys[1:])
+        for task_id in task_ids
+    )
+
+
+def _consensus_dispatch(samples: list[TaskDispatch]) -> tuple[TaskDispatch, DispatchAgreement]:
+    """Aggregate the samples of one task: median dimension scores, majority role,
+    and owner type / autonomy level derived from the aggregated total."""
+    dimensions = {}
+    for name in RoleFitScoring.model_fields:
+        scores = [getattr(d.scoring, name) for d in samples]
+        # Ties between two middle scores go to the higher one (more human oversight)
+        median = statistics.median_high(dim.score for dim in scores)
+        dimensions[name] = next(dim for dim in scores if dim.score == median)
+    scoring = RoleFitScoring(**dimensions)
+    total = sum(dim.score for dim in dimensions.values())
+    # most_common keeps first-seen order among equally common roles
+    role = Counter(d.recommended_role for d in samples).most_common(1)[0][0]
+
+    consensus_key = (*(dim.score for dim in dimensions.values()), role)
+    reasoning = min(
+        (d for d in samples if d.recommended_role == role),
+        key=lambda d: abs(d.total_score - total),
+    ).reasoning
+    dispatch = TaskDispatch(
+        task_id=samples[0].task_id,
+        scoring=scoring,
+        total_score=total,
+        recommended_role=role,
+        owner_type=derive_owner_type(total),
+        autonomy_level=derive_autonomy_level(total),
+        reasoning=reasoning,
+    )
+    totals = [d.total_score for d in samples]
+    agreement = DispatchAgreement(
+        samples=len(samples),
+        agreement=sum(1 for d in samples if _dispatch_key(d) == consensus_key) / len(samples),
+        total_score_range=(min(totals), max(totals)),
+    )
+    return dispatch, agreement
+
+
+def _consensus_result(results: list[DispatchResult], task_ids: list[str]) -> DispatchResult:
+    """Aggregate sampled results of one chunk task by task."""
+    by_task: dict[str, list[TaskDispatch]] = {task_id: [] for task_id in task_ids}
+    for result in results:
+        seen: set[str] = set()
+        for d in result.dispatches:
+            if d.task_id in by_task and d.task_id not in seen:
+                seen.add(d.task_id)
+                by_task[d.task_id].append(d)
+    dispatches, agreement = [], {}
+    for task_id, samples in by_task.items():
+        if samples:
+            dispatch, agreement[task_id] = _consensus_dispatch(samples)
+            dispatches.append(dispatch)
+    return DispatchResult(dispatches=dispatches, summary=results[0].summary, agreement=agreement)
+
+
+async def _dispatch_chunks(
+    client: LLMClient,
+    system_prompt: str,
+    chunks: list[list[dict]],
+    tasks_by_id: dict[str, dict],
+    concurrency: int,
+    slots: asyncio.Semaphore | None = None,
+    samples: int = 1,
+) -> list[DispatchResult | None]:
+    """Dispatch every chunk concurrently; chunks whose request failed or whose
+    response could not be parsed come back as None.
+
+    Pass slots to share one concurrency limit across several calls. With samples
+    above 1, every chunk is sampled up to that many times and the consensus of the
+    samples is returned: two samples are requested concurrently, and the remaining
+    ones only if those do not agree on every task of the chunk.
+    """
+    aclient = ensure_async(client)
+    slots = slots or asyncio.Semaphore(concurrency)
+
+    async def sample_one(index: int, user_message: str, sample: int) -> DispatchResult | None:
+        try:
+            async with slots:
+                raw_response = await aclient.achat(
+                    system_prompt,
+                    [{"role": "user", "content": _sample_message(user_message, sample)}],
+                )
+        except FixtureNotFoundError:
+            # A replay without a recorded response is a setup error, not a failed
+            # request: bench must not time chunks that never ran
+            raise
+        except Exception as e:
+            # A provider error fails this chunk (or sample) only; the other chunks'
+            # results are still merged and saved
+            logger.error("Dispatch request for chunk %d failed: %s", index + 1, e)
+            print(f"\n{RED}Error: Request for chunk {index + 1} failed: {e}{RESET}")
+            return None
+        try:
+            return await aparse_structured_response(raw_response, DispatchResult, client)
+        except ValueError as e:
+            logger.error("Failed to parse dispatch response for chunk %d: %s", index + 1, e)
+            print(f"\n{RED}Error: Failed to parse response for chunk {index + 1}{RESET}")
+            print(f"{DIM}{raw_response[:500]}{RESET}")
+            return None
+
+    async def dispatch_one(index: int, chunk: list[dict]) -> DispatchResult | None:
+        user_message = _build_user_message(chunk, _dependency_context(chunk, tasks_by_id))
+        if samples <= 1:
+            return await sample_one(index, user_message, 0)
+
+        task_ids = [t["task_id"] for t in chunk]
+        pending = {
+            asyncio.create_task(sample_one(index, user_message, i)) for i in range(2)
+        }
+        launched = 2
+        results: list[DispatchResult] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results += [r for r in (task.result() for task in done) if r is not None]
+                if len(results) >= 2 and _unanimous(results, task_ids):
+                    break
+                if not pending and launched < samples:
+                    # The first samples disagree (or failed): request the rest
+                    pending = {
+                        asyncio.create_task(sample_one(index, user_message, i))
+                        for i in range(launched, samples)
+                    }
+                    launched = samples
+        finally:
+            for task in pending:
+                task.cancel()
+        if len(results) < samples:
+            logger.info(
+                "Chunk %d: consensus of %d/%d samples", index + 1, len(results), samples
+            )
+        return _consensus_result(results, task_ids) if results else None
+
+    return await asyncio.gather(
+        *(dispatch_one(i, chunk) for i, chunk in enumerate(chunks))
+    )
+
+
+def _merge_results(
+    tasks: list[dict],
+    results: list[DispatchResult | None],
+    reused: dict[str, TaskDispatch] | None = None,
+    previous_summary: str = "",
+    local: dict[str, TaskDispatch] | None = None,
+) -> DispatchResult:
+    """Merge per-chunk, reused and locally classified dispatches into one result,
+    in original task order."""
+    reused = reused or {}
+    local = local or {}
+    by_id: dict[str, TaskDispatch] = {}
+    agreement: dict[str, DispatchAgreement] = {}
+    for result in results:
+        if result is None:
+            continue
+        for d in result.dispatches:
+            # Ignore dispatches the model returned for context-only tasks
+            if d.task_id not in reused and d.task_id not in local and d.task_id not in by_id:
+                by_id[d.task_id] = d
+                if d.task_id in result.agreement:
+                    agreement[d.task_id] = result.agreement[d.task_id]
+    by_id.update(reused)
+    by_id.update(local)
+
+    dispatches = [by_id[t["task_id"]] for t in tasks if t["task_id"] in by_id]
+    if not results and not local:
+        summary = previous_summary
+    elif len(results) == 1 and not reused and not local:
+        summary = results[0].summary if results[0] is not None else ""
+    else:
+        # Per-chunk summaries each describe part of the board and repeat one
+        # another, so the merged result is summarized by its counts instead
+        ai_count = sum(1 for d in dispatches if d.owner_type == "ai")
+        summary = (
+            f"{len(dispatches)} tasks dispatched "
+            f"({ai_count} AI, {len(dispatches) - ai_count} human"
+            + (f", {len(reused)} unchanged" if reused else "")
+            + (f", {len(local)} classified locally" if local else "")
+            + ")."
+        )
+    return DispatchResult(dispatches=dispatches, summary=summary, agreement=agreement)
+
+
+async def adispatch(
+    client: LLMClient,
+    tasks: list[dict],
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    samples: int = 1,
+    classifier: DispatchClassifier | None = None,
+) -> DispatchResult:
+    """Dispatch decomposed tasks inside an event loop, without console output.
+
+    Tasks are reduced to their dispatch-relevant fields; tasks of failed chunks are
+    missing from the result.
+
+    Raises:
+        ValueError: If no task could be dispatched
+    """
+    tasks = [_task_for_prompt(t) for t in tasks]
+    local: dict[str, TaskDispatch] = {}
+    pending = tasks
+    if classifier is not None:
+        local, pending = classifier.classify(pending)
+    chunks = _chunk_tasks(pending, chunk_tokens)
+    results = await _dispatch_chunks(
+        client,
+        get_prompt("role_dispatch").static,
+        chunks,
+        {t["task_id"]: t for t in tasks},
+        concurrency,
+        samples=samples,
+    )
+    if results and all(r is None for r in results) and not local:
+        raise ValueError("Failed to parse every dispatch response")
+    result = _merge_results(tasks, results, local=local)
+    fingerprints = {t["task_id"]: _fingerprint(t) for t in tasks}
+    result.task_fingerprints = {d.task_id: fingerprints[d.task_id] for d in result.dispatches}
+    return result
 
 
 def _display_dispatch(result: DispatchResult) -> None:
@@ -88,60 +457,167 @@ def _display_dispatch(result: DispatchResult) -> None:
               f"{auto_icon} {d.autonomy_level}")
         print(f"    Score: [{score_bar}] {d.total_score}/6 "
               f"({d.owner_type})")
+        agreement = result.agreement.get(d.task_id)
+        if agreement is not None and agreement.agreement < 1:
+            low, high = agreement.total_score_range
+            print(f"    {YELLOW}Samples agree: {agreement.agreement:.0%} of {agreement.samples} "
+                  f"(total {low}-{high}){RESET}")
         print(f"    {DIM}{d.reasoning}{RESET}")
 
     print(f"\n  {BOLD}Summary:{RESET} {result.summary}")
 
 
+def _display_agreement(result: DispatchResult, samples: int) -> None:
+    """Summarize how consistently the samples dispatched each task."""
+    agreements = result.agreement
+    unanimous = sum(1 for a in agreements.values() if a.agreement == 1)
+    early = sum(1 for a in agreements.values() if a.samples < samples)
+    disputed = sorted(
+        (task_id for task_id, a in agreements.items() if a.agreement < 1),
+        key=lambda task_id: agreements[task_id].agreement,
+    )
+    early_note = f" ({early} decided before all {samples} samples)" if early else ""
+    print(f"\n  {BOLD}Consensus:{RESET} {unanimous}/{len(agreements)} tasks unanimous"
+          f"{DIM}{early_note}{RESET}")
+    for task_id in disputed:
+        a = agreements[task_id]
+        print(f"    {YELLOW}{task_id}{RESET}: {a.agreement:.0%} of {a.samples} samples agree, "
+              f"total {a.total_score_range[0]}-{a.total_score_range[1]}")
+
+
 def run_dispatch(
     client: LLMClient,
     input_file: str = "decomposed_task.json",
-    output_file: str = "dispatched_task.json",
+    output_file: str | None = "dispatched_task.json",
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    incremental: bool = True,
+    store: TaskStore | None = None,
+    classifier: DispatchClassifier | None = None,
+    history: str | None = None,
+    samples: int = 1,
+    epic: str | None = None,
 ) -> None:
     """Dispatch roles for decomposed tasks.
 
-    Reads decomposed_task.json, sends tasks to LLM for evaluation,
-    and saves role assignments to dispatched_task.json.
+    Reads decomposed_task.json, sends tasks to LLM for evaluation in concurrent
+    token-budgeted chunks, and saves role assignments to dispatched_task.json.
+    With incremental=True, dispatches from the existing output file are reused
+    for tasks whose fingerprint has not changed.
+
+    With a store, the tasks of one epic (default: the most recently updated) are
+    read from and their dispatches written to the task store instead, and the JSON
+    output is only written if output_file is given.
+
+    With a classifier, tasks it is confident about are dispatched locally and
+    only the rest are sent to the LLM. Dispatches made by the LLM are appended
+    to the history file, if given, for training the classifier.
+
+    With samples above 1, each chunk is dispatched by consensus of that many
+    concurrent samples (see _dispatch_chunks), and per-task agreement is reported.
     """
-    input_path = Path(input_file)
-    if not input_path.exists():
-        logger.error("Input file not found: %s", input_file)
-        print(f"\n{RED}Error: File not found: {input_file}{RESET}")
-        print(f"{DIM}Run 'python main.py decompose' first to generate tasks.{RESET}")
-        return
+    if store is not None:
+        try:
+            epic = store.resolve_epic(epic)
+        except KeyError as e:
+            print(f"\n{RED}Error: {e.args[0]} in {store.path}{RESET}")
+            return
+        tasks = [_task_for_prompt(t.model_dump()) for t in store.find_tasks(epic_title=epic)]
+        source = f"{store.path} (epic: {epic})"
+    else:
+        input_path = Path(input_file)
+        if not input_path.exists():
+            logger.error("Input file not found: %s", input_file)
+            print(f"\n{RED}Error: File not found: {input_file}{RESET}")
+            print(f"{DIM}Run 'python main.py decompose' first to generate tasks.{RESET}")
+            return
 
-    with open(input_path) as f:
-        data = json.load(f)
+        with open(input_path) as f:
+            data = json.load(f)
+        tasks = _extract_tasks_for_prompt(data)
+        source = input_file
 
-    tasks = _extract_tasks_for_prompt(data)
     if not tasks:
-        print(f"\n{RED}Error: No tasks found in {input_file}{RESET}")
+        print(f"\n{RED}Error: No tasks found in {source}{RESET}")
         return
 
-    print(f"\n{DIM}  Found {len(tasks)} tasks in {input_file}{RESET}")
+    print(f"\n{DIM}  Found {len(tasks)} tasks in {source}{RESET}")
+
+    fingerprints = {t["task_id"]: _fingerprint(t) for t in tasks}
+    reused: dict[str, TaskDispatch] = {}
+    previous_summary = ""
+    if incremental and store is not None:
+        reused = store.reusable_dispatches(fingerprints, epic)
+        previous_summary = store.dispatch_summary(epic)
+    elif incremental and output_file:
+        reused = _load_reusable(output_file, fingerprints)
+        if reused:
+            with open(output_file) as f:
+                previous_summary = json.load(f).get("summary", "")
+    pending = [t for t in tasks if t["task_id"] not in reused]
+    if incremental:
+        print(f"{DIM}  Reused {len(reused)} unchanged tasks, "
+              f"re-evaluating {len(pending)}{RESET}")
 
-    prompt_template = load_prompt("role_dispatch")
-    tasks_json = json.dumps(tasks, indent=2, ensure_ascii=False)
-    system_prompt = prompt_template.replace("{tasks_json}", tasks_json)
+    local: dict[str, TaskDispatch] = {}
+    if classifier is not None and pending:
+        local, pending = classifier.classify(pending)
+        hit_rate = len(local) / (len(local) + len(pending))
+        logger.info(
+            "Pre-classifier dispatched %d/%d tasks locally", len(local), len(local) + len(pending)
+        )
+        print(f"{DIM}  Classified {len(local)} tasks locally ({hit_rate:.0%}), "
+              f"sending {len(pending)} to the LLM{RESET}")
 
-    print(f"{DIM}  Dispatching roles...{RESET}", end="", flush=True)
+    system_prompt = get_prompt("role_dispatch").static
+    chunks = _chunk_tasks(pending, chunk_tokens)
+    tasks_by_id = {t["task_id"]: t for t in tasks}
 
-    raw_response = client.chat(
-        system_prompt,
-        [{"role": "user", "content": f"Dispatch roles for these {len(tasks)} tasks."}],
+    sampling = f" ({samples} samples each)" if samples > 1 else ""
+    if len(chunks) > 1:
+        print(f"{DIM}  Dispatching roles in {len(chunks)} chunks{sampling}...{RESET}",
+              end="", flush=True)
+    elif chunks:
+        print(f"{DIM}  Dispatching roles{sampling}...{RESET}", end="", flush=True)
+
+    results = (
+        asyncio.run(
+            _dispatch_chunks(
+                client, system_prompt, chunks, tasks_by_id, concurrency, samples=samples
+            )
+        )
+        if chunks
+        else []
     )
-    print("\r" + " " * 40 + "\r", end="")
+    print("\r" + " " * 60 + "\r", end="")
 
-    try:
-        result = parse_structured_response(raw_response, DispatchResult)
-    except ValueError as e:
-        logger.error("Failed to parse dispatch response: %s", e)
-        print(f"\n{RED}Error: Failed to parse response{RESET}")
-        print(f"{DIM}{raw_response[:500]}{RESET}")
+    if results and all(r is None for r in results) and not reused and not local:
         return
 
+    result = _merge_results(tasks, results, reused, previous_summary, local)
+    dispatched_ids = {d.task_id for d in result.dispatches}
+    missing = [t["task_id"] for t in tasks if t["task_id"] not in dispatched_ids]
+    if missing:
+        logger.warning("No dispatch returned for %d tasks: %s", len(missing), ", ".join(missing))
+        print(f"\n{YELLOW}Warning: {len(missing)} tasks were not dispatched: "
+              f"{', '.join(missing)}{RESET}")
+
+    result.task_fingerprints = {d.task_id: fingerprints[d.task_id] for d in result.dispatches}
+    if history:
+        evaluated = [
+            d for d in result.dispatches if d.task_id not in reused and d.task_id not in local
+        ]
+        append_history(evaluated, tasks_by_id, history)
+
     _display_dispatch(result)
+    if result.agreement:
+        _display_agreement(result, samples)
 
-    with open(output_file, "w") as f:
-        json.dump(result.model_dump(), f, indent=2, ensure_ascii=False)
-    print(f"\n  {DIM}Dispatch results saved to: {output_file}{RESET}\n")
+    if store is not None:
+        store.upsert_dispatches(result, epic)
+        print(f"\n  {DIM}Stored {len(result.dispatches)} dispatches in: {store.path}{RESET}")
+    if output_file:
+        with open(output_file, "w") as f:
+            json.dump(result.model_dump(), f, indent=2, ensure_ascii=False)
+        print(f"\n  {DIM}Dispatch results saved to: {output_file}{RESET}")
+    print()
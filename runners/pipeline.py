@@ -0,0 +1,321 @@
+"""End-to-end pipeline runner: brainstorm → score → decompose → dispatch.
+
+Runs every stage in one process with one client, passing validated Pydantic
+objects between stages instead of round-tripping through JSON files. Independent
+work is overlapped:
+- the goal is scored while the decomposition is still streaming
+- each story is dispatched as soon as its JSON object closes and validates,
+  while later stories are still being generated
+
+Per-stage latency is reported at the end.
+
+Usage:
+    python main.py pipeline -f ticket.md
+    python main.py pipeline -t "Build a REST API" --skip-brainstorm
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from classifier import DispatchClassifier, append_history
+from client import LLMClient, aparse_structured_response
+from models.role import DispatchResult, TaskDispatch
+from models.scoring import ScoreResult
+from models.task import Story, TaskDecompositionResult
+from prompt_registry import get_prompt
+from runners.brainstorm import run_brainstorm
+from runners.dispatch import (
+    DEFAULT_CHUNK_TOKENS,
+    DEFAULT_CONCURRENCY,
+    _chunk_tasks,
+    _dispatch_chunks,
+    _display_dispatch,
+    _fingerprint,
+    _merge_results,
+    _task_for_prompt,
+)
+from runners.scoring import _display_score_result, ascore_issue
+from runners.task import _apply_local_plan, _display_decomposition, _stream_decomposition
+
+logger = logging.getLogger(__name__)
+
+# ANSI color codes
+CYAN = "\033[36m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+BOLD = "\033[1m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+
+class StageTimer:
+    """Wall-clock spans per stage; a stage spans its first start to its last end."""
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.spans: dict[str, list[float]] = {}
+
+    def start(self, stage: str) -> float:
+        now = time.perf_counter()
+        span = self.spans.setdefault(stage, [now, now])
+        span[0] = min(span[0], now)
+        return now
+
+    def stop(self, stage: str) -> None:
+        now = time.perf_counter()
+        span = self.spans.setdefault(stage, [now, now])
+        span[1] = max(span[1], now)
+
+    def display(self) -> None:
+        total = time.perf_counter() - self.origin
+        print(f"\n  {BOLD}Stage latency:{RESET}")
+        for stage, (start, end) in self.spans.items():
+            offset = start - self.origin
+            print(f"    {stage:<12} {end - start:>7.2f}s  {DIM}(started at +{offset:.2f}s){RESET}")
+        print(f"    {'total':<12} {total:>7.2f}s")
+
+
+class _StreamingDispatcher:
+    """Dispatch stories while the decomposition is still streaming.
+
+    on_close runs on the decomposition thread; validated stories are handed to the
+    event loop, which starts their dispatch chunks immediately. All chunks share
+    one concurrency limit.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        loop: asyncio.AbstractEventLoop,
+        timer: StageTimer,
+        chunk_tokens: int,
+        concurrency: int,
+        classifier: DispatchClassifier | None = None,
+    ) -> None:
+        self.client = client
+        self.loop = loop
+        self.classifier = classifier
+        self.timer = timer
+        self.chunk_tokens = chunk_tokens
+        self.concurrency = concurrency
+        self.system_prompt = get_prompt("role_dispatch").static
+        self.slots = asyncio.Semaphore(concurrency)
+        self.tasks_by_id: dict[str, dict] = {}
+        self.sent: dict[str, str] = {}  # task_id -> fingerprint at dispatch time
+        # task_id -> (batch, fingerprint) of the latest batch that returned a dispatch
+        self.dispatched: dict[str, tuple[int, str]] = {}
+        self.local: dict[str, TaskDispatch] = {}  # dispatched by the classifier
+        self.pending: list[asyncio.Task] = []
+
+    def on_close(self, depth: int, raw: str) -> None:
+        if depth != 2:
+            return
+        try:
+            story = Story.model_validate(json.loads(raw))
+        except (json.JSONDecodeError, ValidationError):
+            # Not a story (e.g. the epic), or invalid: the final parse repairs it
+            return
+        self.loop.call_soon_threadsafe(self.dispatch, [t.model_dump() for t in story.tasks])
+
+    def dispatch(self, tasks: list[dict]) -> None:
+        """Start dispatching tasks not already sent with identical fields."""
+        batch = []
+        for task in map(_task_for_prompt, tasks):
+            fingerprint = _fingerprint(task)
+            self.tasks_by_id[task["task_id"]] = task
+            if self.sent.get(task["task_id"]) != fingerprint:
+                self.sent[task["task_id"]] = fingerprint
+                self.local.pop(task["task_id"], None)
+                batch.append(task)
+        if batch and self.classifier is not None:
+            local, batch = self.classifier.classify(batch)
+            self.local.update(local)
+        if batch:
+            self.pending.append(self.loop.create_task(self._run(len(self.pending), batch)))
+
+    async def _run(self, index: int, tasks: list[dict]) -> list[DispatchResult | None]:
+        fingerprints = {t["task_id"]: self.sent[t["task_id"]] for t in tasks}
+        self.timer.start("dispatch")
+        try:
+            results = await _dispatch_chunks(
+                self.client,
+                self.system_prompt,
+                _chunk_tasks(tasks, self.chunk_tokens),
+                self.tasks_by_id,
+                self.concurrency,
+                self.slots,
+            )
+        finally:
+            self.timer.stop("dispatch")
+        for result in results:
+            for d in result.dispatches if result is not None else []:
+                if d.task_id in fingerprints and self.dispatched.get(d.task_id, (-1,))[0] < index:
+                    self.dispatched[d.task_id] = (index, fingerprints[d.task_id])
+        return results
+
+    async def results(self) -> list[DispatchResult | None]:
+        gathered = await asyncio.gather(*self.pending)
+        return [result for batch in gathered for result in batch]
+
+    def fingerprints(self) -> dict[str, str]:
+        """Fingerprint of the task fields each task's latest dispatch was based on.
+
+        A task whose re-dispatch failed keeps the fingerprint of the earlier result,
+        so an incremental rerun sees that it is out of date.
+        """
+        fingerprints = {task_id: fp for task_id, (_, fp) in self.dispatched.items()}
+        fingerprints.update({task_id: self.sent[task_id] for task_id in self.local})
+        return fingerprints
+
+
+async def _timed_score(client: LLMClient, goal: str, timer: StageTimer) -> ScoreResult | None:
+    timer.start("score")
+    try:
+        return await ascore_issue(client, goal)
+    except Exception as e:
+        logger.error("Scoring failed: %s", e)
+        return None
+    finally:
+        timer.stop("score")
+
+
+async def _run_stages(
+    client: LLMClient,
+    goal: str,
+    timer: StageTimer,
+    chunk_tokens: int,
+    concurrency: int,
+    classifier: DispatchClassifier | None = None,
+    history: str | None = None,
+) -> tuple[ScoreResult | None, TaskDecompositionResult | None, DispatchResult | None]:
+    loop = asyncio.get_running_loop()
+    score_task = asyncio.create_task(_timed_score(client, goal, timer))
+    dispatcher = _StreamingDispatcher(
+        client, loop, timer, chunk_tokens, concurrency, classifier
+    )
+
+    timer.start("decompose")
+    raw_response = await asyncio.to_thread(
+        _stream_decomposition, client, goal, dispatcher.on_close
+    )
+    try:
+        decomposition = await aparse_structured_response(
+            raw_response, TaskDecompositionResult, client
+        )
+    except ValueError as e:
+        logger.error("Failed to parse decomposition response: %s", e)
+        print(f"\n{RED}Error: Failed to parse decomposition response{RESET}")
+        print(f"{DIM}{raw_response[:500]}{RESET}")
+        decomposition = None
+    timer.stop("decompose")
+
+    dispatch = None
+    if decomposition is not None:
+        _apply_local_plan(decomposition)
+        tasks = [t.model_dump() for story in decomposition.stories for t in story.tasks]
+        # Stories that failed early validation, or that repair changed, go out now
+        dispatcher.dispatch(tasks)
+        results = await dispatcher.results()
+        prompt_tasks = [_task_for_prompt(t) for t in tasks]
+        if any(r is not None for r in results) or dispatcher.local:
+            # Later batches re-dispatch repaired tasks, so their results take precedence
+            dispatch = _merge_results(prompt_tasks, results[::-1], local=dispatcher.local)
+            fingerprints = dispatcher.fingerprints()
+            dispatch.task_fingerprints = {
+                d.task_id: fingerprints[d.task_id]
+                for d in dispatch.dispatches
+                if d.task_id in fingerprints
+            }
+            if history:
+                append_history(
+                    [d for d in dispatch.dispatches if d.task_id not in dispatcher.local],
+                    dispatcher.tasks_by_id,
+                    history,
+                )
+            if classifier is not None:
+                stats = classifier.stats
+                print(f"{DIM}  Classified {stats.local} tasks locally ({stats.hit_rate:.0%}), "
+                      f"sent {stats.llm} to the LLM{RESET}")
+            dispatched_ids = {d.task_id for d in dispatch.dispatches}
+            missing = [t["task_id"] for t in prompt_tasks if t["task_id"] not in dispatched_ids]
+            if missing:
+                logger.warning("No dispatch returned for %d tasks: %s", len(missing), ", ".join(missing))
+                print(f"\n{YELLOW}Warning: {len(missing)} tasks were not dispatched: "
+                      f"{', '.join(missing)}{RESET}")
+
+    return await score_task, decomposition, dispatch
+
+
+def _save(path: Path, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"  {DIM}Saved: {path}{RESET}")
+
+
+def run_pipeline(
+    client: LLMClient,
+    context: str | None = None,
+    brainstorm: bool = True,
+    output_dir: str = ".",
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    classifier: DispatchClassifier | None = None,
+    history: str | None = None,
+) -> None:
+    """Run brainstorm → score → decompose → dispatch in one process.
+
+    With brainstorm=False, the context text is used directly as the goal.
+    Results are written to score_result.json, decomposed_task.json and
+    dispatched_task.json in output_dir. classifier and history work as in
+    run_dispatch().
+    """
+    timer = StageTimer()
+
+    if brainstorm:
+        timer.start("brainstorm")
+        response = run_brainstorm(client, context)
+        timer.stop("brainstorm")
+        if response is None:
+            print(f"{DIM}  Pipeline stopped: brainstorm did not complete.{RESET}\n")
+            return
+        goal = response.generatedPrompt or context
+    else:
+        goal = context
+    if not goal:
+        print(f"\n{RED}Error: No goal to decompose{RESET}")
+        return
+
+    print(f"\n{BOLD}{'═' * 60}{RESET}")
+    print(f"{BOLD}  Pipeline: score + decompose + dispatch{RESET}")
+    print(f"{'═' * 60}")
+
+    score, decomposition, dispatch = asyncio.run(
+        _run_stages(client, goal, timer, chunk_tokens, concurrency, classifier, history)
+    )
+
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    print()
+    if score is not None:
+        _display_score_result(score)
+    if decomposition is not None:
+        _display_decomposition(decomposition)
+    if dispatch is not None:
+        _display_dispatch(dispatch)
+
+    print()
+    if score is not None:
+        _save(out / "score_result.json", score.model_dump())
+    if decomposition is not None:
+        _save(out / "decomposed_task.json", decomposition.model_dump())
+    if dispatch is not None:
+        _save(out / "dispatched_task.json", dispatch.model_dump())
+
+    timer.display()
+    print()
@@ -0,0 +1,65 @@
+"""Incremental progress rendering for streamed LLM responses.
+
+The runners ask for JSON output, so useful fields (epic title, story headers,
+the next brainstorm question) become readable long before the full response
+arrives. StreamWatcher fires a callback as soon as a watched field is complete,
+and stops reading the stream as soon as the top-level JSON object closes.
+"""
+
+import json
+import re
+from collections.abc import Callable, Iterable
+
+from client import JsonStreamExtractor
+
+# A complete JSON string literal; group captures the escaped contents
+JSON_STRING = r'"((?:[^"\\]|\\.)*)"'
+
+
+def unescape(raw: str) -> str:
+    """Decode the contents of a JSON string literal."""
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+class StreamWatcher:
+    """Scan a growing response for regex matches, firing each match exactly once.
+
+    on_close is passed to the JsonStreamExtractor and called with (depth, raw_text)
+    for each nested JSON object as soon as it closes.
+    """
+
+    def __init__(self, on_close: Callable[[int, str], None] | None = None) -> None:
+        self.text = ""
+        self.extractor = JsonStreamExtractor(on_close)
+        self._rules: list[list] = []  # [pattern, callback, search position]
+
+    def on(self, pattern: str, callback: Callable[[re.Match], None]) -> "StreamWatcher":
+        """Register a callback for every complete match of pattern."""
+        self._rules.append([re.compile(pattern), callback, 0])
+        return self
+
+    def feed(self, chunk: str) -> None:
+        self.text += chunk
+        for rule in self._rules:
+            pattern, callback, pos = rule
+            # Patterns end on a closing quote, so a partial field never matches
+            for match in pattern.finditer(self.text, pos):
+                callback(match)
+                rule[2] = match.end()
+
+    def consume(self, chunks: Iterable[str]) -> str:
+        """Feed chunks until the response's JSON object is complete; return the text.
+
+        Anything after the closing brace (a code fence, trailing prose) is not awaited.
+        """
+        for chunk in chunks:
+            self.feed(chunk)
+            if self.extractor.feed(chunk) is not None:
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+                break
+        return self.text
@@ -7,13 +7,27 @@ Mirrors the scoring system in scrumai-forge:
 Usage:
     python main.py score -f ticket.md
     python main.py score -t "Build a login page with email/password auth"
+    python main.py score --batch "issues/*.md" -o scores.jsonl
+    python main.py score --batch issues.jsonl -j 16 --resume
 """
 
+import asyncio
+import glob
 import json
 import logging
+import sys
+from collections.abc import Iterator
+from pathlib import Path
 
-from client import LLMClient, load_prompt, parse_structured_response
+from client import (
+    LLMClient,
+    aparse_structured_response,
+    ensure_async,
+    parse_structured_response,
+)
 from models.scoring import ScoreResult
+from prompt_registry import get_prompt
+from similarity import SimilarityIndex
 
 logger = logging.getLogger(__name__)
 
@@ -67,14 +81,55 @@ def _display_score_result(result: ScoreResult) -> None:
     print(f"\n  {BOLD}Summary:{RESET} {result.summary}")
 
 
-def run_scoring(client: LLMClient, issue_text: str) -> None:
+def _build_user_message(issue_text: str) -> str:
+    return f"Please score this issue:\n\n{issue_text}"
+
+
+async def ascore_issue(
+    client: LLMClient, issue_text: str, system_prompt: str | None = None
+) -> ScoreResult:
+    """Score one issue inside an event loop.
+
+    Raises:
+        ValueError: If the response cannot be parsed or repaired into a ScoreResult
+    """
+    system_prompt = system_prompt or get_prompt("issue_scoring").static
+    raw_response = await ensure_async(client).achat(
+        system_prompt, [{"role": "user", "content": _build_user_message(issue_text)}]
+    )
+    return await aparse_structured_response(raw_response, ScoreResult, client)
+
+
+def _near_duplicate_hint(similarity: float) -> None:
+    print(f"{DIM}  Near-duplicate of an earlier ticket ({similarity:.0%} similar); "
+          f"pass --reuse-similar to reuse its result{RESET}")
+
+
+def run_scoring(
+    client: LLMClient,
+    issue_text: str,
+    output: str = "score_result.json",
+    similar: SimilarityIndex | None = None,
+) -> None:
     """Score an issue for readiness.
 
     Mirrors: scoreIssue() in src/lib/issue-scorer.ts
+    With a similarity index, the result is indexed, and the result of a
+    near-duplicate ticket is reused instead if the index allows reuse.
     """
-    system_prompt = load_prompt("issue_scoring")
+    if similar is not None:
+        reused, match = similar.lookup("score", issue_text, ScoreResult)
+        if reused is not None:
+            print(f"\n{DIM}  Reused the score of a {match.similarity:.0%} similar ticket{RESET}")
+            _display_score_result(reused)
+            _save_score(reused, output)
+            return
+        if match is not None:
+            _near_duplicate_hint(match.similarity)
 
-    user_message = f"Please score this issue:\n\n{issue_text}"
+    system_prompt = get_prompt("issue_scoring").static
+
+    user_message = _build_user_message(issue_text)
 
     print(f"\n{DIM}  Scoring issue...{RESET}", end="", flush=True)
 
@@ -82,7 +137,7 @@ def run_scoring(client: LLMClient, issue_text: str) -> None:
     print("\r" + " " * 40 + "\r", end="")
 
     try:
-        result = parse_structured_response(raw_response, ScoreResult)
+        result = parse_structured_response(raw_response, ScoreResult, client)
     except ValueError as e:
         logger.error("Failed to parse scoring response: %s", e)
         print(f"\n{RED}Error: Failed to parse response{RESET}")
@@ -90,9 +145,224 @@ def run_scoring(client: LLMClient, issue_text: str) -> None:
         return
 
     _display_score_result(result)
+    if similar is not None:
+        similar.add("score", issue_text, result.model_dump())
+    _save_score(result, output)
+
 
-    # Save structured output
-    output_file = "score_result.json"
+def _save_score(result: ScoreResult, output_file: str) -> None:
     with open(output_file, "w") as f:
         json.dump(result.model_dump(), f, indent=2, ensure_ascii=False)
     print(f"\n  {DIM}Structured output saved to: {output_file}{RESET}\n")
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+
+def _issue_from_record(record: dict, line_no: int) -> tuple[str, str]:
+    """Pull (issue_id, text) out of a JSONL record.
+
+    Accepts either a ready-made "text" field or Jira-style "summary"/"description".
+    """
+    issue_id = str(
+        record.get("issue_id") or record.get("key") or record.get("id") or f"line-{line_no}"
+    )
+    text = record.get("text")
+    if not text:
+        parts = [record.get("summary", ""), record.get("description", "")]
+        text = "\n\n".join(p for p in parts if p)
+    return issue_id, text
+
+
+def iter_batch_issues(source: str) -> Iterator[tuple[str, str]]:
+    """Yield (issue_id, text) pairs from a JSONL file, stdin ("-"), directory or glob."""
+    if source == "-" or source.endswith(".jsonl"):
+        stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+        try:
+            for line_no, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed JSONL line %d", line_no)
+                    continue
+                yield _issue_from_record(record, line_no)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        return
+
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.suffix in (".md", ".txt"))
+    else:
+        files = sorted(Path(p) for p in glob.glob(source, recursive=True))
+    for file in files:
+        if file.is_file():
+            yield str(file), file.read_text(encoding="utf-8")
+
+
+def _truncate_partial_line(path: Path) -> None:
+    """Cut a partially written last line (left by a crash) off a JSONL file, so
+    appended records start on a line of their own."""
+    with open(path, "rb+") as f:
+        end = f.seek(0, 2)
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < end:
+            logger.warning("Dropping a partially written last line of %s", path)
+            f.truncate(pos)
+
+
+def _load_checkpoint(output: str) -> set[str]:
+    """Return ids of issues already scored successfully in an existing output file."""
+    done: set[str] = set()
+    path = Path(output)
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a partially written last line
+                continue
+            if "result" in record:
+                done.add(record["issue_id"])
+    return done
+
+
+async def _score_batch(
+    client: LLMClient,
+    issues: Iterator[tuple[str, str]],
+    output: str,
+    concurrency: int,
+    done: set[str],
+    similar: SimilarityIndex | None = None,
+    append: bool = False,
+) -> dict[str, int]:
+    system_prompt = get_prompt("issue_scoring").static
+    slots = asyncio.Semaphore(concurrency)
+    counts = {"scored": 0, "reused": 0, "failed": 0, "skipped": 0}
+    pending: set[asyncio.Task] = set()
+
+    with open(output, "a" if append else "w", encoding="utf-8") as out:
+
+        def write(record: dict) -> None:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        async def score_one(issue_id: str, text: str) -> None:
+            match = None
+            try:
+                result = None
+                # The index is SQLite, so its IO runs off the event loop
+                if similar is not None:
+                    result, match = await asyncio.to_thread(
+                        similar.lookup, "score", text, ScoreResult, issue_id
+                    )
+                if result is None:
+                    match = None
+                    result = await ascore_issue(client, text, system_prompt)
+                    if similar is not None:
+                        await asyncio.to_thread(
+                            similar.add, "score", text, result.model_dump()
+                        )
+            except Exception as e:
+                logger.error("Failed to score %s: %s", issue_id, e)
+                write({"issue_id": issue_id, "error": str(e)[:500]})
+                counts["failed"] += 1
+                print(f"  {RED}✕{RESET} {issue_id}")
+            else:
+                record = {"issue_id": issue_id, "result": result.model_dump()}
+                note = ""
+                if match is not None:
+                    record["similar_to"] = {
+                        "entry": match.entry_id,
+                        "similarity": round(match.similarity, 4),
+                    }
+                    note = f" {DIM}(reused, {match.similarity:.0%} similar){RESET}"
+                    counts["reused"] += 1
+                else:
+                    counts["scored"] += 1
+                write(record)
+                color = GREEN if result.totalScore >= 7 else (YELLOW if result.totalScore >= 4 else RED)
+                print(f"  {color}{result.totalScore:>2}/10{RESET} {issue_id}{note}")
+            finally:
+                slots.release()
+
+        # Acquire a slot before creating each task so memory stays bounded
+        # regardless of how many issues the source yields. The source is read in
+        # a worker thread, so slow stdin or file reads do not stall requests in flight.
+        while True:
+            item = await asyncio.to_thread(next, issues, None)
+            if item is None:
+                break
+            issue_id, text = item
+            if issue_id in done:
+                counts["skipped"] += 1
+                continue
+            if not text.strip():
+                logger.warning("Skipping empty issue: %s", issue_id)
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(score_one(issue_id, text))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending)
+
+    return counts
+
+
+def run_batch_scoring(
+    client: LLMClient,
+    source: str,
+    output: str = "score_results.jsonl",
+    concurrency: int = 8,
+    resume: bool = False,
+    similar: SimilarityIndex | None = None,
+) -> None:
+    """Score many issues concurrently, streaming one JSONL record per issue.
+
+    Each output line is {"issue_id": ..., "result": ScoreResult} or
+    {"issue_id": ..., "error": ...}. With resume=True, issues that already have a
+    result in the output file are skipped and new records are appended (after
+    cutting off a line left partially written by a crash).
+
+    With a similarity index, results are indexed and (if the index allows reuse)
+    near-duplicates of indexed issues reuse their result; those records carry
+    "similar_to": {"entry": ..., "similarity": ...}.
+    """
+    done = _load_checkpoint(output) if resume else set()
+    if resume and Path(output).exists():
+        _truncate_partial_line(Path(output))
+    if done:
+        print(f"\n{DIM}  Resuming: {len(done)} issues already scored in {output}{RESET}")
+
+    print(f"\n{BOLD}  Batch scoring{RESET} {DIM}(concurrency {concurrency}){RESET}\n")
+    counts = asyncio.run(
+        _score_batch(
+            client, iter_batch_issues(source), output, concurrency, done, similar, append=resume
+        )
+    )
+
+    print(
+        f"\n  {BOLD}Done:{RESET} {GREEN}{counts['scored']} scored{RESET}, "
+        + (f"{GREEN}{counts['reused']} reused{RESET}, " if counts["reused"] else "")
+        + f"{RED}{counts['failed']} failed{RESET}, {DIM}{counts['skipped']} skipped{RESET}"
+    )
+    print(f"  {DIM}Results streamed to: {output}{RESET}\n")
@@ -0,0 +1,149 @@
+"""Startup benchmark for the CLI's fast paths.
+
+Each command runs in a fresh interpreter under `python -X importtime`. The import
+time of every module it loads beyond bare interpreter startup is summed (best of
+the runs, so one cold .pyc compile does not count), and the check fails if that
+exceeds the budget or if any heavy module (pydantic, the HTTP stack, provider SDKs,
+the LLM client) was loaded at all.
+
+Usage:
+    python main.py bench --startup
+    python main.py bench --startup --budget-ms 40 -n 20
+"""
+
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# ANSI color codes
+CYAN = "\033[36m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+BOLD = "\033[1m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+MAIN_SCRIPT = Path(__file__).resolve().parent.parent / "main.py"
+
+# Commands that must start without loading anything heavy
+STARTUP_COMMANDS = (("--help",), ("prompts",))
+
+# Modules (and their submodules) the fast paths must not import
+HEAVY_MODULES = ("pydantic", "httpx", "openai", "google.genai", "dotenv", "client", "models")
+
+DEFAULT_BUDGET_MS = 25.0
+
+
+def _run(args: list[str]) -> tuple[dict[str, int], set[str], float]:
+    """Run the interpreter with args under -X importtime.
+
+    Returns the cumulative import time in microseconds of every module imported
+    at top level (not on behalf of another module), every module loaded, and the
+    wall time in seconds.
+
+    Raises:
+        RuntimeError: If the command fails.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+
+    imports: dict[str, int] = {}
+    loaded: set[str] = set()
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        loaded.add(name.strip())
+        # Nested imports are indented by two spaces per level
+        if not name[1:].startswith(" "):
+            imports[name.strip()] = int(cumulative)
+    return imports, loaded, wall
+
+
+def _heavy(modules: set[str]) -> list[str]:
+    return sorted(
+        m for m in modules if any(m == h or m.startswith(f"{h}.") for h in HEAVY_MODULES)
+    )
+
+
+def _measure(command: tuple[str, ...], baseline: set[str], runs: int) -> dict:
+    """Best import time, median wall time and heavy modules of one command."""
+    args = [str(MAIN_SCRIPT), *command]
+    import_times: list[float] = []
+    walls: list[float] = []
+    slowest: list[tuple[str, int]] = []
+    for _ in range(runs):
+        imports, loaded, wall = _run(args)
+        own = {name: us for name, us in imports.items() if name not in baseline}
+        total = sum(own.values()) / 1_000_000
+        if not import_times or total < min(import_times):
+            slowest = sorted(own.items(), key=lambda item: item[1], reverse=True)[:5]
+        import_times.append(total)
+        walls.append(wall)
+    return {
+        "command": " ".join(command),
+        "runs": runs,
+        "import_seconds": min(import_times),
+        "wall_p50": statistics.median(walls),
+        "heavy_modules": _heavy(loaded),
+        "slowest_imports": [{"module": name, "seconds": us / 1_000_000} for name, us in slowest],
+    }
+
+
+def _display_results(results: list[dict], budget_ms: float) -> None:
+    print(f"\n{BOLD}{'═' * 60}{RESET}")
+    print(f"{BOLD}  Startup Benchmark{RESET}  {DIM}(import budget {budget_ms:.0f}ms){RESET}")
+    print(f"{'═' * 60}")
+    print(f"\n  {DIM}{'command':<12} {'runs':>4}  {'imports':>9} {'wall p50':>9}  result{RESET}")
+    for r in results:
+        status = f"{GREEN}ok{RESET}" if r["ok"] else f"{RED}over budget{RESET}"
+        if r["heavy_modules"]:
+            status = f"{RED}loads {', '.join(r['heavy_modules'][:3])}{RESET}"
+        print(
+            f"  {CYAN}{r['command']:<12}{RESET} {r['runs']:>4}  "
+            f"{r['import_seconds'] * 1000:>7.1f}ms {r['wall_p50'] * 1000:>7.1f}ms  {status}"
+        )
+        if not r["ok"]:
+            for item in r["slowest_imports"]:
+                ms = item["seconds"] * 1000
+                print(f"  {'':<12} {DIM}{item['module']:<30} {ms:>6.1f}ms{RESET}")
+
+
+def run_startup_benchmark(
+    runs: int = 10, budget_ms: float = DEFAULT_BUDGET_MS, output: str | None = None
+) -> bool:
+    """Check that the fast-path commands stay within the import budget.
+
+    Returns:
+        True if every command stayed within budget without loading a heavy module.
+    """
+    _, baseline, _ = _run(["-c", "pass"])
+    results = []
+    for command in STARTUP_COMMANDS:
+        result = _measure(command, baseline, max(1, runs))
+        result["ok"] = (
+            result["import_seconds"] * 1000 <= budget_ms and not result["heavy_modules"]
+        )
+        results.append(result)
+
+    _display_results(results, budget_ms)
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n  {DIM}Benchmark results saved to: {output}{RESET}")
+    print()
+    return all(r["ok"] for r in results)
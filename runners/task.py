@@ -1,17 +1,44 @@
 """Task decomposition runner.
 
 Mirrors the existing main.py functionality with structured output validation.
+The execution plan (phases, critical path, total hours) is computed locally from
+task dependencies by graph.py rather than generated by the model.
+
+Large goals are decomposed hierarchically: one call outlines the epic and its
+stories, then every story is expanded into tasks in concurrent calls that share
+the epic context, and the expansions are merged with globally unique task ids.
 
 Usage:
     python main.py decompose -f goal.md
     python main.py decompose -t "Build a REST API for user management"
+    python main.py decompose -f docs/PRD.md --hierarchical -j 8
 """
 
+import asyncio
 import json
 import logging
+from collections.abc import Callable
 
-from client import LLMClient, load_prompt, parse_structured_response
-from models.task import TaskDecompositionResult
+from client import (
+    LLMClient,
+    aparse_structured_response,
+    ensure_async,
+    parse_structured_response,
+    stream_chat,
+)
+from graph import TaskGraphError, build_execution_plan, compare_plans
+from models.task import (
+    DecompositionOutline,
+    Story,
+    StoryExpansion,
+    StoryOutline,
+    Task,
+    TaskDecompositionResult,
+)
+from prompt_registry import get_prompt
+from runners.progress import JSON_STRING, StreamWatcher, unescape
+from similarity import SimilarityIndex
+from store import TaskStore
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +51,11 @@ BOLD = "\033[1m"
 DIM = "\033[2m"
 RESET = "\033[0m"
 
+# Goals at least this long are decomposed hierarchically by default: a single
+# completion cannot hold the full task tree of a PRD-sized goal
+HIERARCHICAL_MIN_CHARS = 8000
+DEFAULT_CONCURRENCY = 4
+
 
 def _display_decomposition(result: TaskDecompositionResult) -> None:
     """Display the decomposition result as a tree view."""
@@ -72,6 +104,8 @@ def _display_decomposition(result: TaskDecompositionResult) -> None:
 
     # Execution Plan
     plan = result.execution_plan
+    if plan is None:
+        return
     print(f"\n  {BOLD}Execution Plan:{RESET}")
     for phase in plan.phases:
         tasks_str = ", ".join(phase.parallel_tasks)
@@ -82,33 +116,300 @@ def _display_decomposition(result: TaskDecompositionResult) -> None:
     print(f"  {BOLD}Critical Path:{RESET} {' → '.join(plan.critical_path)}")
 
 
-def run_decomposition(client: LLMClient, task_description: str, output: str = "decomposed_task.json") -> None:
-    """Decompose a high-level goal into sub-tasks.
+def _outline_watcher(on_close: Callable[[int, str], None] | None = None) -> StreamWatcher:
+    """Print the epic title, story headers and task titles as they stream in."""
+    state = {"first": True}
 
-    Mirrors: decompose_task() in original main.py, with Pydantic validation.
+    def clear_status() -> None:
+        if state["first"]:
+            print("\r" + " " * 40 + "\r", end="")
+            state["first"] = False
+
+    def on_epic(m) -> None:
+        clear_status()
+        print(f"\n  {BOLD}Epic:{RESET} {unescape(m.group(1))}", flush=True)
+
+    def on_story(m) -> None:
+        clear_status()
+        print(f"  {CYAN}┌─ {unescape(m.group(1))}: {unescape(m.group(2))}{RESET}", flush=True)
+
+    def on_task(m) -> None:
+        clear_status()
+        print(f"  {CYAN}│{RESET}  {DIM}{unescape(m.group(1))}: {unescape(m.group(2))}{RESET}",
+              flush=True)
+
+    return (
+        StreamWatcher(on_close)
+        .on(rf'"epic"\s*:\s*\{{\s*"title"\s*:\s*{JSON_STRING}', on_epic)
+        .on(rf'"id"\s*:\s*{JSON_STRING}\s*,\s*"title"\s*:\s*{JSON_STRING}', on_story)
+        .on(rf'"task_id"\s*:\s*{JSON_STRING}\s*,\s*"title"\s*:\s*{JSON_STRING}', on_task)
+    )
+
+
+def _apply_local_plan(result: TaskDecompositionResult) -> None:
+    """Replace the execution plan with one computed from task dependencies.
+
+    Any plan the model returned is validated against the computed one first. If the
+    graph cannot be planned (cycle or duplicate ids), the model's plan is kept.
     """
-    prompt_template = load_prompt("task_decomposition")
-    # The task_decomposition prompt uses {task_description} placeholder
-    system_prompt = prompt_template.format(task_description=task_description)
+    try:
+        plan, graph = build_execution_plan(result)
+    except TaskGraphError as e:
+        logger.warning("Cannot compute execution plan: %s", e)
+        print(f"\n{YELLOW}Warning: {e}{RESET}")
+        return
+
+    for task_id, dep_id in graph.dangling:
+        print(f"\n{YELLOW}Warning: {task_id} depends on unknown task {dep_id}{RESET}")
+    if result.execution_plan is not None:
+        for issue in compare_plans(result.execution_plan, plan):
+            logger.info("Model execution plan replaced: %s", issue)
+    result.execution_plan = plan
+
+
+def _decomposition_messages(task_description: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": f"task_description:\n{task_description}"}]
+
+
+def _stream_decomposition(
+    client: LLMClient,
+    task_description: str,
+    on_close: Callable[[int, str], None] | None = None,
+    prompt: str = "task_decomposition",
+) -> str:
+    """Stream the decomposition response, printing its outline; return the raw text.
+
+    on_close receives (depth, raw_text) for every nested JSON object as it
+    completes; stories are the depth-2 objects that have a "tasks" list.
+    prompt is "task_outline" for the first pass of a hierarchical decomposition.
+    """
+    # {task_description} is sent as the user message only, keeping the system
+    # prompt identical across goals so the provider can cache it
+    system_prompt = get_prompt(prompt).static
 
     print(f"\n{DIM}  Decomposing task...{RESET}", end="", flush=True)
 
-    # For task decomposition, the full prompt is the system message
-    raw_response = client.chat(system_prompt, [{"role": "user", "content": task_description}])
+    chunks = stream_chat(client, system_prompt, _decomposition_messages(task_description))
+    raw_response = _outline_watcher(on_close).consume(chunks)
     print("\r" + " " * 40 + "\r", end="")
+    return raw_response
+
+
+def _expansion_message(outline: DecompositionOutline, story: StoryOutline) -> str:
+    # The epic and outline come first and are identical for every story, so the
+    # expansion calls share as long a prompt prefix as possible
+    epic_outline = json.dumps(
+        {"epic": outline.epic.model_dump(), "stories": [s.model_dump() for s in outline.stories]},
+        indent=2,
+        ensure_ascii=False,
+    )
+    story_json = json.dumps(story.model_dump(), indent=2, ensure_ascii=False)
+    return (
+        f"epic_outline:\n```json\n{epic_outline}\n```\n\n"
+        f"story:\n```json\n{story_json}\n```\n\n"
+        f"Break down {story.id} into tasks."
+    )
+
+
+async def _expand_stories(
+    client: LLMClient, outline: DecompositionOutline, concurrency: int, verbose: bool = True
+) -> list[list[Task] | None]:
+    """Expand every story of the outline concurrently; failed stories come back as None.
+
+    With verbose=False, progress and parse failures are only logged.
+    """
+    aclient = ensure_async(client)
+    system_prompt = get_prompt("story_expansion").static
+    slots = asyncio.Semaphore(concurrency)
+
+    async def expand_one(story: StoryOutline) -> list[Task] | None:
+        async with slots:
+            raw_response = await aclient.achat(
+                system_prompt, [{"role": "user", "content": _expansion_message(outline, story)}]
+            )
+        try:
+            expansion = await aparse_structured_response(raw_response, StoryExpansion, client)
+        except ValueError as e:
+            logger.error("Failed to parse the tasks of %s: %s", story.id, e)
+            if verbose:
+                print(f"  {RED}✕ {story.id}: failed to parse its tasks{RESET}")
+                print(f"{DIM}{raw_response[:500]}{RESET}")
+            return None
+        if verbose:
+            print(f"  {GREEN}✓{RESET} {story.id}: {len(expansion.tasks)} tasks", flush=True)
+        return expansion.tasks
 
+    return await asyncio.gather(*(expand_one(story) for story in outline.stories))
+
+
+def _merge_expansions(
+    outline: DecompositionOutline, expansions: list[list[Task] | None]
+) -> TaskDecompositionResult:
+    """Merge story expansions into one decomposition with globally unique task ids.
+
+    Story-local ids become TASK-001, TASK-002, ... in outline order. Dependencies on
+    another story, and the stories a story depends_on in the outline, resolve to
+    that story's final tasks: those no other task of the story depends on.
+    """
+    numbered: list[list[tuple[Task, str]]] = []
+    counter = 0
+    for tasks in expansions:
+        story_tasks = []
+        for task in tasks or []:
+            counter += 1
+            story_tasks.append((task, f"TASK-{counter:03d}"))
+        numbered.append(story_tasks)
+
+    # Local id -> global id per story; of duplicate local ids, the first wins
+    local_ids = [{t.task_id: g for t, g in reversed(story_tasks)} for story_tasks in numbered]
+    finals: dict[str, list[str]] = {}
+    for story, story_tasks, ids in zip(outline.stories, numbered, local_ids):
+        depended = {d for t, _ in story_tasks for d in t.dependencies if d in ids}
+        finals[story.id] = [g for t, g in story_tasks if t.task_id not in depended]
+
+    stories: list[Story] = []
+    for story, story_tasks, ids in zip(outline.stories, numbered, local_ids):
+        tasks = []
+        for task, global_id in story_tasks:
+            resolved: list[str] = []
+            for dep in task.dependencies:
+                if dep in ids:
+                    resolved.append(ids[dep])
+                elif dep in finals and dep != story.id:
+                    resolved.extend(finals[dep])
+                else:
+                    logger.warning("%s of %s depends on unknown task %s", global_id, story.id, dep)
+            # Tasks that start the story wait for the stories it depends on
+            if not any(dep in ids for dep in task.dependencies):
+                for upstream in story.depends_on:
+                    if upstream != story.id:
+                        resolved.extend(finals.get(upstream, []))
+            dependencies = list(dict.fromkeys(d for d in resolved if d != global_id))
+            tasks.append(
+                task.model_copy(update={"task_id": global_id, "dependencies": dependencies})
+            )
+        stories.append(Story(id=story.id, title=story.title, tasks=tasks))
+
+    return TaskDecompositionResult(
+        epic=outline.epic, reasoning=outline.reasoning, stories=stories
+    )
+
+
+def _decompose_hierarchical(
+    client: LLMClient, task_description: str, concurrency: int = DEFAULT_CONCURRENCY
+) -> TaskDecompositionResult | None:
+    """Outline the goal, expand its stories concurrently and merge them; None on failure."""
+    raw_response = _stream_decomposition(client, task_description, prompt="task_outline")
     try:
-        result = parse_structured_response(raw_response, TaskDecompositionResult)
+        outline = parse_structured_response(raw_response, DecompositionOutline, client)
     except ValueError as e:
-        logger.error("Failed to parse decomposition response: %s", e)
-        print(f"\n{RED}Error: Failed to parse response{RESET}")
+        logger.error("Failed to parse decomposition outline: %s", e)
+        print(f"\n{RED}Error: Failed to parse outline{RESET}")
         print(f"{DIM}{raw_response[:500]}{RESET}")
-        return
+        return None
+
+    print(f"\n{DIM}  Expanding {len(outline.stories)} stories "
+          f"(concurrency {concurrency})...{RESET}")
+    expansions = asyncio.run(_expand_stories(client, outline, concurrency))
+    failed = [story.id for story, tasks in zip(outline.stories, expansions) if tasks is None]
+    if failed:
+        print(f"\n{YELLOW}Warning: {', '.join(failed)} have no tasks{RESET}")
+    return _merge_expansions(outline, expansions)
+
+
+async def adecompose(
+    client: LLMClient,
+    task_description: str,
+    hierarchical: bool | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> TaskDecompositionResult:
+    """Decompose a goal inside an event loop, without console output.
+
+    hierarchical works as in run_decomposition(); stories whose expansion fails
+    are returned without tasks.
+
+    Raises:
+        ValueError: If the decomposition (or outline) response cannot be parsed
+    """
+    if hierarchical is None:
+        hierarchical = len(task_description) >= HIERARCHICAL_MIN_CHARS
+    aclient = ensure_async(client)
+    messages = _decomposition_messages(task_description)
+    if hierarchical:
+        raw_response = await aclient.achat(get_prompt("task_outline").static, messages)
+        outline = await aparse_structured_response(raw_response, DecompositionOutline, client)
+        expansions = await _expand_stories(client, outline, concurrency, verbose=False)
+        result = _merge_expansions(outline, expansions)
+    else:
+        raw_response = await aclient.achat(get_prompt("task_decomposition").static, messages)
+        result = await aparse_structured_response(raw_response, TaskDecompositionResult, client)
+    try:
+        result.execution_plan, _ = build_execution_plan(result)
+    except TaskGraphError as e:
+        logger.warning("Cannot compute execution plan: %s", e)
+    return result
+
+
+def run_decomposition(
+    client: LLMClient,
+    task_description: str,
+    output: str | None = "decomposed_task.json",
+    store: TaskStore | None = None,
+    similar: SimilarityIndex | None = None,
+    hierarchical: bool | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Decompose a high-level goal into sub-tasks.
+
+    Mirrors: decompose_task() in original main.py, with Pydantic validation.
+    The result is saved to output (if given) and upserted into store (if given).
+    With a similarity index, the result is indexed, and the decomposition of a
+    near-duplicate goal is reused instead if the index allows reuse.
+
+    hierarchical selects the outline-then-expand mode (None: for goals of at
+    least HIERARCHICAL_MIN_CHARS characters); concurrency limits its story calls.
+    """
+    if hierarchical is None:
+        hierarchical = len(task_description) >= HIERARCHICAL_MIN_CHARS
+
+    result, match = (
+        similar.lookup("decompose", task_description, TaskDecompositionResult)
+        if similar is not None
+        else (None, None)
+    )
+    if result is not None:
+        print(f"\n{DIM}  Reused the decomposition of a {match.similarity:.0%} similar goal{RESET}")
+    else:
+        if match is not None:
+            print(f"{DIM}  Near-duplicate of an earlier goal ({match.similarity:.0%} similar); "
+                  f"pass --reuse-similar to reuse its decomposition{RESET}")
+        if hierarchical:
+            result = _decompose_hierarchical(client, task_description, concurrency)
+            if result is None:
+                return
+        else:
+            raw_response = _stream_decomposition(client, task_description)
+            try:
+                result = parse_structured_response(raw_response, TaskDecompositionResult, client)
+            except ValueError as e:
+                logger.error("Failed to parse decomposition response: %s", e)
+                print(f"\n{RED}Error: Failed to parse response{RESET}")
+                print(f"{DIM}{raw_response[:500]}{RESET}")
+                return
+
+        _apply_local_plan(result)
+        if similar is not None:
+            similar.add("decompose", task_description, result.model_dump())
 
     _display_decomposition(result)
 
+    if store is not None:
+        store.upsert_decomposition(result)
+        print(f"\n  {DIM}Stored {sum(len(s.tasks) for s in result.stories)} tasks in: {store.path}{RESET}")
+
     # Save structured output
-    output_file = output
-    with open(output_file, "w") as f:
-        json.dump(result.model_dump(), f, indent=2, ensure_ascii=False)
-    print(f"\n  {DIM}Structured output saved to: {output_file}{RESET}\n")
+    if output:
+        with open(output, "w") as f:
+            json.dump(result.model_dump(), f, indent=2, ensure_ascii=False)
+        print(f"\n  {DIM}Structured output saved to: {output}{RESET}")
+    print()
@@ -0,0 +1,374 @@
+"""Provider-aware request scheduling for LLM clients.
+
+SchedulingClient wraps any LLMClient with:
+- token-bucket rate limiting per provider/model (requests/min and tokens/min)
+- jittered exponential backoff on 429 / 408 / 5xx / connection errors, honoring Retry-After
+- a cap on concurrent in-flight requests, shared by threads and all event loops
+
+Limits are read from the environment, next to OPENAI_MODEL / GEMINI_MODEL:
+
+    OPENAI_RPM, OPENAI_TPM, OPENAI_MAX_CONCURRENCY
+    GEMINI_RPM, GEMINI_TPM, GEMINI_MAX_CONCURRENCY
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY
+
+Unset or 0 means unlimited. Buckets and the concurrency cap are shared per
+(provider, model) across every client, thread and event loop in the process, so
+concurrent runners draw from the same quota.
+"""
+
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import httpx
+
+from client import LLMClient, ensure_async, stream_chat
+
+logger = logging.getLogger(__name__)
+
+# Tokens a completion is assumed to use when reserving tokens/min quota
+EXPECTED_COMPLETION_TOKENS = 1000
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Scheduling limits for one provider/model."""
+
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+    max_concurrency: int = 0
+    max_retries: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    @classmethod
+    def from_env(cls, provider: str) -> "RateLimits":
+        prefix = provider.upper()
+        return cls(
+            requests_per_minute=float(os.getenv(f"{prefix}_RPM", "0")),
+            tokens_per_minute=float(os.getenv(f"{prefix}_TPM", "0")),
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "0")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "60")),
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    reserve() deducts immediately (possibly into debt) and returns how long the
+    caller must wait, so sync and async callers can sleep in their own way.
+    """
+
+    def __init__(self, rate_per_minute: float) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class _Waiter:
+    """A thread or coroutine queued for a ConcurrencyLimiter slot."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.granted = False
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def wake(self) -> bool:
+        """Hand the granted slot over; False if the waiter's loop has closed."""
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            return False
+        return True
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests across every thread and event loop in the process.
+
+    Sync callers block their thread (`with limiter:`), async callers await a
+    future (`async with limiter:`) without blocking their loop. Both draw from the
+    same `limit` slots, which are handed to waiters first come, first served.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        waiter.event.wait()
+
+    async def aacquire(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            # The slot was handed over just as the caller was cancelled
+            if granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self.active -= 1
+                    return
+                # The slot passes straight to the next waiter, so `active` is unchanged
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+            if waiter.wake():
+                return
+
+    def __enter__(self) -> "ConcurrencyLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class _ProviderSchedule:
+    """Shared buckets and concurrency slots for one provider/model."""
+
+    def __init__(self, limits: RateLimits) -> None:
+        self.limits = limits
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self._slots = (
+            ConcurrencyLimiter(limits.max_concurrency) if limits.max_concurrency > 0 else None
+        )
+
+    def reserve(self, estimated_tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def slots(self) -> ConcurrencyLimiter | None:
+        """The one limiter shared by sync, streaming and async calls in every loop."""
+        return self._slots
+
+
+_schedules: dict[tuple[str, str], _ProviderSchedule] = {}
+_schedules_lock = threading.Lock()
+
+
+def get_schedule(provider: str, model: str, limits: RateLimits | None = None) -> _ProviderSchedule:
+    """Return the process-wide schedule for a provider/model, creating it on first use."""
+    with _schedules_lock:
+        schedule = _schedules.get((provider, model))
+        if schedule is None:
+            schedule = _ProviderSchedule(limits or RateLimits.from_env(provider))
+            _schedules[(provider, model)] = schedule
+        return schedule
+
+
+def _estimate_tokens(system_prompt: str, messages: list[dict[str, str]]) -> int:
+    chars = len(system_prompt) + sum(len(m["content"]) for m in messages)
+    return chars // 4 + EXPECTED_COMPLETION_TOKENS
+
+
+def _status_code(exc: BaseException) -> int | None:
+    """HTTP status of an SDK error (openai uses status_code, genai uses code)."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate limits, timeouts, server errors and dropped connections."""
+    status = _status_code(exc)
+    if status is not None:
+        # 409 is a conflict the same request would hit again, not a transient error
+        return status in (408, 429) or status >= 500
+    if isinstance(exc, httpx.TransportError):
+        return True
+    # openai wraps transport failures in APIConnectionError / APITimeoutError
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds to wait from a Retry-After / retry-after-ms header, if present."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(limits: RateLimits, attempt: int, exc: BaseException) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(limits.max_delay, limits.base_delay * 2**attempt))
+    hinted = retry_after(exc)
+    if hinted is not None:
+        delay = max(delay, min(hinted, limits.max_delay))
+    return delay
+
+
+class SchedulingClient:
+    """LLMClient wrapper applying rate limits, retries and a concurrency cap.
+
+    Args:
+        inner: The client performing the actual requests.
+        limits: Override the environment-derived limits for this provider/model.
+    """
+
+    def __init__(self, inner: LLMClient, limits: RateLimits | None = None) -> None:
+        self.inner = inner
+        self.provider = getattr(inner, "provider", type(inner).__name__)
+        self.model = getattr(inner, "model", "")
+        self.schedule = get_schedule(self.provider, self.model, limits)
+
+    def _should_retry(self, exc: Exception, attempt: int) -> float | None:
+        limits = self.schedule.limits
+        if attempt >= limits.max_retries or not is_retryable(exc):
+            return None
+        delay = backoff_delay(limits, attempt, exc)
+        logger.warning(
+            "%s/%s request failed (%s), retry %d/%d in %.1fs",
+            self.provider, self.model, exc, attempt + 1, limits.max_retries, delay,
+        )
+        return delay
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        estimated = _estimate_tokens(system_prompt, messages)
+        attempt = 0
+        while True:
+            wait = self.schedule.reserve(estimated)
+            if wait > 0:
+                time.sleep(wait)
+            slots = self.schedule.slots()
+            try:
+                if slots:
+                    with slots:
+                        return self.inner.chat(system_prompt, messages)
+                return self.inner.chat(system_prompt, messages)
+            except Exception as e:
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        estimated = _estimate_tokens(system_prompt, messages)
+        inner = ensure_async(self.inner)
+        attempt = 0
+        while True:
+            wait = self.schedule.reserve(estimated)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            slots = self.schedule.slots()
+            try:
+                if slots:
+                    async with slots:
+                        return await inner.achat(system_prompt, messages)
+                return await inner.achat(system_prompt, messages)
+            except Exception as e:
+                delay = self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        """Stream a response; retries only happen before the first chunk arrives."""
+        estimated = _estimate_tokens(system_prompt, messages)
+        attempt = 0
+        while True:
+            wait = self.schedule.reserve(estimated)
+            if wait > 0:
+                time.sleep(wait)
+            slots = self.schedule.slots()
+            if slots:
+                slots.acquire()
+            started = False
+            try:
+                for chunk in stream_chat(self.inner, system_prompt, messages):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._should_retry(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                if slots:
+                    slots.release()
+            time.sleep(delay)
+            attempt += 1
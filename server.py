@@ -0,0 +1,449 @@
+"""Local HTTP service for the score, decompose, dispatch and brainstorm flows.
+
+`python main.py serve` keeps one process warm for callers that run a flow per
+event (e.g. the Forge app per Jira event), instead of paying interpreter start,
+SDK imports and client construction on every invocation:
+
+    POST /score       {"text": ...}                                  -> ScoreResult
+    POST /decompose   {"text": ..., "hierarchical": null}            -> TaskDecompositionResult
+    POST /dispatch    {"tasks": [...]} or {"decomposition": {...}},
+                      optional "samples"                             -> DispatchResult
+    POST /brainstorm  {"context": ..., "history": [...]}             -> {"response", "message"}
+    POST /brainstorm/sessions               {"context": ...}         -> session
+    POST /brainstorm/sessions/<id>/answer   {"selected": [...], "other": ...} -> session
+    POST /brainstorm/sessions/<id>/resume   {}                       -> session
+    GET  /brainstorm/sessions/<id>          stored session, no model call
+    GET  /health      liveness and configuration
+    GET  /metrics     request counts and latencies, per-prompt LLM telemetry
+
+/brainstorm runs one stateless round: history holds the messages after the
+initial one, and the returned "message" is the assistant message to append
+before the user's next answer. The session endpoints keep the conversation
+server-side instead (see sessions.py); a session is
+{"session_id", "status", "rounds", "response"}, and "selected" holds 0-based
+option indices.
+
+Requests are handled on threads (ThreadingHTTPServer) while every LLM call runs
+on a single event loop thread, so the async provider clients, their connection
+pools and the compiled prompts are created once and shared by all requests. At
+most max_concurrency requests run at a time; others wait up to queue_timeout
+seconds and then get 503. Invalid requests get 400 (404 for unknown endpoints
+and sessions, 409 for a session not awaiting an answer), model responses that
+cannot be parsed 502, timeouts 504 and unexpected errors 500. Blocking IO (the
+response cache, the session store) runs in worker threads, off the event loop.
+If SCRUMAI_SERVE_TOKEN is set, every request needs an
+"Authorization: Bearer <token>" header.
+"""
+
+import asyncio
+import concurrent.futures
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from classifier import DispatchClassifier
+from client import LLMClient
+from prompt_registry import PROMPTS
+from runners.brainstorm import _build_initial_user_message, abrainstorm_round
+from runners.dispatch import _extract_tasks_for_prompt, adispatch
+from runners.scoring import ascore_issue
+from runners.task import adecompose
+from sessions import BrainstormSessions, SessionStateError, SessionStore
+from telemetry import TELEMETRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONCURRENCY = 16
+MAX_BODY_BYTES = 2 * 1024 * 1024
+MAX_SAMPLES = 9
+# Latencies kept per endpoint, and LLM call records kept for /metrics
+LATENCY_WINDOW = 1000
+TELEMETRY_WINDOW = 10000
+
+_SESSION_PATH = re.compile(r"^/brainstorm/sessions/([0-9a-f]{32})(?:/(answer|resume))?$")
+
+
+class HTTPError(Exception):
+    """A request failure reported to the client with an HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
+
+
+def _require_text(body: dict, key: str = "text") -> str:
+    value = body.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a non-empty string")
+    return value
+
+
+def _optional(body: dict, key: str, kind: type, default=None):
+    value = body.get(key, default)
+    if value is not None and not isinstance(value, kind):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a {kind.__name__}")
+    return value
+
+
+class ScrumAIService:
+    """The flows behind the HTTP endpoints, sharing one client and event loop.
+
+    Args:
+        client: The (warm) LLM client every request uses.
+        max_concurrency: Requests handled at the same time.
+        queue_timeout: Seconds a request waits for a free slot before 503.
+        request_timeout: Seconds a request may run before 504.
+        classifier: Dispatch pre-classifier for /dispatch, if any.
+        sessions: Store for the brainstorm session endpoints (default: an in-memory one).
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        queue_timeout: float = 30.0,
+        request_timeout: float = 600.0,
+        classifier: DispatchClassifier | None = None,
+        sessions: SessionStore | None = None,
+    ) -> None:
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self.classifier = classifier
+        self.sessions = BrainstormSessions(client, sessions or SessionStore(":memory:"))
+        self.started = time.time()
+        self.rejected = 0
+        self.in_flight = 0
+        self.stats: dict[str, EndpointStats] = {}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="scrumai-serve-loop", daemon=True
+        )
+        self._thread.start()
+        self.routes = {
+            "/score": self.score,
+            "/decompose": self.decompose,
+            "/dispatch": self.dispatch,
+            "/brainstorm": self.brainstorm,
+            "/brainstorm/sessions": self.start_session,
+        }
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def _run[T](self, coro: Coroutine[object, object, T]) -> T:
+        """Run a flow on the service loop and wait for its result.
+
+        Request bodies are validated before this, so a ValueError raised by the
+        flow means the model's response was unusable.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout=self.request_timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Request timed out") from None
+        except SessionStateError as e:
+            raise HTTPError(HTTPStatus.CONFLICT, str(e)) from None
+        except ValueError as e:
+            logger.warning("Unusable model response: %s", e)
+            raise HTTPError(
+                HTTPStatus.BAD_GATEWAY, f"Model response could not be parsed: {str(e)[:300]}"
+            ) from e
+
+    def handle(self, path: str, body: dict) -> dict:
+        """Run the flow behind a POST endpoint, within the concurrency limit.
+
+        Raises:
+            HTTPError: For unknown paths, invalid bodies, a full service, timeouts
+                and model responses that cannot be parsed.
+        """
+        handler = self.routes.get(path)
+        session_path = _SESSION_PATH.match(path)
+        if session_path is not None and session_path.group(2) is not None:
+            session_id, action = session_path.groups()
+            handler = {"answer": self.answer_session, "resume": self.resume_session}[action]
+            body = {**body, "session_id": session_id}
+            path = f"/brainstorm/sessions/{action}"
+        if handler is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {path}")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many concurrent requests")
+
+        with self._lock:
+            self.in_flight += 1
+            stats = self.stats.setdefault(path, EndpointStats())
+            stats.requests += 1
+        start = time.perf_counter()
+        try:
+            return handler(body)
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                stats.latencies.append(time.perf_counter() - start)
+            self._slots.release()
+
+    def score(self, body: dict) -> dict:
+        text = _require_text(body)
+        return self._run(ascore_issue(self.client, text)).model_dump()
+
+    def decompose(self, body: dict) -> dict:
+        text = _require_text(body)
+        hierarchical = _optional(body, "hierarchical", bool)
+        concurrency = _optional(body, "concurrency", int, 4)
+        result = self._run(adecompose(self.client, text, hierarchical, max(1, concurrency)))
+        return result.model_dump()
+
+    def dispatch(self, body: dict) -> dict:
+        if "decomposition" in body:
+            try:
+                tasks = _extract_tasks_for_prompt(_optional(body, "decomposition", dict))
+            except (AttributeError, KeyError, TypeError):
+                tasks = None
+        else:
+            tasks = _optional(body, "tasks", list)
+        if not tasks or not all(
+            isinstance(t, dict) and isinstance(t.get("task_id"), str) and "title" in t
+            for t in tasks
+        ):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                "'tasks' (or the tasks of 'decomposition') must be a non-empty list "
+                "of objects with task_id and title",
+            )
+        samples = _optional(body, "samples", int, 1)
+        if not 1 <= samples <= MAX_SAMPLES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"'samples' must be 1-{MAX_SAMPLES}")
+        result = self._run(
+            adispatch(self.client, tasks, samples=samples, classifier=self.classifier)
+        )
+        return result.model_dump()
+
+    def brainstorm(self, body: dict) -> dict:
+        context = _optional(body, "context", str)
+        history = _optional(body, "history", list, [])
+        if not all(
+            isinstance(m, dict)
+            and m.get("role") in ("assistant", "user")
+            and isinstance(m.get("content"), str)
+            for m in history
+        ):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                "'history' must be a list of {role: assistant|user, content} messages",
+            )
+        messages = [{"role": "user", "content": _build_initial_user_message(context)}]
+        messages += [{"role": m["role"], "content": m["content"]} for m in history]
+        response, raw_response = self._run(abrainstorm_round(self.client, messages))
+        return {
+            "response": response.model_dump(exclude_none=True),
+            "message": {"role": "assistant", "content": raw_response},
+        }
+
+    def _session(self, session_id: str):
+        try:
+            return self._run(self.sessions.get(session_id))
+        except KeyError:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown session: {session_id}") from None
+
+    def get_session(self, path: str) -> dict | None:
+        """The stored session for a GET path, or None if the path is not a session."""
+        session_path = _SESSION_PATH.match(path)
+        if session_path is None or session_path.group(2) is not None:
+            return None
+        return self._session(session_path.group(1)).as_dict()
+
+    def start_session(self, body: dict) -> dict:
+        context = _optional(body, "context", str)
+        return self._run(self.sessions.start_session(context)).as_dict()
+
+    def answer_session(self, body: dict) -> dict:
+        selected = _optional(body, "selected", list, [])
+        other = _optional(body, "other", str, "")
+        if not all(isinstance(i, int) for i in selected):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'selected' must be a list of option indices")
+        session = self._session(body["session_id"])
+        if session.status != "active":
+            raise HTTPError(
+                HTTPStatus.CONFLICT, f"Session is {session.status}, not awaiting an answer"
+            )
+        return self._run(self.sessions.answer(session.session_id, selected, other)).as_dict()
+
+    def resume_session(self, body: dict) -> dict:
+        session = self._session(body["session_id"])
+        return self._run(self.sessions.resume(session.session_id)).as_dict()
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "provider": getattr(self.client, "provider", type(self.client).__name__),
+            "model": getattr(self.client, "model", ""),
+            "prompts": PROMPTS.names(),
+        }
+
+    def metrics(self) -> dict:
+        with self._lock:
+            endpoints = {path: stats.as_dict() for path, stats in self.stats.items()}
+            in_flight, rejected = self.in_flight, self.rejected
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "in_flight": in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rejected": rejected,
+            "endpoints": endpoints,
+            "llm": TELEMETRY.summary(),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: ScrumAIService  # set on the subclass created by serve()
+    token: str | None = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: HTTPStatus, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        return hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode())
+
+    def _read_body(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be JSON") from None
+        if not isinstance(body, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return body
+
+    def do_GET(self) -> None:
+        try:
+            if not self._authorized():
+                raise HTTPError(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+            if self.path == "/health":
+                result = self.service.health()
+            elif self.path == "/metrics":
+                result = self.service.metrics()
+            else:
+                result = self.service.get_session(self.path)
+                if result is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint: {self.path}")
+        except HTTPError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception:
+            logger.exception("Request to %s failed", self.path)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"})
+        else:
+            self._send_json(HTTPStatus.OK, result)
+
+    def do_POST(self) -> None:
+        try:
+            if not self._authorized():
+                raise HTTPError(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+            result = self.service.handle(self.path, self._read_body())
+        except HTTPError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception:
+            logger.exception("Request to %s failed", self.path)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"})
+        else:
+            self._send_json(HTTPStatus.OK, result)
+
+
+def serve(
+    client: LLMClient,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    queue_timeout: float = 30.0,
+    request_timeout: float = 600.0,
+    classifier: DispatchClassifier | None = None,
+    sessions: SessionStore | None = None,
+) -> None:
+    """Serve the flows over HTTP until interrupted."""
+    # Compile every prompt up front so no request pays for it
+    PROMPTS.all()
+    # Bound the per-prompt telemetry kept in memory by a long-running process
+    TELEMETRY.records = deque(TELEMETRY.records, maxlen=TELEMETRY_WINDOW)
+
+    service = ScrumAIService(
+        client, max_concurrency, queue_timeout, request_timeout, classifier, sessions
+    )
+    handler = type(
+        "ScrumAIHandler",
+        (_Handler,),
+        {"service": service, "token": os.getenv("SCRUMAI_SERVE_TOKEN") or None},
+    )
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    print(f"Serving on http://{host}:{httpd.server_address[1]} "
+          f"(max {max_concurrency} concurrent requests, Ctrl+C to stop)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        httpd.server_close()
+        service.close()
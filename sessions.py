@@ -0,0 +1,285 @@
+"""Resumable brainstorm sessions, many per process.
+
+run_brainstorm() drives one blocking terminal session. BrainstormSessions runs the
+same flow as an engine instead: every call advances one session by one round with
+an async LLM call, and the session (conversation, compaction state and latest
+response) is persisted to SQLite after every step, so any number of interleaved
+sessions can share one worker and survive a restart:
+
+    sessions = BrainstormSessions(client, SessionStore())
+    session = await sessions.start_session(ticket_text)
+    session = await sessions.answer(session.session_id, [0, 2], "")
+    session = await sessions.resume(session.session_id)
+
+A round whose response cannot be parsed leaves the user's answer stored;
+resume() retries it.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
+from client import LLMClient
+from models.brainstorm import BrainstormResponse
+from runners.brainstorm import (
+    DEFAULT_KEEP_TURNS,
+    ConversationCompactor,
+    _build_initial_user_message,
+    _format_user_answer,
+    abrainstorm_round,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_DB = ".scrumai_cache/brainstorm_sessions.db"
+
+
+class SessionStateError(ValueError):
+    """The session is not in a state that allows the requested step."""
+
+
+@dataclass
+class BrainstormSession:
+    """One brainstorm session and where it stands."""
+
+    session_id: str
+    context: str | None
+    conversation: list[dict[str, str]]
+    compactor: ConversationCompactor
+    response: BrainstormResponse | None
+    created: float
+    updated: float
+
+    @property
+    def status(self) -> str:
+        """Session state: "pending" (waiting for a model round), "active" (waiting
+        for an answer) or "complete"."""
+        if self.conversation[-1]["role"] == "user":
+            return "pending"
+        if self.response is not None and self.response.isComplete:
+            return "complete"
+        return "active"
+
+    @property
+    def rounds(self) -> int:
+        return sum(1 for m in self.conversation if m["role"] == "assistant")
+
+    def as_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "rounds": self.rounds,
+            "response": (
+                self.response.model_dump(exclude_none=True) if self.response is not None else None
+            ),
+        }
+
+
+class SessionStore:
+    """SQLite persistence for brainstorm sessions.
+
+    Args:
+        path: SQLite database file (created on first use).
+    """
+
+    def __init__(self, path: str = DEFAULT_SESSION_DB) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS brainstorm_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    context TEXT,
+                    conversation TEXT NOT NULL,
+                    compactor TEXT NOT NULL,
+                    response TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_brainstorm_sessions_updated
+                    ON brainstorm_sessions(updated);
+                """
+            )
+
+    def save(self, session: BrainstormSession) -> None:
+        session.updated = time.time()
+        row = (
+            session.session_id,
+            session.context,
+            json.dumps(session.conversation, ensure_ascii=False),
+            json.dumps(session.compactor.state(), ensure_ascii=False),
+            session.response.model_dump_json() if session.response is not None else None,
+            session.created,
+            session.updated,
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO brainstorm_sessions
+                    (session_id, context, conversation, compactor, response, created, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE SET
+                    conversation = excluded.conversation,
+                    compactor = excluded.compactor,
+                    response = excluded.response,
+                    updated = excluded.updated
+                """,
+                row,
+            )
+
+    def load(self, session_id: str) -> BrainstormSession:
+        """Load a session.
+
+        Raises:
+            KeyError: If there is no session with this id.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context, conversation, compactor, response, created, updated "
+                "FROM brainstorm_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown brainstorm session: {session_id}")
+        context, conversation, compactor, response, created, updated = row
+        return BrainstormSession(
+            session_id=session_id,
+            context=context,
+            conversation=json.loads(conversation),
+            compactor=ConversationCompactor.from_state(json.loads(compactor)),
+            response=(
+                BrainstormResponse.model_validate_json(response) if response is not None else None
+            ),
+            created=created,
+            updated=updated,
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM brainstorm_sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class BrainstormSessions:
+    """Brainstorm engine advancing persisted sessions one round per call.
+
+    Calls for different sessions run concurrently; calls for the same session are
+    serialized, so a double-submitted answer cannot interleave with itself.
+
+    Args:
+        client: LLM client for the rounds (async if available).
+        store: Where sessions are persisted.
+        keep_turns: Rounds sent verbatim per request (see ConversationCompactor).
+    """
+
+    def __init__(
+        self, client: LLMClient, store: SessionStore, keep_turns: int = DEFAULT_KEEP_TURNS
+    ) -> None:
+        self.client = client
+        self.store = store
+        self.keep_turns = keep_turns
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def _round(self, session: BrainstormSession) -> BrainstormSession:
+        """Run the pending model round and persist the session."""
+        response, raw_response = await abrainstorm_round(
+            self.client, session.compactor.messages(session.conversation)
+        )
+        session.conversation.append({"role": "assistant", "content": raw_response})
+        session.compactor.observe(response)
+        session.response = response
+        await asyncio.to_thread(self.store.save, session)
+        return session
+
+    async def get(self, session_id: str) -> BrainstormSession:
+        """The stored session, without running a round.
+
+        Raises:
+            KeyError: If there is no session with this id.
+        """
+        return await asyncio.to_thread(self.store.load, session_id)
+
+    async def start_session(self, context: str | None = None) -> BrainstormSession:
+        """Start a session (optionally on ticket context) and run its first round.
+
+        Raises:
+            ValueError: If the first response cannot be parsed; nothing is stored.
+        """
+        now = time.time()
+        session = BrainstormSession(
+            session_id=uuid.uuid4().hex,
+            context=context,
+            conversation=[{"role": "user", "content": _build_initial_user_message(context)}],
+            compactor=ConversationCompactor(self.keep_turns),
+            response=None,
+            created=now,
+            updated=now,
+        )
+        async with self._lock(session.session_id):
+            return await self._round(session)
+
+    async def answer(
+        self, session_id: str, selected_indices: list[int], other_text: str = ""
+    ) -> BrainstormSession:
+        """Answer the session's current question and run the next round.
+
+        selected_indices are 0-based indices into the current options.
+
+        Raises:
+            KeyError: If there is no session with this id.
+            SessionStateError: If the session is not waiting for an answer.
+            ValueError: If the next response cannot be parsed (the answer is kept;
+                see resume()).
+        """
+        async with self._lock(session_id):
+            session = await self.get(session_id)
+            if session.status != "active":
+                raise SessionStateError(
+                    f"Session {session_id} is {session.status}, not awaiting an answer"
+                )
+            response = session.response
+            options = [opt.model_dump() for opt in response.options]
+            answer = _format_user_answer(selected_indices, other_text, options)
+            session.conversation.append({"role": "user", "content": answer})
+            session.compactor.record_answer(
+                response.question,
+                [options[i]["value"] for i in selected_indices if 0 <= i < len(options)],
+                other_text,
+            )
+            await asyncio.to_thread(self.store.save, session)
+            return await self._round(session)
+
+    async def resume(self, session_id: str) -> BrainstormSession:
+        """Load a session, first retrying its model round if that is still pending.
+
+        Raises:
+            KeyError: If there is no session with this id.
+            ValueError: If the retried response cannot be parsed.
+        """
+        async with self._lock(session_id):
+            session = await self.get(session_id)
+            if session.status == "pending":
+                session = await self._round(session)
+            return session
@@ -0,0 +1,316 @@
+"""Near-duplicate ticket index for scoring and decomposition results.
+
+Cloned Jira templates and lightly edited tickets miss the exact-match response
+cache. This index finds previously scored or decomposed tickets whose text is
+similar enough to reuse their result:
+
+- each ticket is reduced to word-bigram shingles and a 128-permutation MinHash
+  signature, split into 32 LSH bands of 4 rows, so lookups only compare against
+  tickets sharing at least one band bucket (pairs above ~0.6 Jaccard nearly
+  always do)
+- candidates are verified with the exact Jaccard similarity of their shingles
+
+Reused results can be adapted to the new ticket: short phrases the word diff
+shows were replaced (a product name, a field, a number) are replaced in the
+free-text fields of the result as well (ids, roles and status values are left
+alone), and the adapted result must still validate. Every reuse is appended to an
+audit log.
+
+The index is a SQLite file next to the response cache, so it persists between runs.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 2
+# Longest phrase (in words) that adaptation carries over from the ticket diff
+MAX_REPLACED_WORDS = 4
+# Result fields holding prose that adaptation may rewrite; every other field
+# (task_id, dependencies, role, status, ...) is copied unchanged
+FREE_TEXT_FIELDS = frozenset(
+    {"title", "description", "summary", "reason", "reasoning", "acceptance_criteria"}
+)
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5C2A)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)
+]
+
+_WORD = re.compile(r"\w+")
+_PUNCTUATION = ".,:;!?()[]\"'`*_"
+
+
+def _shingles(text: str) -> set[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [
+            " ".join(words[i : i + SHINGLE_WORDS])
+            for i in range(len(words) - SHINGLE_WORDS + 1)
+        ]
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+        % _MERSENNE
+        for g in grams
+    }
+
+
+def _signature(shingles: set[int]) -> list[int]:
+    return [min((a * h + b) % _MERSENNE for h in shingles) for a, b in _PERMUTATIONS]
+
+
+def _buckets(signature: list[int]) -> list[int]:
+    """One bucket id per band (signed 64-bit, to fit an SQLite INTEGER)."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def _jaccard(a: set[int], b: set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SimilarMatch:
+    """A previously indexed ticket similar to the one looked up."""
+
+    entry_id: int
+    similarity: float
+    text: str
+    result: dict
+    created: float
+
+
+class SimilarityIndex:
+    """Persistent MinHash/LSH index of ticket texts and their results, per kind
+    ("score", "decompose").
+
+    Args:
+        directory: Where similar.db and similar_audit.jsonl live (default: the cache dir).
+        threshold: Minimum Jaccard similarity of word bigrams for a match.
+        reuse: Whether lookup() returns matched results for reuse, or only reports them.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        reuse: bool = False,
+    ) -> None:
+        self.directory = Path(directory or os.getenv("SCRUMAI_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.threshold = threshold
+        self.reuse = reuse
+        self.audit_path = self.directory / "similar_audit.jsonl"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.directory / "similar.db", check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    UNIQUE (kind, text_hash)
+                );
+                CREATE TABLE IF NOT EXISTS buckets (
+                    kind TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    entry_id INTEGER NOT NULL,
+                    PRIMARY KEY (kind, band, bucket, entry_id)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def add(self, kind: str, text: str, result: dict) -> None:
+        """Index a ticket's result; re-adding the same text replaces its result."""
+        shingles = _shingles(text)
+        if not shingles:
+            return
+        buckets = _buckets(_signature(shingles))
+        with self._lock, self._conn:
+            entry_id = self._conn.execute(
+                """
+                INSERT INTO entries (kind, text_hash, text, result, created)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (kind, text_hash)
+                DO UPDATE SET result = excluded.result, created = excluded.created
+                RETURNING id
+                """,
+                (kind, _text_hash(text), text, json.dumps(result, ensure_ascii=False), time.time()),
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO buckets (kind, band, bucket, entry_id) VALUES (?, ?, ?, ?)",
+                [(kind, band, bucket, entry_id) for band, bucket in enumerate(buckets)],
+            )
+
+    def match(self, kind: str, text: str) -> SimilarMatch | None:
+        """The most similar indexed ticket at or above the threshold, if any."""
+        shingles = _shingles(text)
+        if not shingles:
+            return None
+        buckets = _buckets(_signature(shingles))
+        with self._lock:
+            candidates = self._conn.execute(
+                f"""
+                SELECT e.id, e.text, e.result, e.created FROM entries e
+                WHERE e.id IN (
+                    SELECT entry_id FROM buckets
+                    WHERE kind = ? AND (band, bucket) IN (VALUES {", ".join(["(?, ?)"] * BANDS)})
+                )
+                """,
+                [kind, *(v for band, bucket in enumerate(buckets) for v in (band, bucket))],
+            ).fetchall()
+
+        best: SimilarMatch | None = None
+        for entry_id, candidate, result, created in candidates:
+            similarity = _jaccard(shingles, _shingles(candidate))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = SimilarMatch(entry_id, similarity, candidate, json.loads(result), created)
+        return best
+
+    def lookup[T: BaseModel](
+        self, kind: str, text: str, model_class: type[T], label: str | None = None
+    ) -> tuple[T | None, SimilarMatch | None]:
+        """Find a similar ticket and, if reuse is enabled, its result adapted to text.
+
+        Returns (result, match); result is None when nothing matched, reuse is
+        disabled, or the adapted result no longer validates. Reuses are audited.
+        """
+        match = self.match(kind, text)
+        if match is None or not self.reuse:
+            return None, match
+        data, substitutions = adapt_result(match.result, match.text, text)
+        try:
+            result = model_class.model_validate(data)
+        except ValidationError as e:
+            logger.warning("Similar %s result of entry %d is invalid: %s", kind, match.entry_id, e)
+            return None, match
+        self.log_reuse(kind, text, match, substitutions, label)
+        return result, match
+
+    def log_reuse(
+        self,
+        kind: str,
+        text: str,
+        match: SimilarMatch,
+        substitutions: list[tuple[str, str]],
+        label: str | None = None,
+    ) -> None:
+        """Append a reused result to the audit log."""
+        record = {
+            "time": time.time(),
+            "kind": kind,
+            "label": label,
+            "similarity": round(match.similarity, 4),
+            "text_hash": _text_hash(text),
+            "text": text[:300],
+            "reused_entry": match.entry_id,
+            "reused_text_hash": _text_hash(match.text),
+            "reused_text": match.text[:300],
+            "substitutions": substitutions,
+        }
+        with self._lock:
+            with open(self.audit_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info(
+            "Reused %s result of entry %d (%.0f%% similar)",
+            kind,
+            match.entry_id,
+            match.similarity * 100,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _replacements(old_text: str, new_text: str) -> list[tuple[str, str]]:
+    """Short phrases replaced between two versions of a ticket, per the word diff."""
+    old_words, new_words = old_text.split(), new_text.split()
+    matcher = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+    pairs: list[tuple[str, str]] = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != "replace" or max(i2 - i1, j2 - j1) > MAX_REPLACED_WORDS:
+            continue
+        old = " ".join(old_words[i1:i2]).strip(_PUNCTUATION)
+        new = " ".join(new_words[j1:j2]).strip(_PUNCTUATION)
+        # Very short tokens ("a", "1") would replace unrelated text
+        if len(old) >= 3 and old != new and (old, new) not in pairs:
+            pairs.append((old, new))
+    return pairs
+
+
+def adapt_result(result: dict, old_text: str, new_text: str) -> tuple[dict, list[tuple[str, str]]]:
+    """Carry phrases replaced between old_text and new_text over into the free-text
+    fields (FREE_TEXT_FIELDS) of result.
+
+    Returns the adapted copy of result and the (old, new) substitutions applied.
+    """
+    pairs = _replacements(old_text, new_text)
+    if not pairs:
+        return result, []
+    replacements = dict(pairs)
+    # One pass over all phrases, longest first, so a replacement is never replaced again
+    pattern = re.compile(
+        r"(?<!\w)("
+        + "|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True))
+        + r")(?!\w)"
+    )
+    applied: set[str] = set()
+
+    def replace(match: re.Match) -> str:
+        applied.add(match.group())
+        return replacements[match.group()]
+
+    def adapt(value, free_text: bool = False):
+        if isinstance(value, str):
+            return pattern.sub(replace, value) if free_text else value
+        if isinstance(value, list):
+            return [adapt(v) for v in value]
+        if isinstance(value, dict):
+            return {k: adapt(v, k in FREE_TEXT_FIELDS) for k, v in value.items()}
+        return value
+
+    adapted = adapt(result)
+    return adapted, [(old, new) for old, new in pairs if old in applied]
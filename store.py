@@ -0,0 +1,584 @@
+"""SQLite-backed store for decomposed tasks and their dispatches.
+
+Replaces re-reading and rewriting decomposed_task.json / dispatched_task.json on
+every command for large boards:
+
+- stories, tasks, dependency edges and dispatches belong to one epic and are keyed
+  by (epic, id): every decomposition numbers its stories and tasks from
+  STORY-001 / TASK-001, so ids are only unique within their epic
+- tasks are indexed by task_id, status, role and owner_type
+- dependency edges live in their own table, indexed in both directions
+- dispatches are indexed by task_id and recommended role, with the fingerprint
+  used for incremental re-dispatch
+- every write is a single transaction (upserts keyed on epic title, story id and
+  task id), so a crash never leaves a half-imported decomposition
+
+Methods that read or write tasks and dispatches take an epic title and default to
+the most recently updated epic.
+
+The existing JSON formats remain the interchange format: import_json() /
+export_decomposition() / export_dispatch() round-trip them.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import get_args
+
+from models.role import DispatchResult, TaskDispatch
+from models.task import Epic, ExecutionPlan, Story, Task, TaskDecompositionResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE = "scrumai_tasks.db"
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS epics (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL,
+    reasoning TEXT NOT NULL DEFAULT '',
+    execution_plan TEXT,
+    dispatch_summary TEXT NOT NULL DEFAULT '',
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stories (
+    epic_id INTEGER NOT NULL REFERENCES epics(id) ON DELETE CASCADE,
+    story_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (epic_id, story_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stories_epic ON stories(epic_id, position);
+CREATE TABLE IF NOT EXISTS tasks (
+    epic_id INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    story_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    role TEXT NOT NULL,
+    owner_type TEXT NOT NULL,
+    assignee TEXT NOT NULL,
+    estimate_hours REAL,
+    story_points INTEGER,
+    acceptance_criteria TEXT NOT NULL,
+    blocker_reason TEXT,
+    artifacts TEXT NOT NULL,
+    PRIMARY KEY (epic_id, task_id),
+    FOREIGN KEY (epic_id, story_id) REFERENCES stories(epic_id, story_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tasks_story ON tasks(epic_id, story_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_role ON tasks(role);
+CREATE INDEX IF NOT EXISTS idx_tasks_owner_type ON tasks(owner_type);
+CREATE TABLE IF NOT EXISTS dependencies (
+    epic_id INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    depends_on TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (epic_id, task_id, depends_on),
+    FOREIGN KEY (epic_id, task_id) REFERENCES tasks(epic_id, task_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dependencies_reverse ON dependencies(epic_id, depends_on);
+CREATE TABLE IF NOT EXISTS dispatches (
+    epic_id INTEGER NOT NULL REFERENCES epics(id) ON DELETE CASCADE,
+    task_id TEXT NOT NULL,
+    recommended_role TEXT NOT NULL,
+    owner_type TEXT NOT NULL,
+    autonomy_level TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    fingerprint TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (epic_id, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dispatches_role ON dispatches(recommended_role);
+"""
+
+# Version 1 keyed stories, tasks and dispatches by their id alone. Its tables are
+# renamed, the current schema is created, and the rows are copied over with the
+# epic of their story (dispatches of unknown tasks are dropped).
+_MIGRATE_V1_RENAME = """
+ALTER TABLE epics ADD COLUMN dispatch_summary TEXT NOT NULL DEFAULT '';
+DROP INDEX IF EXISTS idx_stories_epic;
+DROP INDEX IF EXISTS idx_tasks_story;
+DROP INDEX IF EXISTS idx_tasks_status;
+DROP INDEX IF EXISTS idx_tasks_role;
+DROP INDEX IF EXISTS idx_tasks_owner_type;
+DROP INDEX IF EXISTS idx_dependencies_reverse;
+DROP INDEX IF EXISTS idx_dispatches_role;
+ALTER TABLE stories RENAME TO stories_v1;
+ALTER TABLE tasks RENAME TO tasks_v1;
+ALTER TABLE dependencies RENAME TO dependencies_v1;
+ALTER TABLE dispatches RENAME TO dispatches_v1;
+"""
+
+_MIGRATE_V1_COPY = """
+INSERT INTO stories (epic_id, story_id, title, position)
+    SELECT epic_id, story_id, title, position FROM stories_v1;
+INSERT INTO tasks
+    SELECT s.epic_id, t.task_id, t.story_id, t.position, t.title, t.description, t.status,
+           t.role, t.owner_type, t.assignee, t.estimate_hours, t.story_points,
+           t.acceptance_criteria, t.blocker_reason, t.artifacts
+    FROM tasks_v1 t JOIN stories_v1 s ON s.story_id = t.story_id;
+INSERT INTO dependencies
+    SELECT s.epic_id, d.task_id, d.depends_on, d.position
+    FROM dependencies_v1 d JOIN tasks_v1 t ON t.task_id = d.task_id
+    JOIN stories_v1 s ON s.story_id = t.story_id;
+INSERT INTO dispatches
+    SELECT s.epic_id, d.task_id, d.recommended_role, d.owner_type, d.autonomy_level,
+           d.total_score, d.fingerprint, d.data
+    FROM dispatches_v1 d JOIN tasks_v1 t ON t.task_id = d.task_id
+    JOIN stories_v1 s ON s.story_id = t.story_id;
+UPDATE epics SET dispatch_summary = COALESCE(
+    (SELECT value FROM meta WHERE key = 'dispatch_summary'), '')
+    WHERE id IN (SELECT epic_id FROM dispatches);
+DROP TABLE dispatches_v1;
+DROP TABLE dependencies_v1;
+DROP TABLE tasks_v1;
+DROP TABLE stories_v1;
+DROP TABLE meta;
+"""
+
+TASK_STATUSES = get_args(Task.model_fields["status"].annotation)
+
+_TASK_COLUMNS = (
+    "task_id", "title", "description", "status", "role", "owner_type", "assignee",
+    "estimate_hours", "story_points", "acceptance_criteria", "blocker_reason", "artifacts",
+)
+
+
+class TaskStore:
+    """Persistent task tree and dispatch store.
+
+    Args:
+        path: SQLite database file (created on first use).
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version >= _SCHEMA_VERSION:
+            return
+        has_tables = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stories'"
+        ).fetchone()
+        if has_tables:
+            logger.info("Migrating task store %s to schema version %d", self.path, _SCHEMA_VERSION)
+            script = _MIGRATE_V1_RENAME + _SCHEMA + _MIGRATE_V1_COPY
+        else:
+            script = _SCHEMA
+        try:
+            self._conn.executescript(
+                f"BEGIN; {script} PRAGMA user_version = {_SCHEMA_VERSION}; COMMIT;"
+            )
+        except sqlite3.Error:
+            self._conn.rollback()
+            raise
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several writes atomically."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -- writes ---------------------------------------------------------------
+
+    def upsert_decomposition(self, result: TaskDecompositionResult) -> int:
+        """Insert or update an epic with its stories, tasks and dependency edges.
+
+        Stories and tasks are matched by id; stories no longer in the epic and tasks no
+        longer in a story are removed.
+        Returns the epic's row id.
+        """
+        plan = result.execution_plan.model_dump_json() if result.execution_plan else None
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO epics (title, description, reasoning, execution_plan, updated) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(title) DO UPDATE SET "
+                "description = excluded.description, reasoning = excluded.reasoning, "
+                "execution_plan = excluded.execution_plan, updated = excluded.updated",
+                (result.epic.title, result.epic.description, result.reasoning, plan, time.time()),
+            )
+            (epic_id,) = conn.execute(
+                "SELECT id FROM epics WHERE title = ?", (result.epic.title,)
+            ).fetchone()
+            story_ids = [story.id for story in result.stories]
+            conn.execute(
+                f"DELETE FROM stories WHERE epic_id = ? AND story_id NOT IN "
+                f"({', '.join('?' * len(story_ids))})",
+                (epic_id, *story_ids),
+            )
+            for position, story in enumerate(result.stories):
+                self._upsert_story(conn, epic_id, position, story)
+        return epic_id
+
+    def upsert_story(self, epic_title: str, story: Story) -> None:
+        """Insert or update one story (appended to an existing epic if new)."""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT id FROM epics WHERE title = ?", (epic_title,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown epic: {epic_title}")
+            existing = conn.execute(
+                "SELECT position FROM stories WHERE epic_id = ? AND story_id = ?",
+                (row[0], story.id),
+            ).fetchone()
+            if existing is not None:
+                position = existing[0]
+            else:
+                (position,) = conn.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM stories WHERE epic_id = ?",
+                    (row[0],),
+                ).fetchone()
+            self._upsert_story(conn, row[0], position, story)
+
+    def _upsert_story(
+        self, conn: sqlite3.Connection, epic_id: int, position: int, story: Story
+    ) -> None:
+        conn.execute(
+            "INSERT INTO stories (epic_id, story_id, title, position) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(epic_id, story_id) DO UPDATE SET "
+            "title = excluded.title, position = excluded.position",
+            (epic_id, story.id, story.title, position),
+        )
+        task_ids = [t.task_id for t in story.tasks]
+        conn.execute(
+            f"DELETE FROM tasks WHERE epic_id = ? AND story_id = ? AND task_id NOT IN "
+            f"({', '.join('?' * len(task_ids))})",
+            (epic_id, story.id, *task_ids),
+        )
+        conn.executemany(
+            f"INSERT INTO tasks (epic_id, story_id, position, {', '.join(_TASK_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(_TASK_COLUMNS))}) "
+            "ON CONFLICT(epic_id, task_id) DO UPDATE SET "
+            + ", ".join(f"{c} = excluded.{c}" for c in ("story_id", "position", *_TASK_COLUMNS[1:])),
+            [(epic_id, story.id, i, *self._task_row(t)) for i, t in enumerate(story.tasks)],
+        )
+        conn.executemany(
+            "DELETE FROM dependencies WHERE epic_id = ? AND task_id = ?",
+            [(epic_id, t) for t in task_ids],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO dependencies (epic_id, task_id, depends_on, position) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (epic_id, t.task_id, dep, i)
+                for t in story.tasks
+                for i, dep in enumerate(t.dependencies)
+            ],
+        )
+
+    @staticmethod
+    def _task_row(task: Task) -> tuple:
+        return (
+            task.task_id, task.title, task.description, task.status, task.role,
+            task.owner_type, task.assignee, task.estimate_hours, task.story_points,
+            task.acceptance_criteria, task.blocker_reason, json.dumps(task.artifacts),
+        )
+
+    def set_status(
+        self,
+        task_id: str,
+        status: str,
+        blocker_reason: str | None = None,
+        epic_title: str | None = None,
+    ) -> None:
+        """Update a task's status (one of the Task model's status values)."""
+        if status not in TASK_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+        with self.transaction() as conn:
+            epic = self._epic_row(epic_title)
+            updated = conn.execute(
+                "UPDATE tasks SET status = ?, blocker_reason = ? "
+                "WHERE epic_id = ? AND task_id = ?",
+                (status, blocker_reason if status == "blocked" else None, epic["id"], task_id),
+            ).rowcount
+        if not updated:
+            raise KeyError(f"Unknown task: {task_id}")
+
+    def upsert_dispatches(self, result: DispatchResult, epic_title: str | None = None) -> None:
+        """Insert or update an epic's dispatches (and their fingerprints) and summary."""
+        with self.transaction() as conn:
+            epic_id = self._epic_row(epic_title)["id"]
+            conn.executemany(
+                "INSERT INTO dispatches (epic_id, task_id, recommended_role, owner_type, "
+                "autonomy_level, total_score, fingerprint, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(epic_id, task_id) DO UPDATE SET "
+                "recommended_role = excluded.recommended_role, "
+                "owner_type = excluded.owner_type, autonomy_level = excluded.autonomy_level, "
+                "total_score = excluded.total_score, fingerprint = excluded.fingerprint, "
+                "data = excluded.data",
+                [
+                    (
+                        epic_id, d.task_id, d.recommended_role, d.owner_type, d.autonomy_level,
+                        d.total_score, result.task_fingerprints.get(d.task_id),
+                        d.model_dump_json(),
+                    )
+                    for d in result.dispatches
+                ],
+            )
+            conn.execute(
+                "UPDATE epics SET dispatch_summary = ? WHERE id = ?", (result.summary, epic_id)
+            )
+
+    # -- reads ----------------------------------------------------------------
+
+    def _tasks_from_rows(self, rows: Iterable[sqlite3.Row]) -> list[Task]:
+        rows = list(rows)
+        if not rows:
+            return []
+        deps = self._dependencies_for(rows[0]["epic_id"], [r["task_id"] for r in rows])
+        tasks = []
+        for row in rows:
+            data = {c: row[c] for c in _TASK_COLUMNS}
+            data["artifacts"] = json.loads(data["artifacts"])
+            data["dependencies"] = deps.get(row["task_id"], [])
+            tasks.append(Task.model_validate(data))
+        return tasks
+
+    def _dependencies_for(self, epic_id: int, task_ids: list[str]) -> dict[str, list[str]]:
+        deps: dict[str, list[str]] = {}
+        # Stay under SQLite's bound-parameter limit on large boards
+        for i in range(0, len(task_ids), 500):
+            batch = task_ids[i : i + 500]
+            for task_id, dep in self._conn.execute(
+                f"SELECT task_id, depends_on FROM dependencies WHERE epic_id = ? AND task_id IN "
+                f"({', '.join('?' * len(batch))}) ORDER BY task_id, position",
+                (epic_id, *batch),
+            ):
+                deps.setdefault(task_id, []).append(dep)
+        return deps
+
+    def _find_epic(self, epic_title: str | None) -> sqlite3.Row | None:
+        if epic_title is None:
+            return self._conn.execute(
+                "SELECT * FROM epics ORDER BY updated DESC, id DESC LIMIT 1"
+            ).fetchone()
+        return self._conn.execute("SELECT * FROM epics WHERE title = ?", (epic_title,)).fetchone()
+
+    def _epic_row(self, epic_title: str | None) -> sqlite3.Row:
+        row = self._find_epic(epic_title)
+        if row is None:
+            raise KeyError(f"No epic found: {epic_title or '(store is empty)'}")
+        return row
+
+    def resolve_epic(self, epic_title: str | None = None) -> str:
+        """Title of the given epic, or of the most recently updated one if None.
+
+        Raises:
+            KeyError: If there is no such epic.
+        """
+        with self._lock:
+            return self._epic_row(epic_title)["title"]
+
+    def get_task(self, task_id: str, epic_title: str | None = None) -> Task | None:
+        with self._lock:
+            epic = self._find_epic(epic_title)
+            if epic is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE epic_id = ? AND task_id = ?", (epic["id"], task_id)
+            )
+            tasks = self._tasks_from_rows(rows)
+        return tasks[0] if tasks else None
+
+    def find_tasks(
+        self,
+        status: str | None = None,
+        role: str | None = None,
+        owner_type: str | None = None,
+        story_id: str | None = None,
+        epic_title: str | None = None,
+    ) -> list[Task]:
+        """Tasks of one epic (default: the most recently updated) matching every given
+        filter, in decomposition order."""
+        with self._lock:
+            epic = self._find_epic(epic_title)
+            if epic is None:
+                return []
+            clauses, params = ["t.epic_id = ?"], [epic["id"]]
+            for column, value in (
+                ("t.status", status), ("t.role", role),
+                ("t.owner_type", owner_type), ("t.story_id", story_id),
+            ):
+                if value is not None:
+                    clauses.append(f"{column} = ?")
+                    params.append(value)
+            rows = self._conn.execute(
+                "SELECT t.* FROM tasks t JOIN stories s "
+                "ON s.epic_id = t.epic_id AND s.story_id = t.story_id "
+                f"WHERE {' AND '.join(clauses)} ORDER BY s.position, t.position",
+                params,
+            )
+            return self._tasks_from_rows(rows)
+
+    def dependencies(self, task_id: str, epic_title: str | None = None) -> list[str]:
+        """Ids of the tasks task_id depends on."""
+        with self._lock:
+            epic = self._epic_row(epic_title)
+            return [
+                r[0] for r in self._conn.execute(
+                    "SELECT depends_on FROM dependencies WHERE epic_id = ? AND task_id = ? "
+                    "ORDER BY position",
+                    (epic["id"], task_id),
+                )
+            ]
+
+    def dependents(self, task_id: str, epic_title: str | None = None) -> list[str]:
+        """Ids of the tasks that depend on task_id."""
+        with self._lock:
+            epic = self._epic_row(epic_title)
+            return [
+                r[0] for r in self._conn.execute(
+                    "SELECT task_id FROM dependencies WHERE epic_id = ? AND depends_on = ? "
+                    "ORDER BY task_id",
+                    (epic["id"], task_id),
+                )
+            ]
+
+    def ready_tasks(self, epic_title: str | None = None) -> list[Task]:
+        """To-do tasks of one epic whose dependencies are all done (unknown dependencies
+        block)."""
+        with self._lock:
+            epic = self._find_epic(epic_title)
+            if epic is None:
+                return []
+            rows = self._conn.execute(
+                "SELECT t.* FROM tasks t JOIN stories s "
+                "ON s.epic_id = t.epic_id AND s.story_id = t.story_id "
+                "WHERE t.epic_id = ? AND t.status = 'todo' AND NOT EXISTS ("
+                "  SELECT 1 FROM dependencies d LEFT JOIN tasks dt "
+                "  ON dt.epic_id = d.epic_id AND dt.task_id = d.depends_on"
+                "  WHERE d.epic_id = t.epic_id AND d.task_id = t.task_id"
+                "  AND (dt.status IS NULL OR dt.status != 'done'))"
+                " ORDER BY s.position, t.position",
+                (epic["id"],),
+            )
+            return self._tasks_from_rows(rows)
+
+    def get_dispatch(self, task_id: str, epic_title: str | None = None) -> TaskDispatch | None:
+        with self._lock:
+            epic = self._find_epic(epic_title)
+            if epic is None:
+                return None
+            row = self._conn.execute(
+                "SELECT data FROM dispatches WHERE epic_id = ? AND task_id = ?",
+                (epic["id"], task_id),
+            ).fetchone()
+        return TaskDispatch.model_validate_json(row[0]) if row else None
+
+    def reusable_dispatches(
+        self, fingerprints: dict[str, str], epic_title: str | None = None
+    ) -> dict[str, TaskDispatch]:
+        """An epic's stored dispatches whose task fingerprint still matches the current
+        task."""
+        with self._lock:
+            epic = self._find_epic(epic_title)
+            if epic is None:
+                return {}
+            rows = self._conn.execute(
+                "SELECT task_id, fingerprint, data FROM dispatches "
+                "WHERE epic_id = ? AND fingerprint IS NOT NULL",
+                (epic["id"],),
+            ).fetchall()
+        return {
+            task_id: TaskDispatch.model_validate_json(data)
+            for task_id, fingerprint, data in rows
+            if fingerprints.get(task_id) == fingerprint
+        }
+
+    def dispatch_summary(self, epic_title: str | None = None) -> str:
+        with self._lock:
+            epic = self._find_epic(epic_title)
+        return epic["dispatch_summary"] if epic is not None else ""
+
+    # -- JSON interchange -----------------------------------------------------
+
+    def export_decomposition(self, epic_title: str | None = None) -> TaskDecompositionResult:
+        """Rebuild the decomposed_task.json structure (default: most recently updated epic)."""
+        with self._lock:
+            epic = self._epic_row(epic_title)
+            stories = self._conn.execute(
+                "SELECT story_id, title FROM stories WHERE epic_id = ? ORDER BY position",
+                (epic["id"],),
+            ).fetchall()
+            tasks = self.find_tasks(epic_title=epic["title"])
+            story_of = dict(
+                self._conn.execute(
+                    "SELECT task_id, story_id FROM tasks WHERE epic_id = ?", (epic["id"],)
+                )
+            )
+        by_story: dict[str, list[Task]] = {}
+        for task in tasks:
+            by_story.setdefault(story_of[task.task_id], []).append(task)
+        return TaskDecompositionResult(
+            epic=Epic(title=epic["title"], description=epic["description"]),
+            reasoning=epic["reasoning"],
+            stories=[
+                Story(id=story_id, title=title, tasks=by_story.get(story_id, []))
+                for story_id, title in stories
+            ],
+            execution_plan=(
+                ExecutionPlan.model_validate_json(epic["execution_plan"])
+                if epic["execution_plan"]
+                else None
+            ),
+        )
+
+    def export_dispatch(
+        self, task_ids: list[str] | None = None, epic_title: str | None = None
+    ) -> DispatchResult:
+        """Rebuild an epic's dispatched_task.json structure (default: most recently
+        updated epic), in decomposition order."""
+        with self._lock:
+            epic = self._epic_row(epic_title)
+            rows = self._conn.execute(
+                "SELECT d.task_id, d.data, d.fingerprint FROM dispatches d "
+                "LEFT JOIN tasks t ON t.epic_id = d.epic_id AND t.task_id = d.task_id "
+                "LEFT JOIN stories s ON s.epic_id = t.epic_id AND s.story_id = t.story_id "
+                "WHERE d.epic_id = ? ORDER BY s.position, t.position, d.task_id",
+                (epic["id"],),
+            ).fetchall()
+        wanted = set(task_ids) if task_ids is not None else None
+        rows = [r for r in rows if wanted is None or r["task_id"] in wanted]
+        return DispatchResult(
+            dispatches=[TaskDispatch.model_validate_json(r["data"]) for r in rows],
+            summary=epic["dispatch_summary"],
+            task_fingerprints={r["task_id"]: r["fingerprint"] for r in rows if r["fingerprint"]},
+        )
+
+    def import_json(self, path: str, epic_title: str | None = None) -> str:
+        """Import a decomposed_task.json or dispatched_task.json file; return its kind.
+
+        Dispatches are stored for epic_title (default: the most recently updated epic).
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if "stories" in data:
+            self.upsert_decomposition(TaskDecompositionResult.model_validate(data))
+            return "decomposition"
+        if "dispatches" in data:
+            self.upsert_dispatches(DispatchResult.model_validate(data), epic_title)
+            return "dispatch"
+        raise ValueError(f"Unrecognized task file format: {path}")
@@ -0,0 +1,402 @@
+"""Per-call LLM telemetry: latency, token usage, cost and parse/validate time.
+
+TelemetryClient wraps any LLMClient and records one CallRecord per request:
+
+- provider, model and prompt name (the prompts/ template the system prompt came from)
+- prompt/completion tokens as reported by the provider (estimated at ~4 characters
+  per token when the provider reports none, e.g. a stream stopped early)
+- prompt tokens served from the provider's prompt (prefix) cache
+- time to first byte (response headers, or the first chunk of a stream) and total latency
+- JSON extraction and validation time of the parse that consumed the response, and
+  whether that parse succeeded (parse_ok; None if no parse consumed the response
+  within UNPARSED_WINDOW_SECONDS)
+- estimated cost, from {PROVIDER}_INPUT_COST_PER_MTOK / {PROVIDER}_OUTPUT_COST_PER_MTOK
+  (and {PROVIDER}_CACHED_INPUT_COST_PER_MTOK for cached prompt tokens, if set)
+
+Records are appended to a JSONL file and passed to every registered hook, e.g. to
+forward them to a metrics pipeline. The CLI writes to SCRUMAI_TELEMETRY_FILE
+(default .scrumai_cache/telemetry.jsonl) and loads a hook from the environment:
+
+    SCRUMAI_TELEMETRY_HOOK=mypackage.metrics:send_llm_call
+"""
+
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from client import (
+    PARSE_FAILURE_HOOKS,
+    PARSE_HOOKS,
+    CallUsage,
+    LLMClient,
+    ensure_async,
+    observe_call,
+    stream_chat,
+)
+from prompt_registry import prompt_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TELEMETRY_FILE = ".scrumai_cache/telemetry.jsonl"
+
+# A record waits this long for the parse of its response before it is emitted
+# without parse timings; at most MAX_UNPARSED records wait at a time
+UNPARSED_WINDOW_SECONDS = 30.0
+MAX_UNPARSED = 1000
+
+
+@dataclass
+class CallRecord:
+    """Telemetry for one LLM request."""
+
+    provider: str
+    model: str
+    prompt: str
+    mode: str  # "chat", "achat" or "stream"
+    started_at: float = field(default_factory=time.time)
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    tokens_estimated: bool = False
+    cached: bool = False
+    cached_prompt_tokens: int | None = None
+    ttfb_seconds: float | None = None
+    latency_seconds: float = 0.0
+    parse_seconds: float | None = None
+    validate_seconds: float | None = None
+    parse_ok: bool | None = None
+    cost_usd: float | None = None
+    error: str | None = None
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _cost_per_token(provider: str) -> tuple[float, float, float] | None:
+    """(input, output, cached input) cost per token, or None if not configured."""
+    prefix = provider.upper()
+    input_cost = os.getenv(f"{prefix}_INPUT_COST_PER_MTOK")
+    output_cost = os.getenv(f"{prefix}_OUTPUT_COST_PER_MTOK")
+    if input_cost is None and output_cost is None:
+        return None
+    cached_cost = os.getenv(f"{prefix}_CACHED_INPUT_COST_PER_MTOK", input_cost)
+    return (
+        float(input_cost or 0) / 1e6,
+        float(output_cost or 0) / 1e6,
+        float(cached_cost or 0) / 1e6,
+    )
+
+
+def load_hook(spec: str) -> Callable[[CallRecord], None]:
+    """Import a hook given as "module:function"."""
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Telemetry hook must be 'module:function', got: {spec}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class Telemetry:
+    """Collects CallRecords and fans them out to the JSONL file and hooks.
+
+    A record is emitted once the parse of its response is reported (matched on the
+    response text). Records whose response is not parsed within
+    UNPARSED_WINDOW_SECONDS (or that overflow MAX_UNPARSED) are emitted with
+    parse_ok=None, so a long-running process neither holds them forever nor
+    leaves them out of its output; close() emits the rest.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = Path(path) if path else None
+        self.records: list[CallRecord] = []
+        self.hooks: list[Callable[[CallRecord], None]] = []
+        self._unparsed: dict[str, list[CallRecord]] = defaultdict(list)
+        # (time queued, response text, record) in the order records started waiting;
+        # entries of records parsed since are skipped when they reach the front
+        self._waiting: deque[tuple[float, str, CallRecord]] = deque()
+        self._unparsed_count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        PARSE_HOOKS.append(self._on_parse)
+        PARSE_FAILURE_HOOKS.append(self._on_parse_failure)
+
+    def add_hook(self, hook: Callable[[CallRecord], None]) -> None:
+        self.hooks.append(hook)
+
+    def record(self, record: CallRecord, response: str | None) -> None:
+        cost = _cost_per_token(record.provider)
+        if cost is not None and not record.cached:
+            cached_tokens = record.cached_prompt_tokens or 0
+            record.cost_usd = (
+                ((record.prompt_tokens or 0) - cached_tokens) * cost[0]
+                + cached_tokens * cost[2]
+                + (record.completion_tokens or 0) * cost[1]
+            )
+        with self._lock:
+            self.records.append(record)
+            if response:
+                self._unparsed[response].append(record)
+                self._unparsed_count += 1
+                self._waiting.append((time.monotonic(), response, record))
+                expired = self._expire()
+            else:
+                expired = [record]
+        for waited in expired:
+            self._emit(waited)
+
+    def _expire(self) -> list[CallRecord]:
+        """Stop waiting for parses that are overdue; call with the lock held."""
+        expired = []
+        deadline = time.monotonic() - UNPARSED_WINDOW_SECONDS
+        while self._waiting and (
+            self._waiting[0][0] < deadline or self._unparsed_count > MAX_UNPARSED
+        ):
+            _, text, record = self._waiting.popleft()
+            waiting = self._unparsed.get(text, [])
+            for i, candidate in enumerate(waiting):
+                if candidate is record:
+                    del waiting[i]
+                    if not waiting:
+                        del self._unparsed[text]
+                    self._unparsed_count -= 1
+                    expired.append(record)
+                    break
+        return expired
+
+    def _on_parse_failure(self, text: str) -> None:
+        with self._lock:
+            waiting = self._unparsed.get(text)
+            if waiting:
+                waiting[0].parse_ok = False
+
+    def _on_parse(self, _model: str, text: str, parse_seconds: float, validate_seconds: float) -> None:
+        with self._lock:
+            waiting = self._unparsed.get(text)
+            if not waiting:
+                return
+            record = waiting.pop(0)
+            if not waiting:
+                del self._unparsed[text]
+            self._unparsed_count -= 1
+            expired = self._expire()
+        record.parse_seconds = parse_seconds
+        record.validate_seconds = validate_seconds
+        if record.parse_ok is None:
+            record.parse_ok = True
+        for waited in [record, *expired]:
+            self._emit(waited)
+
+    def _emit(self, record: CallRecord) -> None:
+        if self.path is not None:
+            with self._lock:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+                self._file.flush()
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                logger.exception("Telemetry hook %r failed", hook)
+
+    def close(self) -> None:
+        """Emit records whose responses were never parsed and close the JSONL file."""
+        with self._lock:
+            remaining = [r for records in self._unparsed.values() for r in records]
+            self._unparsed.clear()
+            self._waiting.clear()
+            self._unparsed_count = 0
+        for record in remaining:
+            self._emit(record)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def summary(self) -> list[dict]:
+        """Aggregate records per (provider, model, prompt)."""
+        groups: dict[tuple[str, str, str], list[CallRecord]] = defaultdict(list)
+        # Snapshot: other threads (e.g. the serve event loop) keep appending
+        with self._lock:
+            snapshot = list(self.records)
+        for record in snapshot:
+            groups[(record.provider, record.model, record.prompt or "-")].append(record)
+        rows = []
+        for (provider, model, prompt), records in groups.items():
+            latencies = sorted(r.latency_seconds for r in records)
+            ttfbs = sorted(r.ttfb_seconds for r in records if r.ttfb_seconds is not None)
+            costs = [r.cost_usd for r in records if r.cost_usd is not None]
+            # Prefix cache hit rate over prompts whose cached tokens the provider reported
+            measured = [r for r in records if r.cached_prompt_tokens is not None]
+            measured_tokens = sum(r.prompt_tokens or 0 for r in measured)
+            rows.append({
+                "provider": provider,
+                "model": model,
+                "prompt": prompt,
+                "calls": len(records),
+                "cached": sum(1 for r in records if r.cached),
+                "errors": sum(1 for r in records if r.error),
+                "prompt_tokens": sum(r.prompt_tokens or 0 for r in records),
+                "completion_tokens": sum(r.completion_tokens or 0 for r in records),
+                "cached_prompt_tokens": sum(r.cached_prompt_tokens or 0 for r in measured),
+                "prefix_hit_rate": (
+                    sum(r.cached_prompt_tokens for r in measured) / measured_tokens
+                    if measured_tokens else None
+                ),
+                "ttfb_p50": ttfbs[len(ttfbs) // 2] if ttfbs else None,
+                "latency_p50": latencies[len(latencies) // 2],
+                "latency_total": sum(latencies),
+                "parse_total": sum(
+                    (r.parse_seconds or 0) + (r.validate_seconds or 0) for r in records
+                ),
+                "cost_usd": sum(costs) if costs else None,
+            })
+        return rows
+
+
+# Process-wide collector; the CLI sets its path and hooks from the environment
+TELEMETRY = Telemetry()
+
+
+class TelemetryClient:
+    """LLMClient wrapper recording a CallRecord for every request.
+
+    Args:
+        inner: The client performing the requests (scheduler, cache, provider...).
+        telemetry: Collector to record into (default: the process-wide TELEMETRY).
+    """
+
+    def __init__(self, inner: LLMClient, telemetry: Telemetry | None = None) -> None:
+        self.inner = inner
+        self.telemetry = telemetry or TELEMETRY
+        self.provider = getattr(inner, "provider", type(inner).__name__)
+        self.model = getattr(inner, "model", "")
+
+    def _start(self, system_prompt: str, mode: str) -> CallRecord:
+        return CallRecord(self.provider, self.model, prompt_name(system_prompt), mode)
+
+    def _finish(
+        self,
+        record: CallRecord,
+        usage: CallUsage,
+        start: float,
+        request_text: str,
+        response: str | None,
+        first_chunk: float | None = None,
+    ) -> None:
+        record.latency_seconds = time.perf_counter() - start
+        first_byte = usage.first_byte or first_chunk
+        if first_byte is not None:
+            record.ttfb_seconds = first_byte - start
+        record.cached = usage.cached
+        record.prompt_tokens = usage.prompt_tokens
+        record.completion_tokens = usage.completion_tokens
+        record.cached_prompt_tokens = usage.cached_prompt_tokens
+        if not record.cached and response is not None and usage.prompt_tokens is None:
+            record.tokens_estimated = True
+            record.prompt_tokens = _estimate_tokens(request_text)
+            record.completion_tokens = _estimate_tokens(response)
+        self.telemetry.record(record, response)
+
+    @staticmethod
+    def _request_text(system_prompt: str, messages: list[dict[str, str]]) -> str:
+        return system_prompt + "".join(m["content"] for m in messages)
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        record, usage = self._start(system_prompt, "chat"), CallUsage()
+        start = time.perf_counter()
+        response = None
+        try:
+            with observe_call(usage):
+                response = self.inner.chat(system_prompt, messages)
+            return response
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            self._finish(record, usage, start, self._request_text(system_prompt, messages), response)
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        record, usage = self._start(system_prompt, "achat"), CallUsage()
+        start = time.perf_counter()
+        response = None
+        try:
+            with observe_call(usage):
+                response = await ensure_async(self.inner).achat(system_prompt, messages)
+            return response
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            self._finish(record, usage, start, self._request_text(system_prompt, messages), response)
+
+    def chat_stream(
+        self, system_prompt: str, messages: list[dict[str, str]]
+    ) -> Iterator[str]:
+        record, usage = self._start(system_prompt, "stream"), CallUsage()
+        start = time.perf_counter()
+        first_chunk = None
+        chunks: list[str] = []
+        stream = stream_chat(self.inner, system_prompt, messages)
+        try:
+            while True:
+                # Observe only while the inner stream runs, not while the consumer does
+                with observe_call(usage):
+                    chunk = next(stream, None)
+                if chunk is None:
+                    break
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped once the JSON object was complete
+            stream.close()
+            raise
+        except Exception as e:
+            record.error = type(e).__name__
+            raise
+        finally:
+            self._finish(
+                record,
+                usage,
+                start,
+                self._request_text(system_prompt, messages),
+                "".join(chunks) if record.error is None else None,
+                first_chunk,
+            )
+
+
+def format_telemetry_summary(telemetry: Telemetry | None = None) -> str | None:
+    """Per-prompt summary table of the calls made in this process, or None if none."""
+    rows = (telemetry or TELEMETRY).summary()
+    if not rows:
+        return None
+
+    def seconds(value: float | None) -> str:
+        return f"{value:.2f}s" if value is not None else "-"
+
+    lines = [
+        f"  {'provider/model':<28} {'prompt':<20} {'calls':>5} {'cached':>6} "
+        f"{'in tok':>8} {'pfx hit':>7} {'out tok':>8} {'ttfb p50':>8} {'lat p50':>8} "
+        f"{'lat sum':>8} {'parse':>7} {'cost':>9}"
+    ]
+    for r in rows:
+        cost = f"${r['cost_usd']:.4f}" if r["cost_usd"] is not None else "-"
+        hit = r["prefix_hit_rate"]
+        hit_rate = f"{hit:.0%}" if hit is not None else "-"
+        lines.append(
+            f"  {(r['provider'] + '/' + r['model'])[:28]:<28} {r['prompt'][:20]:<20} "
+            f"{r['calls']:>5} {r['cached']:>6} {r['prompt_tokens']:>8} {hit_rate:>7} "
+            f"{r['completion_tokens']:>8} {seconds(r['ttfb_p50']):>8} "
+            f"{seconds(r['latency_p50']):>8} {seconds(r['latency_total']):>8} "
+            f"{r['parse_total'] * 1000:>5.1f}ms {cost:>9}"
+        )
+    return "\n".join(lines)
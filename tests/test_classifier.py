@@ -0,0 +1,116 @@
+from classifier import MIN_HISTORY_EXAMPLES, MIN_RULE_EXAMPLES, DispatchClassifier
+from models.role import TaskDispatch, derive_autonomy_level, derive_owner_type
+
+ROUTINE = (0, 0, 0, "Junior Developer")
+
+
+def _task(title: str, description: str = "", task_id: str = "TASK-001") -> dict:
+    return {
+        "task_id": task_id,
+        "title": title,
+        "description": description,
+        "acceptance_criteria": "",
+    }
+
+
+def _dispatch(label: tuple[int, int, int, str], task_id: str = "TASK-001") -> TaskDispatch:
+    complexity, risk, human_judgment, role = label
+    total = complexity + risk + human_judgment
+    return TaskDispatch.model_validate(
+        {
+            "task_id": task_id,
+            "scoring": {
+                "complexity": {"score": complexity, "reason": "r"},
+                "risk": {"score": risk, "reason": "r"},
+                "human_judgment": {"score": human_judgment, "reason": "r"},
+            },
+            "total_score": total,
+            "recommended_role": role,
+            "owner_type": derive_owner_type(total),
+            "autonomy_level": derive_autonomy_level(total),
+            "reasoning": "r",
+        }
+    )
+
+
+def _unit_test_history(n: int, label=ROUTINE) -> list[tuple[dict, TaskDispatch]]:
+    return [(_task(f"Write unit tests for module {i}"), _dispatch(label)) for i in range(n)]
+
+
+def test_empty_history_predicts_nothing():
+    classifier = DispatchClassifier()
+    classifier.fit([])
+    assert classifier.threshold is None
+    assert classifier.rule_precision == {}
+    local, uncertain = classifier.classify([_task("Write unit tests for the parser")])
+    assert local == {}
+    assert len(uncertain) == 1
+    assert classifier.stats.llm == 1
+
+
+def test_rule_applies_once_calibrated_on_history():
+    classifier = DispatchClassifier()
+    classifier.fit(_unit_test_history(MIN_RULE_EXAMPLES - 1))
+    assert classifier.predict(_task("Write unit tests for the parser")) is None
+
+    classifier.fit(_unit_test_history(MIN_RULE_EXAMPLES))
+    assert classifier.rule_precision == {"unit_tests": 1.0}
+    prediction = classifier.predict(_task("Write unit tests for the parser"))
+    assert prediction is not None
+    assert prediction.source == "unit_tests"
+    assert prediction.label == ROUTINE
+    assert prediction.confidence == 1.0
+
+
+def test_rule_that_disagrees_with_history_is_not_applied():
+    history = _unit_test_history(MIN_RULE_EXAMPLES) + _unit_test_history(
+        MIN_RULE_EXAMPLES, (1, 1, 1, "Senior Developer")
+    )
+    classifier = DispatchClassifier()
+    classifier.fit(history)
+    assert "unit_tests" not in classifier.rule_precision
+    assert classifier.predict(_task("Write unit tests for the parser")) is None
+
+
+def test_risky_wording_defers_to_the_llm():
+    classifier = DispatchClassifier()
+    classifier.fit(_unit_test_history(MIN_RULE_EXAMPLES))
+    for task in (
+        _task("Write unit tests for the auth middleware"),
+        _task("Write unit tests for the parser", "Covers the authorization checks"),
+        _task("Write unit tests for payments"),
+    ):
+        assert classifier.predict(task) is None
+    # "auth" only as a whole word
+    assert classifier.predict(_task("Write unit tests for the author list")) is not None
+
+
+def test_rules_can_be_disabled():
+    classifier = DispatchClassifier(rules=False)
+    classifier.fit(_unit_test_history(MIN_RULE_EXAMPLES))
+    assert classifier.predict(_task("Write unit tests for the parser")) is None
+
+
+def test_model_predicts_after_enough_history():
+    review = (1, 2, 2, "Product Owner")
+    history = [
+        (_task(f"Update invoice layout {i}", "Change the pdf invoice template"), _dispatch(ROUTINE))
+        for i in range(MIN_HISTORY_EXAMPLES)
+    ] + [
+        (_task(f"Negotiate vendor contract {i}", "Agree pricing with the vendor"), _dispatch(review))
+        for i in range(MIN_HISTORY_EXAMPLES)
+    ]
+    classifier = DispatchClassifier()
+    classifier.fit(history)
+    assert classifier.threshold is not None
+
+    tasks = [
+        _task("Update invoice layout", "Change the pdf invoice template", "TASK-001"),
+        _task("Negotiate vendor contract", "Agree pricing with the vendor", "TASK-002"),
+    ]
+    local, uncertain = classifier.classify(tasks)
+    assert uncertain == []
+    assert local["TASK-001"].recommended_role == "Junior Developer"
+    assert local["TASK-002"].recommended_role == "Product Owner"
+    assert local["TASK-002"].owner_type == "human"
+    assert classifier.stats.model == 2
@@ -0,0 +1,87 @@
+import json
+
+from models.brainstorm import BrainstormResponse
+from runners.brainstorm import ConversationCompactor
+
+MARKER = "Session state so far (earlier rounds, compacted):\n"
+
+
+def _response(phase: int, total: int) -> BrainstormResponse:
+    return BrainstormResponse.model_validate(
+        {
+            "phase": phase,
+            "question": f"Question {phase}",
+            "options": [],
+            "scoring": {
+                "total": total,
+                "taskGoal": 2,
+                "completionCriteria": 1,
+                "scope": 1,
+                "constraints": 1,
+                "lowScoreDimensions": ["scope"],
+            },
+        }
+    )
+
+
+def _session(rounds: int, keep_turns: int) -> tuple[ConversationCompactor, list[dict[str, str]]]:
+    compactor = ConversationCompactor(keep_turns)
+    conversation = [{"role": "user", "content": "Initial message"}]
+    for i in range(1, rounds + 1):
+        compactor.observe(_response(min(i, 4), 5))
+        conversation.append({"role": "assistant", "content": f"question {i}"})
+        compactor.record_answer(f"Question {i}", [f"option_{i}"], "note" if i == 1 else "")
+        conversation.append({"role": "user", "content": f"answer {i}"})
+    return compactor, conversation
+
+
+def _state(message: dict[str, str]) -> dict:
+    return json.loads(message["content"].split(MARKER, 1)[1])
+
+
+def test_empty_history_is_sent_unchanged():
+    compactor, conversation = _session(0, 2)
+    assert compactor.messages(conversation) == conversation
+    assert compactor.answered == []
+
+
+def test_short_session_is_sent_verbatim():
+    compactor, conversation = _session(2, 2)
+    assert compactor.messages(conversation) == conversation
+
+
+def test_old_rounds_are_folded_into_the_first_message():
+    compactor, conversation = _session(5, 2)
+    messages = compactor.messages(conversation)
+    assert [m["content"] for m in messages[1:]] == [
+        "question 4",
+        "answer 4",
+        "question 5",
+        "answer 5",
+    ]
+    assert messages[0]["content"].startswith("Initial message\n\n---\n")
+    state = _state(messages[0])
+    assert [entry["selected"] for entry in state["answered"]] == [
+        ["option_1"],
+        ["option_2"],
+        ["option_3"],
+    ]
+    assert state["answered"][0]["other"] == "note"
+    assert state["phase"] == 4
+    assert "lowScoreDimensions" not in state["latestScoring"]
+    # The conversation itself is not modified
+    assert conversation[0]["content"] == "Initial message"
+    assert len(conversation) == 11
+
+
+def test_keep_no_turns():
+    compactor, conversation = _session(3, 0)
+    messages = compactor.messages(conversation)
+    assert len(messages) == 1
+    assert len(_state(messages[0])["answered"]) == 3
+
+
+def test_state_round_trip():
+    compactor, conversation = _session(4, 1)
+    restored = ConversationCompactor.from_state(json.loads(json.dumps(compactor.state())))
+    assert restored.messages(conversation) == compactor.messages(conversation)
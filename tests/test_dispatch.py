@@ -0,0 +1,231 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from models.role import DispatchResult
+from models.task import TaskDecompositionResult
+from runners.dispatch import (
+    _build_user_message,
+    _chunk_tasks,
+    _dispatch_chunks,
+    _fingerprint,
+    _load_reusable,
+    _merge_results,
+    _task_for_prompt,
+    run_dispatch,
+)
+from replay import FixtureNotFoundError, ReplayClient
+from store import TaskStore
+
+_TASKS_JSON = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
+
+
+class FakeDispatchClient:
+    """Dispatches every task it is sent as a routine Junior Developer task."""
+
+    def __init__(self) -> None:
+        self.dispatched: list[str] = []
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        tasks = json.loads(_TASKS_JSON.search(messages[-1]["content"]).group(1))
+        self.dispatched += [t["task_id"] for t in tasks]
+        dimension = {"score": 0, "reason": "Routine"}
+        return json.dumps(
+            {
+                "dispatches": [
+                    {
+                        "task_id": t["task_id"],
+                        "scoring": {
+                            "complexity": dimension,
+                            "risk": dimension,
+                            "human_judgment": dimension,
+                        },
+                        "total_score": 0,
+                        "recommended_role": "Junior Developer",
+                        "owner_type": "ai",
+                        "autonomy_level": "autonomous",
+                        "reasoning": f"Dispatched {t['title']}",
+                    }
+                    for t in tasks
+                ],
+                "summary": "All routine",
+            }
+        )
+
+
+def _task(task_id: str, title: str, dependencies: list[str] | None = None) -> dict:
+    return {
+        "task_id": task_id,
+        "title": title,
+        "description": f"Implement {title.lower()}",
+        "role": "Junior Developer",
+        "dependencies": dependencies or [],
+        "acceptance_criteria": "Works",
+    }
+
+
+def _decomposition(tasks: list[dict], epic: str = "Epic") -> dict:
+    return {
+        "epic": {"title": epic, "description": ""},
+        "reasoning": "",
+        "stories": [{"id": "STORY-001", "title": "Story", "tasks": tasks}],
+    }
+
+
+def _write_decomposition(path, tasks: list[dict]) -> None:
+    path.write_text(json.dumps(_decomposition(tasks)), encoding="utf-8")
+
+
+@pytest.fixture
+def files(tmp_path):
+    tasks = [
+        _task("TASK-001", "Create schema"),
+        _task("TASK-002", "Add endpoint", ["TASK-001"]),
+        _task("TASK-003", "Write docs", ["TASK-002"]),
+    ]
+    decomposed, dispatched = tmp_path / "decomposed.json", tmp_path / "dispatched.json"
+    _write_decomposition(decomposed, tasks)
+    return tasks, decomposed, dispatched
+
+
+def _dispatch(decomposed, dispatched) -> list[str]:
+    client = FakeDispatchClient()
+    run_dispatch(client, str(decomposed), str(dispatched))
+    return client.dispatched
+
+
+def test_rerun_reuses_unchanged_tasks(files, capsys):
+    tasks, decomposed, dispatched = files
+    assert _dispatch(decomposed, dispatched) == ["TASK-001", "TASK-002", "TASK-003"]
+    first = json.loads(dispatched.read_text())
+    assert set(first["task_fingerprints"]) == {"TASK-001", "TASK-002", "TASK-003"}
+
+    assert _dispatch(decomposed, dispatched) == []
+    assert json.loads(dispatched.read_text())["dispatches"] == first["dispatches"]
+
+
+def test_changed_task_is_redispatched(files, capsys):
+    tasks, decomposed, dispatched = files
+    _dispatch(decomposed, dispatched)
+    tasks[1]["description"] = "Implement the endpoint with pagination"
+    _write_decomposition(decomposed, tasks)
+
+    assert _dispatch(decomposed, dispatched) == ["TASK-002"]
+    result = json.loads(dispatched.read_text())
+    assert [d["task_id"] for d in result["dispatches"]] == ["TASK-001", "TASK-002", "TASK-003"]
+    assert result["task_fingerprints"]["TASK-002"] == _fingerprint(_task_for_prompt(tasks[1]))
+
+
+def test_changed_dependencies_are_redispatched(files, capsys):
+    tasks, decomposed, dispatched = files
+    _dispatch(decomposed, dispatched)
+    # TASK-003 now also depends on TASK-001; TASK-001 itself is renamed
+    tasks[2]["dependencies"] = ["TASK-001", "TASK-002"]
+    tasks[0]["title"] = "Create database schema"
+    _write_decomposition(decomposed, tasks)
+
+    assert _dispatch(decomposed, dispatched) == ["TASK-001", "TASK-003"]
+
+
+def test_fields_not_sent_for_dispatch_do_not_invalidate(files, capsys):
+    tasks, decomposed, dispatched = files
+    _dispatch(decomposed, dispatched)
+    tasks[0]["role"] = "Senior Developer"
+    tasks[0]["status"] = "in_progress"
+    _write_decomposition(decomposed, tasks)
+
+    assert _dispatch(decomposed, dispatched) == []
+
+
+def test_load_reusable_without_usable_previous_output(tmp_path):
+    fingerprints = {"TASK-001": "abc"}
+    assert _load_reusable(str(tmp_path / "missing.json"), fingerprints) == {}
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json", encoding="utf-8")
+    assert _load_reusable(str(broken), fingerprints) == {}
+
+
+def test_store_dispatch_is_scoped_to_one_epic(tmp_path, capsys):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    for epic, title in (("A", "Create schema"), ("B", "Write docs")):
+        decomposition = _decomposition([_task("TASK-001", title)], epic)
+        store.upsert_decomposition(TaskDecompositionResult.model_validate(decomposition))
+    try:
+        client = FakeDispatchClient()
+        run_dispatch(client, output_file=None, store=store, epic="A")
+        assert client.dispatched == ["TASK-001"]
+        assert store.get_dispatch("TASK-001", "A").reasoning == "Dispatched Create schema"
+        assert store.get_dispatch("TASK-001", "B") is None
+
+        # Defaults to the most recently updated epic; A's dispatch is not reused for B
+        run_dispatch(client, output_file=None, store=store)
+        assert store.get_dispatch("TASK-001", "B").reasoning == "Dispatched Write docs"
+        assert client.dispatched == ["TASK-001", "TASK-001"]
+    finally:
+        store.close()
+
+
+class SampledClient(FakeDispatchClient):
+    """Gives the roles in `roles` to successive samples of the same chunk."""
+
+    def __init__(self, *roles: str) -> None:
+        super().__init__()
+        self.roles = list(roles)
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        data = json.loads(super().chat(system_prompt, messages))
+        role = self.roles.pop(0)
+        for d in data["dispatches"]:
+            d["recommended_role"] = role
+        return json.dumps(data)
+
+
+def _sampled(client, samples: int):
+    tasks = [_task_for_prompt(_task("TASK-001", "Create schema"))]
+    chunks = _chunk_tasks(tasks)
+    return asyncio.run(
+        _dispatch_chunks(client, "", chunks, {"TASK-001": tasks[0]}, 4, samples=samples)
+    )[0]
+
+
+def test_agreeing_samples_stop_after_two():
+    client = SampledClient("Junior Developer", "Junior Developer", "Senior Developer")
+    result = _sampled(client, 3)
+    assert len(client.dispatched) == 2
+    assert result.agreement["TASK-001"].samples == 2
+    assert result.agreement["TASK-001"].agreement == 1
+
+
+def test_disagreeing_samples_request_the_rest():
+    client = SampledClient(
+        "Junior Developer", "Senior Developer", "Senior Developer", "Senior Developer"
+    )
+    result = _sampled(client, 4)
+    assert len(client.dispatched) == 4
+    assert result.dispatches[0].recommended_role == "Senior Developer"
+    assert result.agreement["TASK-001"].samples == 4
+    assert result.agreement["TASK-001"].agreement == 0.75
+
+
+def test_missing_replay_fixture_is_not_swallowed(files, tmp_path, capsys):
+    _, decomposed, dispatched = files
+    client = ReplayClient(str(tmp_path / "fixtures.jsonl"))
+    with pytest.raises(FixtureNotFoundError):
+        run_dispatch(client, str(decomposed), str(dispatched))
+    assert not dispatched.exists()
+
+
+def test_merged_summary_does_not_repeat_chunk_summaries():
+    tasks = [_task_for_prompt(_task(f"TASK-00{i}", f"Task {i}")) for i in (1, 2, 3)]
+    client = FakeDispatchClient()
+    results = [
+        DispatchResult.model_validate(json.loads(client.chat("", [{"role": "user", "content": _build_user_message([t], [])}])))
+        for t in tasks
+    ]
+    merged = _merge_results(tasks, results)
+    assert merged.summary == "3 tasks dispatched (3 AI, 0 human)."
+
+    single = _merge_results(tasks, results[:1])
+    assert single.summary == "All routine"
@@ -0,0 +1,75 @@
+import pytest
+
+from client import JsonStreamExtractor, extract_json
+
+TEXT = (
+    'Fill in {placeholder} first.\n```json\n'
+    '{"title": "a } and { \\"quoted\\" \\\\", "story": {"tasks": [{"id": 1}, {"id": 2}]}}'
+    "\n```\nLet me know {if} anything is unclear."
+)
+EXPECTED = {"title": 'a } and { "quoted" \\', "story": {"tasks": [{"id": 1}, {"id": 2}]}}
+
+
+def _feed(text: str, size: int, on_close=None) -> tuple[JsonStreamExtractor, list[dict | None]]:
+    extractor = JsonStreamExtractor(on_close)
+    results = [extractor.feed(text[i : i + size]) for i in range(0, len(text), size)]
+    return extractor, results
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 64, len(TEXT)])
+def test_stream_in_chunks(size):
+    extractor, results = _feed(TEXT, size)
+    assert extractor.done
+    assert results[-1] == EXPECTED
+    # The object is returned as soon as its closing brace arrives
+    close = TEXT.index("\n```\n") - 1
+    assert next(i for i, r in enumerate(results) if r is not None) == close // size
+    assert TEXT[: extractor.end].endswith("}]}}")
+
+
+def test_braces_and_escapes_inside_strings():
+    assert extract_json('{"a": "}{", "b": "\\"}"}') == {"a": "}{", "b": '"}'}
+
+
+@pytest.mark.parametrize("split", range(1, 12))
+def test_escape_split_across_chunks(split):
+    text = '{"a": "x\\"}"}'
+    extractor = JsonStreamExtractor()
+    assert extractor.feed(text[:split]) is None or split >= len(text)
+    assert extractor.feed(text[split:]) == {"a": 'x"}'}
+
+
+def test_nested_objects_reported_on_close():
+    closed: list[tuple[int, str]] = []
+    _feed(TEXT, 4, lambda depth, raw: closed.append((depth, raw)))
+    assert closed == [(3, '{"id": 1}'), (3, '{"id": 2}'), (2, '{"tasks": [{"id": 1}, {"id": 2}]}')]
+
+
+def test_prose_braces_before_object_are_skipped():
+    assert extract_json('Use {name} or {not: json} here. {"ok": true}') == {"ok": True}
+
+
+def test_non_object_json_is_skipped():
+    assert extract_json('["list"] then {"a": 1}') == {"a": 1}
+
+
+def test_incomplete_or_missing_object():
+    assert extract_json("") is None
+    assert extract_json("no json here") is None
+    extractor, results = _feed('{"a": {"b": 1}', 3)
+    assert not extractor.done
+    assert results[-1] is None
+
+
+def test_fenced_block_is_preferred():
+    assert extract_json('Example: {"a": 1}\n```json\n{"b": 2}\n```') == {"b": 2}
+
+
+def test_invalid_fenced_block_falls_back_to_text():
+    assert extract_json('```json\nnot json\n```\n{"a": 1}') == {"a": 1}
+
+
+def test_feed_after_completion_keeps_first_object():
+    extractor = JsonStreamExtractor()
+    assert extractor.feed('{"a": 1}') == {"a": 1}
+    assert extractor.feed('{"b": 2}') == {"a": 1}
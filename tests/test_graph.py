@@ -0,0 +1,119 @@
+import pytest
+
+from graph import TaskGraphError, build_execution_plan, compare_plans
+from models.task import TaskDecompositionResult
+
+
+def _decomposition(*tasks: tuple[str, float | None, list[str]]) -> TaskDecompositionResult:
+    return TaskDecompositionResult.model_validate(
+        {
+            "epic": {"title": "Epic", "description": "Epic description"},
+            "reasoning": "",
+            "stories": [
+                {
+                    "id": "STORY-001",
+                    "title": "Story",
+                    "tasks": [
+                        {
+                            "task_id": task_id,
+                            "title": task_id,
+                            "description": "",
+                            "role": "Junior Developer",
+                            "estimate_hours": hours,
+                            "dependencies": deps,
+                            "acceptance_criteria": "",
+                        }
+                        for task_id, hours, deps in tasks
+                    ],
+                }
+            ],
+        }
+    )
+
+
+def test_phases_follow_dependencies_in_decomposition_order():
+    plan, graph = build_execution_plan(
+        _decomposition(
+            ("A", 1, []),
+            ("C", 2, ["A"]),
+            ("B", 3, []),
+            ("D", 1, ["B", "C"]),
+        )
+    )
+    assert [p.parallel_tasks for p in plan.phases] == [["A", "B"], ["C"], ["D"]]
+    assert plan.total_estimated_hours == 7
+    assert graph.dangling == []
+
+
+def test_critical_path_is_weighted_by_hours():
+    plan, _ = build_execution_plan(
+        _decomposition(
+            ("A", 1, []),
+            ("B", 8, []),
+            ("C", 1, ["A"]),
+            ("D", 1, ["C"]),
+            ("E", 1, ["B"]),
+        )
+    )
+    # B → E (9h) beats the longer chain A → C → D (3h)
+    assert plan.critical_path == ["B", "E"]
+
+
+def test_missing_estimates_count_as_zero():
+    plan, _ = build_execution_plan(_decomposition(("A", None, []), ("B", 2, ["A"])))
+    assert plan.total_estimated_hours == 2
+    assert plan.critical_path == ["A", "B"]
+
+
+def test_dangling_and_duplicate_dependencies_are_dropped():
+    plan, graph = build_execution_plan(
+        _decomposition(("A", 1, []), ("B", 1, ["A", "A", "MISSING"]))
+    )
+    assert graph.dangling == [("B", "MISSING")]
+    assert graph.dependencies["B"] == ["A"]
+    assert [p.parallel_tasks for p in plan.phases] == [["A"], ["B"]]
+
+
+def test_cycle_is_reported():
+    with pytest.raises(TaskGraphError, match="Dependency cycle") as excinfo:
+        build_execution_plan(
+            _decomposition(("A", 1, []), ("B", 1, ["A", "D"]), ("C", 1, ["B"]), ("D", 1, ["C"]))
+        )
+    cycle = str(excinfo.value).split(": ", 1)[1].split(" → ")
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {"B", "C", "D"}
+
+
+def test_self_dependency_is_a_cycle():
+    with pytest.raises(TaskGraphError, match="A → A"):
+        build_execution_plan(_decomposition(("A", 1, ["A"])))
+
+
+def test_duplicate_task_id_is_rejected():
+    with pytest.raises(TaskGraphError, match="Duplicate task_id: A"):
+        build_execution_plan(_decomposition(("A", 1, []), ("A", 2, [])))
+
+
+def test_empty_decomposition():
+    plan, _ = build_execution_plan(_decomposition())
+    assert plan.phases == []
+    assert plan.critical_path == []
+    assert plan.total_estimated_hours == 0
+
+
+def test_compare_plans_reports_differences():
+    decomposition = _decomposition(("A", 1, []), ("B", 2, ["A"]))
+    local, _ = build_execution_plan(decomposition)
+    assert compare_plans(local, local) == []
+
+    model = local.model_copy(
+        update={
+            "phases": [local.phases[0].model_copy(update={"parallel_tasks": ["A", "X"]})],
+            "critical_path": ["A"],
+        }
+    )
+    issues = compare_plans(model, local)
+    assert "Plan omits tasks: B" in issues
+    assert "Plan references unknown tasks: X" in issues
+    assert any(issue.startswith("Plan has 1 phases") for issue in issues)
+    assert any(issue.startswith("Critical path differs") for issue in issues)
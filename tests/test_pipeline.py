@@ -0,0 +1,51 @@
+import asyncio
+
+from runners.dispatch import _fingerprint, _merge_results, _task_for_prompt
+from runners.pipeline import StageTimer, _StreamingDispatcher
+from tests.test_dispatch import FakeDispatchClient, _task
+
+
+class FailingAfterClient(FakeDispatchClient):
+    """Dispatches the first `succeed` requests, then fails every request."""
+
+    def __init__(self, succeed: int) -> None:
+        super().__init__()
+        self.succeed = succeed
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        if self.succeed <= 0:
+            raise ConnectionError("provider unavailable")
+        self.succeed -= 1
+        return super().chat(system_prompt, messages)
+
+
+def _dispatch_twice(client, first: list[dict], second: list[dict]):
+    async def run():
+        dispatcher = _StreamingDispatcher(
+            client, asyncio.get_running_loop(), StageTimer(), 3000, 2
+        )
+        dispatcher.dispatch(first)
+        await dispatcher.results()
+        dispatcher.dispatch(second)
+        results = await dispatcher.results()
+        return dispatcher, results
+
+    return asyncio.run(run())
+
+
+def test_redispatched_task_gets_the_new_fingerprint():
+    old, new = _task("TASK-001", "Create schema"), _task("TASK-001", "Create database schema")
+    dispatcher, results = _dispatch_twice(FakeDispatchClient(), [old], [new])
+    merged = _merge_results([_task_for_prompt(new)], results[::-1])
+    assert merged.dispatches[0].reasoning == "Dispatched Create database schema"
+    assert dispatcher.fingerprints() == {"TASK-001": _fingerprint(_task_for_prompt(new))}
+
+
+def test_failed_redispatch_keeps_the_old_fingerprint(capsys):
+    old, new = _task("TASK-001", "Create schema"), _task("TASK-001", "Create database schema")
+    other = _task("TASK-002", "Write docs")
+    dispatcher, results = _dispatch_twice(FailingAfterClient(1), [old], [new, other])
+    merged = _merge_results([_task_for_prompt(new), _task_for_prompt(other)], results[::-1])
+    # The stale result is kept, but marked as based on the old task fields
+    assert [d.reasoning for d in merged.dispatches] == ["Dispatched Create schema"]
+    assert dispatcher.fingerprints() == {"TASK-001": _fingerprint(_task_for_prompt(old))}
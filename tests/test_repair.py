@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from client import parse_structured_response
+from models.role import TaskDispatch
+from models.scoring import ScoreResult
+from repair import REPAIR_STATS, repair, repair_locally
+
+DIMENSIONS = ("runtimeTarget", "deliveryForm", "controlScheme", "businessRules", "acceptanceCriteria")
+
+
+class FakeClient:
+    """Returns canned responses and records the requests it got."""
+
+    def __init__(self, *responses: str) -> None:
+        self.responses = list(responses)
+        self.requests: list[list[dict[str, str]]] = []
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        self.requests.append(messages)
+        return self.responses.pop(0)
+
+
+def _score_result(scores: list, total, summary: str | None = "ok") -> dict:
+    data = {
+        "dimensions": {
+            name: {"score": score, "reason": "r"} for name, score in zip(DIMENSIONS, scores)
+        },
+        "totalScore": total,
+    }
+    if summary is not None:
+        data["summary"] = summary
+    return data
+
+
+def _error(data: dict, model_class) -> ValidationError:
+    with pytest.raises(ValidationError) as excinfo:
+        model_class.model_validate(data)
+    return excinfo.value
+
+
+def test_local_fix_clamps_scores_and_recomputes_total():
+    data = _score_result([3, "2", -1, 1.6, 1], 12)
+    before = REPAIR_STATS["local"]
+    result = repair(data, ScoreResult, _error(data, ScoreResult))
+    assert [getattr(result.dimensions, name).score for name in DIMENSIONS] == [2, 2, 0, 2, 1]
+    assert result.totalScore == 7
+    assert REPAIR_STATS["local"] == before + 1
+    # The input is left untouched
+    assert data["dimensions"]["runtimeTarget"]["score"] == 3
+
+
+def test_local_fix_rederives_dispatch_fields():
+    data = {
+        "task_id": "TASK-001",
+        "scoring": {
+            name: {"score": score, "reason": "r"}
+            for name, score in zip(("complexity", "risk", "human_judgment"), (2, 2, 3))
+        },
+        "total_score": 1,
+        "recommended_role": "Product Owner",
+        "owner_type": "ai",
+        "autonomy_level": "autonomous",
+        "reasoning": "r",
+    }
+    result = repair(data, TaskDispatch, _error(data, TaskDispatch))
+    assert result.total_score == 6
+    assert result.owner_type == "human"
+    assert result.autonomy_level == "manual"
+
+
+def test_repair_locally_reports_what_it_could_not_fix():
+    fixable = _score_result([3, 1, 1, 1, 1], 9)
+    result, fixed, error = repair_locally(fixable, ScoreResult)
+    assert result.totalScore == 6 and error is None
+    assert fixed["totalScore"] == 6
+
+    missing = _score_result([1, 1, 1, 1, 1], 5, summary=None)
+    result, _, error = repair_locally(missing, ScoreResult)
+    assert result is None
+    assert error.errors()[0]["loc"] == ("summary",)
+
+
+def test_llm_fixup_fills_missing_field():
+    data = _score_result([1, 1, 1, 1, 1], 5, summary=None)
+    client = FakeClient('{"fixes": [{"path": ["summary"], "value": "Fixed"}]}')
+    before = REPAIR_STATS["llm"]
+    result = repair(data, ScoreResult, _error(data, ScoreResult), client)
+    assert result.summary == "Fixed"
+    assert REPAIR_STATS["llm"] == before + 1
+    (messages,) = client.requests
+    assert '"path": ["summary"]' in messages[0]["content"]
+
+
+def test_unrepairable_without_client_raises():
+    data = _score_result([1, 1, 1, 1, 1], 5, summary=None)
+    before = REPAIR_STATS["failed"]
+    with pytest.raises(ValidationError):
+        repair(data, ScoreResult, _error(data, ScoreResult))
+    assert REPAIR_STATS["failed"] == before + 1
+
+
+@pytest.mark.parametrize(
+    "fixes",
+    [
+        "not json",
+        '{"fixes": "none"}',
+        '{"fixes": [{"path": ["no", "such", "field"], "value": 1}]}',
+        '{"fixes": [{"path": ["summary"], "value": 42}]}',
+    ],
+)
+def test_failed_llm_fixup_raises(fixes):
+    data = _score_result([1, 1, 1, 1, 1], 5, summary=None)
+    with pytest.raises(ValidationError):
+        repair(data, ScoreResult, _error(data, ScoreResult), FakeClient(fixes))
+
+
+def test_parse_structured_response_repairs_and_raises():
+    data = _score_result([5, 1, 1, 1, 1], 9)
+    result = parse_structured_response(f"```json\n{json.dumps(data)}\n```", ScoreResult)
+    assert result.totalScore == 6
+
+    with pytest.raises(ValueError, match="No valid JSON"):
+        parse_structured_response("I cannot score this ticket.", ScoreResult)
+    with pytest.raises(ValidationError):
+        parse_structured_response(json.dumps({"dimensions": {}}), ScoreResult)
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from scheduler import ConcurrencyLimiter, RateLimits, SchedulingClient, is_retryable
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 503])
+def test_transient_errors_are_retryable(status):
+    assert is_retryable(HTTPError(status))
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 409, 422])
+def test_client_errors_are_not_retryable(status):
+    assert not is_retryable(HTTPError(status))
+
+
+def test_dropped_connections_are_retryable():
+    assert is_retryable(httpx.ConnectError("refused"))
+
+
+class CountingClient:
+    """Records the most requests it ever had in flight at once."""
+
+    provider = "test"
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def chat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        self._enter()
+        time.sleep(0.02)
+        self._exit()
+        return "ok"
+
+    async def achat(self, system_prompt: str, messages: list[dict[str, str]]) -> str:
+        self._enter()
+        await asyncio.sleep(0.02)
+        self._exit()
+        return "ok"
+
+
+def test_concurrency_cap_is_shared_by_threads_and_event_loops():
+    inner = CountingClient("shared-cap")
+    client = SchedulingClient(inner, RateLimits(max_concurrency=2))
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def burst():
+        await asyncio.gather(*(client.achat("", messages) for _ in range(5)))
+
+    workers = [threading.Thread(target=asyncio.run, args=(burst(),)) for _ in range(2)]
+    workers += [threading.Thread(target=client.chat, args=("", messages)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert inner.peak == 2
+    assert client.schedule.slots().active == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = ConcurrencyLimiter(1)
+
+    async def run():
+        await limiter.aacquire()
+        waiter = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        # The slot is free again rather than held by the cancelled waiter
+        await asyncio.wait_for(limiter.aacquire(), 1)
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.active == 0
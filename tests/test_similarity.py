@@ -0,0 +1,137 @@
+import pytest
+
+from models.scoring import ScoreResult
+from similarity import SimilarityIndex, adapt_result
+
+TICKET = (
+    "As a shop owner I want to export the monthly sales report for the Acme store as CSV "
+    "so that I can import it into the accounting system. The export includes order id, "
+    "date, customer, total and tax columns and runs in under ten seconds."
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SimilarityIndex(str(tmp_path), threshold=0.8)
+    yield index
+    index.close()
+
+
+def test_near_duplicate_matches(index):
+    index.add("score", TICKET, {"totalScore": 7})
+    match = index.match("score", TICKET.replace("Acme", "Globex"))
+    assert match is not None
+    assert 0.8 <= match.similarity < 1.0
+    assert match.result == {"totalScore": 7}
+    assert match.text == TICKET
+
+
+def test_unrelated_text_and_other_kinds_do_not_match(index):
+    index.add("score", TICKET, {"totalScore": 7})
+    assert index.match("score", "Migrate the billing service to the new message queue") is None
+    assert index.match("decompose", TICKET) is None
+    assert index.match("score", "") is None
+
+
+def test_re_adding_replaces_the_result(index):
+    index.add("score", TICKET, {"totalScore": 7})
+    index.add("score", TICKET, {"totalScore": 9})
+    assert len(index) == 1
+    assert index.match("score", TICKET).result == {"totalScore": 9}
+
+
+def test_index_persists(tmp_path):
+    index = SimilarityIndex(str(tmp_path))
+    index.add("score", TICKET, {"totalScore": 7})
+    index.close()
+    reopened = SimilarityIndex(str(tmp_path))
+    try:
+        assert reopened.match("score", TICKET).similarity == 1.0
+    finally:
+        reopened.close()
+
+
+def test_adapt_result_carries_over_replaced_phrases():
+    new_text = TICKET.replace("Acme", "Globex").replace("CSV", "XLSX")
+    result = {
+        "summary": "Exports Acme sales as CSV.",
+        "items": [{"reason": "CSV columns are listed"}, 3],
+        "note": "Acmeish stays",
+    }
+    adapted, substitutions = adapt_result(result, TICKET, new_text)
+    assert adapted == {
+        "summary": "Exports Globex sales as XLSX.",
+        "items": [{"reason": "XLSX columns are listed"}, 3],
+        "note": "Acmeish stays",
+    }
+    assert sorted(substitutions) == [("Acme", "Globex"), ("CSV", "XLSX")]
+    assert result["summary"] == "Exports Acme sales as CSV."
+
+
+def test_adapt_result_without_changes():
+    result = {"summary": "Exports Acme sales"}
+    assert adapt_result(result, TICKET, TICKET) == (result, [])
+
+
+def test_adapt_result_leaves_ids_and_enums_alone():
+    old_text = "Build the todo list screen for the Acme app with offline sync support"
+    new_text = "Build the done list screen for the Globex app with offline sync support"
+    result = {
+        "stories": [
+            {
+                "id": "Acme",
+                "title": "Acme todo list",
+                "tasks": [
+                    {
+                        "task_id": "Acme",
+                        "title": "Build Acme todo screen",
+                        "status": "todo",
+                        "role": "Acme",
+                        "dependencies": ["Acme"],
+                    }
+                ],
+            }
+        ]
+    }
+    adapted, _ = adapt_result(result, old_text, new_text)
+    story = adapted["stories"][0]
+    task = story["tasks"][0]
+    assert story["title"] == "Globex done list"
+    assert task["title"] == "Build Globex done screen"
+    assert (story["id"], task["task_id"], task["role"]) == ("Acme", "Acme", "Acme")
+    assert task["status"] == "todo"
+    assert task["dependencies"] == ["Acme"]
+
+
+def _score(summary: str, total: int = 1) -> dict:
+    dimension = {"score": 0, "reason": "Acme ticket"}
+    return {
+        "dimensions": {
+            name: dict(dimension)
+            for name in (
+                "runtimeTarget", "deliveryForm", "controlScheme", "businessRules",
+                "acceptanceCriteria",
+            )
+        },
+        "totalScore": total,
+        "summary": summary,
+    }
+
+
+def test_lookup_returns_validated_adapted_result(tmp_path):
+    index = SimilarityIndex(str(tmp_path), reuse=True)
+    try:
+        index.add("score", TICKET, _score("Clear Acme export", total=0))
+        result, match = index.lookup("score", TICKET.replace("Acme", "Globex"), ScoreResult)
+        assert isinstance(result, ScoreResult)
+        assert result.summary == "Clear Globex export"
+        assert result.dimensions.runtimeTarget.reason == "Globex ticket"
+        assert (tmp_path / "similar_audit.jsonl").exists()
+
+        # A stored result that no longer validates is reported but not reused
+        index.add("score", TICKET, _score("Clear Acme export", total=42))
+        result, match = index.lookup("score", TICKET.replace("Acme", "Globex"), ScoreResult)
+        assert result is None
+        assert match is not None
+    finally:
+        index.close()
@@ -0,0 +1,250 @@
+import json
+import sqlite3
+
+import pytest
+
+from models.role import DispatchResult
+from models.task import Story, TaskDecompositionResult
+from store import TaskStore
+
+# Layout of stores created before stories and tasks were keyed by epic
+_V1_SCHEMA = """
+CREATE TABLE IF NOT EXISTS epics (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL,
+    reasoning TEXT NOT NULL DEFAULT '',
+    execution_plan TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stories (
+    story_id TEXT PRIMARY KEY,
+    epic_id INTEGER NOT NULL REFERENCES epics(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stories_epic ON stories(epic_id, position);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    story_id TEXT NOT NULL REFERENCES stories(story_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    role TEXT NOT NULL,
+    owner_type TEXT NOT NULL,
+    assignee TEXT NOT NULL,
+    estimate_hours REAL,
+    story_points INTEGER,
+    acceptance_criteria TEXT NOT NULL,
+    blocker_reason TEXT,
+    artifacts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_story ON tasks(story_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_role ON tasks(role);
+CREATE INDEX IF NOT EXISTS idx_tasks_owner_type ON tasks(owner_type);
+CREATE TABLE IF NOT EXISTS dependencies (
+    task_id TEXT NOT NULL REFERENCES tasks(task_id) ON DELETE CASCADE,
+    depends_on TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (task_id, depends_on)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_dependencies_reverse ON dependencies(depends_on);
+CREATE TABLE IF NOT EXISTS dispatches (
+    task_id TEXT PRIMARY KEY,
+    recommended_role TEXT NOT NULL,
+    owner_type TEXT NOT NULL,
+    autonomy_level TEXT NOT NULL,
+    total_score INTEGER NOT NULL,
+    fingerprint TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dispatches_role ON dispatches(recommended_role);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _decomposition(epic: str, *tasks: tuple[str, str, list[str]]) -> TaskDecompositionResult:
+    return TaskDecompositionResult.model_validate(
+        {
+            "epic": {"title": epic, "description": f"{epic} description"},
+            "reasoning": "",
+            "stories": [
+                {
+                    "id": "STORY-001",
+                    "title": f"{epic} story",
+                    "tasks": [
+                        {
+                            "task_id": task_id,
+                            "title": title,
+                            "description": "",
+                            "role": "Junior Developer",
+                            "dependencies": deps,
+                            "acceptance_criteria": "",
+                        }
+                        for task_id, title, deps in tasks
+                    ],
+                }
+            ],
+        }
+    )
+
+
+def _dispatches(summary: str, *task_ids: str, role: str = "Junior Developer") -> DispatchResult:
+    dimension = {"score": 0, "reason": "r"}
+    return DispatchResult.model_validate(
+        {
+            "dispatches": [
+                {
+                    "task_id": task_id,
+                    "scoring": {
+                        "complexity": dimension,
+                        "risk": dimension,
+                        "human_judgment": dimension,
+                    },
+                    "total_score": 0,
+                    "recommended_role": role,
+                    "owner_type": "ai",
+                    "autonomy_level": "autonomous",
+                    "reasoning": "r",
+                }
+                for task_id in task_ids
+            ],
+            "summary": summary,
+            "task_fingerprints": {task_id: f"fp-{task_id}" for task_id in task_ids},
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    decomposition = _decomposition(
+        "A", ("TASK-001", "Schema", []), ("TASK-002", "Endpoint", ["TASK-001"])
+    )
+    store.upsert_decomposition(decomposition)
+    assert store.export_decomposition("A") == decomposition
+    assert store.dependencies("TASK-002") == ["TASK-001"]
+    assert store.dependents("TASK-001") == ["TASK-002"]
+
+
+def test_epics_with_the_same_ids_are_kept_apart(store):
+    a = _decomposition("A", ("TASK-001", "A schema", []), ("TASK-002", "A api", ["TASK-001"]))
+    b = _decomposition("B", ("TASK-001", "B schema", []))
+    store.upsert_decomposition(a)
+    store.upsert_decomposition(b)
+
+    assert store.export_decomposition("A") == a
+    assert store.export_decomposition("B") == b
+    assert [t.title for t in store.find_tasks(epic_title="A")] == ["A schema", "A api"]
+    # Without an epic, the most recently updated one
+    assert [t.title for t in store.find_tasks()] == ["B schema"]
+    assert store.get_task("TASK-001", "A").title == "A schema"
+    assert store.dependents("TASK-001", "A") == ["TASK-002"]
+    assert store.dependents("TASK-001", "B") == []
+
+    store.set_status("TASK-001", "done", epic_title="A")
+    assert store.get_task("TASK-001", "A").status == "done"
+    assert store.get_task("TASK-001", "B").status == "todo"
+    assert [t.task_id for t in store.ready_tasks("A")] == ["TASK-002"]
+    assert [t.task_id for t in store.ready_tasks("B")] == ["TASK-001"]
+
+
+def test_dispatches_are_per_epic(store):
+    store.upsert_decomposition(_decomposition("A", ("TASK-001", "A schema", [])))
+    store.upsert_decomposition(_decomposition("B", ("TASK-001", "B schema", [])))
+    store.upsert_dispatches(_dispatches("A summary", "TASK-001"), "A")
+    store.upsert_dispatches(_dispatches("B summary", "TASK-001", role="Senior Developer"), "B")
+
+    assert store.get_dispatch("TASK-001", "A").recommended_role == "Junior Developer"
+    assert store.get_dispatch("TASK-001", "B").recommended_role == "Senior Developer"
+    assert store.dispatch_summary("A") == "A summary"
+    exported = store.export_dispatch(epic_title="A")
+    assert exported.summary == "A summary"
+    assert exported.task_fingerprints == {"TASK-001": "fp-TASK-001"}
+    assert set(store.reusable_dispatches({"TASK-001": "fp-TASK-001"}, "B")) == {"TASK-001"}
+    assert store.reusable_dispatches({"TASK-001": "changed"}, "B") == {}
+
+
+def test_removed_stories_and_tasks_are_deleted(store):
+    store.upsert_decomposition(
+        _decomposition("A", ("TASK-001", "Schema", []), ("TASK-002", "Api", ["TASK-001"]))
+    )
+    store.upsert_decomposition(_decomposition("A", ("TASK-001", "Schema v2", [])))
+    assert [t.title for t in store.find_tasks(epic_title="A")] == ["Schema v2"]
+    assert store.dependents("TASK-001", "A") == []
+
+    store.upsert_story("A", Story(id="STORY-002", title="More", tasks=[]))
+    assert [s.id for s in store.export_decomposition("A").stories] == ["STORY-001", "STORY-002"]
+    with pytest.raises(KeyError):
+        store.upsert_story("missing", Story(id="STORY-001", title="x", tasks=[]))
+
+
+def test_empty_store(store):
+    assert store.find_tasks() == []
+    assert store.ready_tasks() == []
+    assert store.reusable_dispatches({"TASK-001": "fp"}) == {}
+    assert store.dispatch_summary() == ""
+    with pytest.raises(KeyError):
+        store.resolve_epic()
+    with pytest.raises(KeyError):
+        store.export_decomposition()
+
+
+def test_invalid_status_and_unknown_task(store):
+    store.upsert_decomposition(_decomposition("A", ("TASK-001", "Schema", [])))
+    with pytest.raises(ValueError):
+        store.set_status("TASK-001", "finished")
+    with pytest.raises(KeyError):
+        store.set_status("TASK-404", "done")
+
+
+
+def test_version_1_store_is_migrated(tmp_path):
+    path = tmp_path / "tasks.db"
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(_V1_SCHEMA)
+        conn.execute(
+            "INSERT INTO epics (id, title, description, updated) VALUES (1, 'A', 'd', 0)"
+        )
+        conn.execute("INSERT INTO stories VALUES ('STORY-001', 1, 'Story', 0)")
+        conn.execute(
+            "INSERT INTO tasks VALUES ('TASK-001', 'STORY-001', 0, 'Schema', '', 'done', "
+            "'Junior Developer', 'ai', '', NULL, NULL, '', NULL, '[]')"
+        )
+        conn.execute(
+            "INSERT INTO tasks VALUES ('TASK-002', 'STORY-001', 1, 'Api', '', 'todo', "
+            "'Junior Developer', 'ai', '', NULL, NULL, '', NULL, '[]')"
+        )
+        conn.execute("INSERT INTO dependencies VALUES ('TASK-002', 'TASK-001', 0)")
+        dispatch = _dispatches("Old summary", "TASK-002").dispatches[0]
+        conn.execute(
+            "INSERT INTO dispatches VALUES ('TASK-002', 'Junior Developer', 'ai', "
+            "'autonomous', 0, 'fp', ?)",
+            (dispatch.model_dump_json(),),
+        )
+        conn.execute("INSERT INTO meta VALUES ('dispatch_summary', 'Old summary')")
+    conn.close()
+
+    store = TaskStore(str(path))
+    try:
+        assert [t.task_id for t in store.ready_tasks("A")] == ["TASK-002"]
+        assert store.dependencies("TASK-002", "A") == ["TASK-001"]
+        assert store.get_dispatch("TASK-002", "A") == dispatch
+        assert store.dispatch_summary("A") == "Old summary"
+        store.upsert_decomposition(_decomposition("B", ("TASK-001", "B schema", [])))
+        assert store.get_task("TASK-001", "A").title == "Schema"
+    finally:
+        store.close()
+    # Opening a migrated store again leaves it as it is
+    TaskStore(str(path)).close()